@@ -0,0 +1,16 @@
+-- CreateTable
+CREATE TABLE "public"."AnalysisCache" (
+    "key" TEXT NOT NULL,
+    "model" TEXT NOT NULL,
+    "promptVersion" TEXT NOT NULL,
+    "result" JSONB NOT NULL,
+    "totalScore" INTEGER NOT NULL,
+    "hits" INTEGER NOT NULL DEFAULT 0,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "expiresAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "AnalysisCache_pkey" PRIMARY KEY ("key")
+);
+
+-- CreateIndex
+CREATE INDEX "AnalysisCache_expiresAt_idx" ON "public"."AnalysisCache"("expiresAt");
@@ -0,0 +1,28 @@
+-- CreateTable
+CREATE TABLE "public"."LlmUsage" (
+    "id" UUID NOT NULL,
+    "interviewId" TEXT,
+    "userId" TEXT,
+    "resumeAnalysisId" TEXT,
+    "agent" TEXT NOT NULL,
+    "model" TEXT NOT NULL,
+    "calls" INTEGER NOT NULL,
+    "promptTokens" INTEGER NOT NULL,
+    "completionTokens" INTEGER NOT NULL,
+    "totalTokens" INTEGER NOT NULL,
+    "latencyMsTotal" INTEGER NOT NULL,
+    "latencyMsMax" INTEGER NOT NULL,
+    "windowStart" TIMESTAMP(3) NOT NULL,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "LlmUsage_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "LlmUsage_interviewId_idx" ON "public"."LlmUsage"("interviewId");
+
+-- CreateIndex
+CREATE INDEX "LlmUsage_userId_idx" ON "public"."LlmUsage"("userId");
+
+-- CreateIndex
+CREATE INDEX "LlmUsage_createdAt_idx" ON "public"."LlmUsage"("createdAt");
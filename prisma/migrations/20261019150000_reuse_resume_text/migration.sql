@@ -0,0 +1,5 @@
+-- AlterTable
+ALTER TABLE "public"."ResumeAnalysis" ADD COLUMN     "formattingIssues" JSONB;
+
+-- CreateIndex
+CREATE INDEX "ResumeAnalysis_userId_cloudinaryUrl_idx" ON "public"."ResumeAnalysis"("userId", "cloudinaryUrl");
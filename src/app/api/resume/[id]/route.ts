@@ -39,6 +39,7 @@ export const GET = async (
         cloudinaryUrl: true,
         jobDescription: true,
         analysisResult: true,
+        formattingIssues: true,
         totalScore: true,
         status: true,
         createdAt: true,
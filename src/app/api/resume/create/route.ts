@@ -157,6 +157,7 @@ export const POST = async (req: Request) => {
           resumeId: newResume.id,
           fileUrl: resumeUrl,
           JobDescription: JobDescription,
+          userId: newResume.userId,
         };
         console.log(`📋 [API_CREATE] ${requestId} - Python API payload:`, pythonPayload);
         
@@ -7,6 +7,7 @@ import { Spinner } from "@/components/ui/spinner";
 import { useInterviewCon } from "@/context/InterviewContext";
 import { useInterviewConAll } from "@/context/InterviewAllContext";
 import { useParams, useRouter } from "next/navigation";
+import { useSession } from "next-auth/react";
 import { motion, AnimatePresence } from "motion/react";
 import ReloadGuard from "@/components/Reload";
 
@@ -196,6 +197,9 @@ export default function Page() {
   const router = useRouter();
   const params = useParams();
   const id = params.id;
+  // Sent to the agent API so LLM token usage is attributed to the user
+  const { data: session } = useSession();
+  const userId = session?.user?.id;
 
   const [loading, setLoading] = useState(true);
   const [messages, setMessages] = useState<{ role: string; content: string; question_id?: number }[]>([]);
@@ -418,7 +422,9 @@ export default function Page() {
             messages: [],
             interview_type: interview.interviewType,
             time_left: timeLeft,
-            force_next
+            force_next,
+            interview_id: id,
+            user_id: userId
           }),
           signal: controller.signal
         });
@@ -982,7 +988,9 @@ export default function Page() {
           interview_type: interview.interviewType,
           time_left: EndTime - Date.now(),
           force_next,
-          lastQuestionAnswered: lastQuestionFlag
+          lastQuestionAnswered: lastQuestionFlag,
+          interview_id: id,
+          user_id: userId
         }),
         signal: controller.signal
       });
@@ -1355,7 +1363,8 @@ export default function Page() {
           resume_data: interview.resumeData,
           transcript: messages,
           question_list: questions,
-          interview_type: interview.interviewType
+          interview_type: interview.interviewType,
+          user_id: userId
         }),
         signal: feedbackController.signal
       });
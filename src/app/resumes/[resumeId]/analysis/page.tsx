@@ -1,7 +1,7 @@
 "use client";
 import { useEffect, useState } from "react";
 import { useParams, useRouter } from "next/navigation";
-import { ResumeContextDets } from "@/types";
+import { ResumeContextDets, isAnalysisInProgress, isAnalysisFailed } from "@/types";
 import { Spinner } from "@/components/ui/spinner";
 import { Button } from "@/components/ui/button";
 import { ArrowLeft, Download, RefreshCw } from "lucide-react";
@@ -114,10 +114,10 @@ const ResumeAnalysisPage = () => {
         if (data.status === 'COMPLETED') {
           console.log(`✅ [POLLING] ${pollId} - Analysis completed! Final score: ${data.totalScore}`);
           toast.success("Resume analysis completed successfully!");
-        } else if (data.status === 'FAILED') {
+        } else if (isAnalysisFailed(data.status)) {
           console.log(`❌ [POLLING] ${pollId} - Analysis failed`);
           toast.error("Resume analysis failed. Please try again or contact support.");
-        } else if (data.status === 'PROCESSING') {
+        } else if (isAnalysisInProgress(data.status)) {
           // Check if analysis has been processing for too long (more than 10 minutes)
           const createdAt = new Date(data.createdAt || data.updatedAt);
           const now = new Date();
@@ -265,7 +265,7 @@ const ResumeAnalysisPage = () => {
 
   // Background polling for processing status
   useEffect(() => {
-    if (resume?.status === "PROCESSING") {
+    if (isAnalysisInProgress(resume?.status)) {
       console.log(`🔄 [POLLING_SETUP] Starting polling for resume: ${resumeId} (status: ${resume.status})`);
       
       const interval = setInterval(() => {
@@ -1,8 +1,9 @@
 "use client";
 import { useEffect, useState } from "react";
 import { useParams, useRouter } from "next/navigation";
-import { ResumeContextDets, AnalysisResult } from "@/types";
+import { ResumeContextDets, AnalysisResult, PartialAnalysisResult, isAnalysisInProgress, isAnalysisFailed } from "@/types";
 import { Spinner } from "@/components/ui/spinner";
+import FormattingFindings from "@/components/FormattingFindings";
 import { Button } from "@/components/ui/button";
 import { 
   ArrowLeft, 
@@ -90,7 +91,7 @@ const ResumeDetailsPage = () => {
 
   // Auto-refresh for processing status
   useEffect(() => {
-    if (resume?.status === "PROCESSING") {
+    if (isAnalysisInProgress(resume?.status)) {
       const interval = setInterval(() => {
         pollResumeStatus();
       }, 3000);
@@ -104,8 +105,10 @@ const ResumeDetailsPage = () => {
       case 'COMPLETED':
         return <CheckCircle className="w-5 h-5 text-green-500" />;
       case 'PROCESSING':
+      case 'ANALYZING':
         return <Clock className="w-5 h-5 text-yellow-500" />;
       case 'FAILED':
+      case 'RETRY_NEEDED':
         return <XCircle className="w-5 h-5 text-red-500" />;
       case 'UPLOADED':
         return <AlertCircle className="w-5 h-5 text-blue-500" />;
@@ -119,8 +122,10 @@ const ResumeDetailsPage = () => {
       case 'COMPLETED':
         return 'bg-green-50 text-green-700 border-green-200';
       case 'PROCESSING':
+      case 'ANALYZING':
         return 'bg-yellow-50 text-yellow-700 border-yellow-200';
       case 'FAILED':
+      case 'RETRY_NEEDED':
         return 'bg-red-50 text-red-700 border-red-200';
       case 'UPLOADED':
         return 'bg-blue-50 text-blue-700 border-blue-200';
@@ -328,14 +333,29 @@ const ResumeDetailsPage = () => {
           )}
 
           {/* Processing State */}
-          {resume.status === 'PROCESSING' && (
+          {isAnalysisInProgress(resume.status) && (
             <div className="bg-white rounded-xl shadow-sm border border-gray-200 p-6">
               <div className="text-center py-8">
                 <Spinner className="w-12 h-12 mx-auto mb-4" />
                 <h3 className="text-lg font-semibold text-gray-900 mb-2">Analysis in Progress</h3>
                 <p className="text-gray-600 mb-4">
-                  Our AI is analyzing your resume. This usually takes 2-3 minutes.
+                  {resume.status === 'ANALYZING'
+                    ? "Your resume has been read. Our AI is now scoring it against the job description."
+                    : "Our AI is analyzing your resume. This usually takes 2-3 minutes."}
                 </p>
+                {resume.status === 'ANALYZING' && (() => {
+                  const issues = (resume.analysisResult as PartialAnalysisResult | null)?.ats_compatibility?.formatting_issues ?? [];
+                  return issues.length > 0 && (
+                    <div className="text-left max-w-md mx-auto mb-4">
+                      <p className="text-sm font-medium text-gray-900 mb-2">Formatting issues found so far</p>
+                      <FormattingFindings
+                        findings={resume.formattingIssues}
+                        fallback={issues}
+                        className="text-sm text-gray-600 space-y-1"
+                      />
+                    </div>
+                  );
+                })()}
                 <div className="flex items-center gap-2 text-sm text-gray-600">
                   <Spinner className="w-4 h-4" />
                   <span>Auto-refreshing status...</span>
@@ -345,7 +365,7 @@ const ResumeDetailsPage = () => {
           )}
 
           {/* Failed State */}
-          {resume.status === 'FAILED' && (
+          {isAnalysisFailed(resume.status) && (
             <div className="bg-white rounded-xl shadow-sm border border-gray-200 p-6">
               <div className="text-center py-8">
                 <div className="w-16 h-16 bg-red-100 rounded-full flex items-center justify-center mx-auto mb-4">
@@ -0,0 +1,49 @@
+import React from "react";
+import { FormattingFinding } from "@/types";
+
+interface FormattingFindingsProps {
+  // resume.formattingIssues; older rows hold plain messages
+  findings?: (FormattingFinding | string)[] | null;
+  // Messages to show when no stored findings exist (e.g. ats_compatibility.formatting_issues)
+  fallback?: string[];
+  className?: string;
+  itemClassName?: string;
+}
+
+const toFinding = (item: FormattingFinding | string): FormattingFinding =>
+  typeof item === "string"
+    ? { code: "unclassified", message: item, severity: "warning", line: null, offset: null, count: 1 }
+    : item;
+
+const FormattingFindings: React.FC<FormattingFindingsProps> = ({
+  findings,
+  fallback = [],
+  className = "space-y-1",
+  itemClassName = "",
+}) => {
+  const items = findings && findings.length > 0 ? findings.map(toFinding) : fallback.map(toFinding);
+  if (items.length === 0) {
+    return null;
+  }
+
+  return (
+    <ul className={className}>
+      {items.map((finding, index) => (
+        <li key={`${finding.code}-${index}`} className={`flex items-start gap-1 ${itemClassName}`}>
+          <span className={finding.severity === "error" ? "text-red-500 mt-0.5" : "text-orange-500 mt-0.5"}>•</span>
+          <span>
+            {finding.message}
+            {finding.line !== null && (
+              <span className="ml-2 px-1.5 py-0.5 bg-gray-100 text-gray-600 text-xs rounded">
+                line {finding.line}
+                {finding.count > 1 ? ` · ${finding.count}×` : ""}
+              </span>
+            )}
+          </span>
+        </li>
+      ))}
+    </ul>
+  );
+};
+
+export default FormattingFindings;
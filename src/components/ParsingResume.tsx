@@ -4,6 +4,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle } from "@/components/u
 import { Spinner } from "@/components/ui/spinner";
 import toast from "react-hot-toast";
 import { useInterviewCon } from "@/context/InterviewContext";
+import { useSession } from "next-auth/react";
 
 interface ParsingResumeProps {
   open: boolean;
@@ -15,6 +16,7 @@ interface ParsingResumeProps {
 const ParsingResume: React.FC<ParsingResumeProps> = ({ open, onClose, resumeUrl, onParsed }) => {
   const [loading, setLoading] = useState(false);
   const { setInterview } = useInterviewCon();
+  const { data: session } = useSession();
     console.log(resumeUrl);
     
   const getResumeData = async () => {
@@ -23,7 +25,7 @@ const ParsingResume: React.FC<ParsingResumeProps> = ({ open, onClose, resumeUrl,
       const res = await fetch(`${process.env.NEXT_PUBLIC_AGENT_API_URL}/api/parse`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ resumeUrl }),
+        body: JSON.stringify({ resumeUrl, user_id: session?.user?.id }),
       });
 
       const data = await res.json();
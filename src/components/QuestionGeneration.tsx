@@ -4,6 +4,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle } from "@/components/u
 import { Spinner } from "@/components/ui/spinner";
 import toast from "react-hot-toast";
 import { useRouter } from "next/navigation";
+import { useSession } from "next-auth/react";
 import { QuestionsListSchema, QuestionsList } from "@/types";
 import { useInterviewCon } from "@/context/InterviewContext";
 import { useInterviewConAll } from "@/context/InterviewAllContext";
@@ -32,6 +33,7 @@ const QuestionGeneration: React.FC<QuestionGenerationProps> = ({
   const { interview, setInterview } = useInterviewCon();
   const { refetchInterviews } = useInterviewConAll();
   const router = useRouter();
+  const { data: session } = useSession();
 
   const generateAndSaveQuestions = async () => {
     setLoading(true);
@@ -50,6 +52,9 @@ const QuestionGeneration: React.FC<QuestionGenerationProps> = ({
           resumeData: interview.resumeData,
           interview_type: interviewType,
           duration: durationStr,
+          // Only used to attribute LLM token usage
+          interview_id: interviewId,
+          user_id: session?.user?.id,
         }),
       });
 
@@ -1,6 +1,7 @@
 "use client";
-import { ResumeContextDets } from "@/types";
+import { ResumeContextDets, PartialAnalysisResult, isAnalysisInProgress, isAnalysisFailed } from "@/types";
 import { Spinner } from "./ui/spinner";
+import FormattingFindings from "./FormattingFindings";
 import { Button } from "./ui/button";
 import { 
   XCircle, 
@@ -39,8 +40,12 @@ const ResumeAnalysisDisplay = ({ resume, onRetry, retrying = false }: ResumeAnal
   };
 
   // Processing State
-  if (resume.status === 'PROCESSING') {
-    console.log(`⏳ [RESUME_DISPLAY] Rendering PROCESSING state for resume: ${resume.id}`);
+  if (isAnalysisInProgress(resume.status)) {
+    console.log(`⏳ [RESUME_DISPLAY] Rendering ${resume.status} state for resume: ${resume.id}`);
+    // Saved before the AI analysis starts (status ANALYZING)
+    const partialIssues = resume.status === 'ANALYZING'
+      ? (resume.analysisResult as PartialAnalysisResult | null)?.ats_compatibility?.formatting_issues ?? []
+      : [];
     return (
       <div className="max-w-2xl mx-auto">
         <div className="bg-white/95 backdrop-blur-sm rounded-xl border border-gray-200 shadow-lg p-12">
@@ -58,6 +63,21 @@ const ResumeAnalysisDisplay = ({ resume, onRetry, retrying = false }: ResumeAnal
               </p>
             </div>
             
+            {resume.status === 'ANALYZING' && (
+              <div className="bg-yellow-50 rounded-lg p-4 mb-6 text-left">
+                <p className="text-yellow-800 text-sm font-medium mb-2">
+                  ✅ Resume read. {partialIssues.length > 0
+                    ? `Formatting issues found so far (${partialIssues.length}):`
+                    : "No formatting issues found so far."}
+                </p>
+                <FormattingFindings
+                  findings={resume.formattingIssues}
+                  fallback={partialIssues}
+                  className="text-yellow-700 text-sm space-y-1"
+                />
+              </div>
+            )}
+
             <div className="bg-blue-50 rounded-lg p-4 mb-6">
               <p className="text-blue-800 text-sm">
                 💡 We &#39; re evaluating your resume for relevance, formatting, keywords, and overall presentation quality. This page will automatically update when complete.
@@ -83,8 +103,8 @@ const ResumeAnalysisDisplay = ({ resume, onRetry, retrying = false }: ResumeAnal
   }
 
   // Failed State
-  if (resume.status === 'FAILED') {
-    console.log(`❌ [RESUME_DISPLAY] Rendering FAILED state for resume: ${resume.id}`);
+  if (isAnalysisFailed(resume.status)) {
+    console.log(`❌ [RESUME_DISPLAY] Rendering ${resume.status} state for resume: ${resume.id}`);
     return (
       <div className="max-w-2xl mx-auto">
         <div className="bg-white/95 backdrop-blur-sm rounded-xl border border-gray-200 shadow-lg p-12">
@@ -317,14 +337,11 @@ const ResumeAnalysisDisplay = ({ resume, onRetry, retrying = false }: ResumeAnal
                       {analysisData.ats_compatibility.formatting_issues?.length > 0 && (
                         <div>
                           <p className="text-sm font-medium text-orange-700 mb-1">Formatting Issues:</p>
-                          <ul className="text-sm text-orange-600 space-y-1">
-                            {analysisData.ats_compatibility.formatting_issues.map((issue: string, index: number) => (
-                              <li key={index} className="flex items-start gap-1">
-                                <span className="text-orange-500 mt-0.5">•</span>
-                                {issue}
-                              </li>
-                            ))}
-                          </ul>
+                          <FormattingFindings
+                            findings={resume.formattingIssues}
+                            fallback={analysisData.ats_compatibility.formatting_issues}
+                            className="text-sm text-orange-600 space-y-1"
+                          />
                         </div>
                       )}
                     </div>
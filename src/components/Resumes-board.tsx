@@ -71,8 +71,10 @@ const ResumesAnalysisComponent = () => {
             case 'COMPLETED':
                 return <CheckCircle className="w-5 h-5 text-green-500" />;
             case 'PROCESSING':
+            case 'ANALYZING':
                 return <Clock className="w-5 h-5 text-yellow-500" />;
             case 'FAILED':
+            case 'RETRY_NEEDED':
                 return <XCircle className="w-5 h-5 text-red-500" />;
             case 'UPLOADED':
                 return <AlertCircle className="w-5 h-5 text-blue-500" />;
@@ -86,8 +88,10 @@ const ResumesAnalysisComponent = () => {
             case 'COMPLETED':
                 return 'bg-green-50 text-green-700 border-green-200';
             case 'PROCESSING':
+            case 'ANALYZING':
                 return 'bg-yellow-50 text-yellow-700 border-yellow-200';
             case 'FAILED':
+            case 'RETRY_NEEDED':
                 return 'bg-red-50 text-red-700 border-red-200';
             case 'UPLOADED':
                 return 'bg-blue-50 text-blue-700 border-blue-200';
@@ -225,6 +229,11 @@ const ResumesAnalysisComponent = () => {
                                                 <Loader2 className="w-4 h-4 mr-2 animate-spin" />
                                                 Processing...
                                             </>
+                                        ) : resume.status === 'ANALYZING' ? (
+                                            <>
+                                                <Loader2 className="w-4 h-4 mr-2 animate-spin" />
+                                                View Progress
+                                            </>
                                         ) : (
                                             <>
                                                 <Eye className="w-4 h-4 mr-2" />
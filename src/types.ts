@@ -176,6 +176,31 @@ export interface AnalysisResult {
   jd_alignment: JobAlignment;
 }
 
+// Local ATS formatting check (Python utils/check.py), with where it first shows up
+export interface FormattingFinding {
+  code: string;
+  message: string;
+  severity: "warning" | "error";
+  line: number | null;
+  offset: number | null;
+  count: number;
+}
+
+export type AnalysisStatus = "UPLOADED" | "PROCESSING" | "ANALYZING" | "COMPLETED" | "FAILED" | "RETRY_NEEDED";
+
+// Saved while status is ANALYZING: local findings, before the AI sections exist
+export interface PartialAnalysisResult {
+  partial: true;
+  stage: string;
+  ats_compatibility: Pick<ATSCheck, "formatting_issues">;
+}
+
+export const isAnalysisInProgress = (status?: AnalysisStatus) =>
+  status === "PROCESSING" || status === "ANALYZING";
+
+export const isAnalysisFailed = (status?: AnalysisStatus) =>
+  status === "FAILED" || status === "RETRY_NEEDED";
+
 export type ResumeContextDets={
   id: string,
   userId: string,
@@ -184,8 +209,10 @@ export type ResumeContextDets={
   cloudinaryUrl: string,
   jobDescription: string,
   analysisResult: AnalysisResult | null,
+  // Plain strings in rows analyzed before positions were stored
+  formattingIssues?: (FormattingFinding | string)[] | null,
   totalScore: number,
-  status: "UPLOADED" | "PROCESSING" | "COMPLETED" | "FAILED",
+  status: AnalysisStatus,
   createdAt?: string,
   updatedAt?: string
 }
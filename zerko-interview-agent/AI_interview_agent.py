@@ -3,13 +3,54 @@ from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 import logging
 import os
-from Question_generator_agent import QuotaExceededError
+from typing import Callable, Optional
+from utils.errors import QuotaExceededError
+from utils.circuit_breaker import CircuitOpenError
+from utils.llm_gateway import route_model, stream_llm
+from utils.hedging import invoke_llm_hedged
+from utils.deadline import call_with_deadline, DeadlineExceeded
+from utils.interview_planner import output_token_limit
+from utils.metrics import metrics
+import config
 load_dotenv()
 
 # Configure logging for Interview Agent (Requirement 9.4)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+WRAP_UP_MESSAGE = "Thank you, we have covered all of my questions. Before we wrap up, is there anything else you would like to add?"
+
+
+def _strip_repeat_greetings(raw_text: str) -> str:
+    """Remove greeting lines the model adds after the first interviewer message."""
+    lines = [ln for ln in raw_text.splitlines() if ln.strip() != ""]
+    filtered_lines = []
+    for ln in lines:
+        low = ln.strip().lower()
+        # drop lines that are pure greetings or startup phrases
+        if any(g in low for g in ["welcome to the interview", "welcome", "hello", "hi", "let's begin", "lets begin", "good morning", "good afternoon", "good evening"]):
+            continue
+        filtered_lines.append(ln)
+    response_text = "\n".join(filtered_lines).strip()
+    # fallback to raw_text if filtering removed everything
+    if response_text == "":
+        response_text = raw_text
+    return response_text
+
+
+def turn_budget(time_left: Optional[int]) -> Optional[float]:
+    """
+    Seconds the LLM may take for this turn, from the configured SLO and the
+    interview time left (milliseconds). None when deadlines are disabled.
+    """
+    if not config.INTERVIEW_DEADLINE_ENABLED:
+        return None
+    budget = config.INTERVIEW_TURN_SLO
+    if time_left is not None:
+        budget = min(budget, max(config.INTERVIEW_TURN_MIN_BUDGET, time_left / 1000 * config.INTERVIEW_TURN_TIME_FRACTION))
+    return budget
+
+
 def interview_agent_auto_number(
     Post: str,
     JobDescription: str,
@@ -18,13 +59,18 @@ def interview_agent_auto_number(
     messages: list,
     time_left: int = None,
     force_next: bool = False,
-    lastQuestionAnswered: bool = False
+    lastQuestionAnswered: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
 ):
+    """
+    Decide the interviewer's next line. When on_token is given (WebSocket
+    transport), LLM output is streamed to it chunk by chunk; the returned
+    AIResponse is still the final, cleaned-up text.
+    """
     # Log Interview Agent request with context (Requirement 9.4)
     logger.info("Interview Agent request received: post='%s', messages_count=%d, time_left=%s, force_next=%s, lastQuestionAnswered=%s",
                 Post, len(messages), time_left, force_next, lastQuestionAnswered)
     
-    llm = ChatGoogleGenerativeAI(model=os.getenv("GEMINI_MODEL", "gemini-2.0-flash"), temperature=0.6)
     LAST_QUESTION_THRESHOLD = 2 * 60 * 1000
     END_INTERVIEW_THRESHOLD = 30 * 1000
 
@@ -136,6 +182,7 @@ def interview_agent_auto_number(
     end_interview = False
     extra_note = ""
     last_question = False
+    route_meta = None
 
     if lastQuestionAnswered and messages and messages[-1]["role"] == "candidate":
         # If last question was asked and candidate just answered, only return feedback
@@ -203,9 +250,49 @@ Next line (what interviewer should say):
             messages="\n".join([f"{m['role']}: {m['content']}" for m in recent_messages])
         )
         
-        logger.info("Invoking LLM for next question generation")
+        # Model is chosen per turn from prompt size, observed latency and quota
+        route = route_model("interview", len(formatted_prompt))
+        route_meta = route.as_meta()
+        budget = turn_budget(time_left)
+        route_meta["budget_seconds"] = budget
+        # The budget doubles as the HTTP timeout so an abandoned call ends soon after
+        llm = ChatGoogleGenerativeAI(
+            model=route.model,
+            temperature=0.6,
+            timeout=budget,
+            max_output_tokens=output_token_limit("interview"),
+        )
+
+        logger.info("Invoking LLM for next question generation (model=%s, budget=%s)", route.model, budget)
+        response = None
+        turn_expired = False
+
+        def guarded_on_token(text: str):
+            # Tokens from a call that overran its budget must not follow the fallback
+            if not turn_expired:
+                on_token(text)
+
+        def generate():
+            if on_token is not None:
+                return stream_llm(llm, formatted_prompt, agent="interview", model=route.model, on_token=guarded_on_token)
+            # Hedged when INTERVIEW_HEDGING_ENABLED: a slow call gets a twin request
+            return invoke_llm_hedged(llm, formatted_prompt, agent="interview", model=route.model)
+
         try:
-            response = llm.invoke(formatted_prompt)
+            response = generate() if budget is None else call_with_deadline(generate, budget)
+        except DeadlineExceeded as e:
+            # Same outcome as force_next: the candidate gets the next predefined question now
+            turn_expired = True
+            metrics.incr("interview_deadline_fallbacks_total")
+            logger.warning("Interview turn over budget, using next predefined question: %s", e)
+            route_meta.update(model=None, reason="deadline_exceeded")
+        except CircuitOpenError as e:
+            # Degraded path: quota circuit is open, so ask the next predefined
+            # question instead of leaving the candidate waiting on a 429.
+            if not next_question:
+                raise
+            logger.warning("Gemini circuit open, using next predefined question: %s", e)
+            route_meta.update(model=None, reason="circuit_open")
         except Exception as e:
             err_str = str(e)
             if (
@@ -216,26 +303,17 @@ Next line (what interviewer should say):
             ):
                 raise QuotaExceededError(err_str)
             raise
-        raw_text = response.content.strip()
-        logger.info("LLM response received, processing output")
-        
-        # If this isn't the very first interviewer message, remove common greeting lines if model included them
-        if asked_question_ids:
-            lines = [ln for ln in raw_text.splitlines() if ln.strip() != ""]
-            filtered_lines = []
-            for ln in lines:
-                low = ln.strip().lower()
-                # drop lines that are pure greetings or startup phrases
-                if any(g in low for g in ["welcome to the interview", "welcome", "hello", "hi", "let's begin", "lets begin", "good morning", "good afternoon", "good evening"]):
-                    continue
-                filtered_lines.append(ln)
-            response_text = "\n".join(filtered_lines).strip()
-            # fallback to raw_text if filtering removed everything
-            if response_text == "":
-                response_text = raw_text
+
+        if response is None and next_question:
+            response_text = next_question + extra_note
+        elif response is None:
+            # Over budget with no questions left: a slow model is not the candidate
+            # finishing, so wrap up and let the next turn end the interview
+            response_text = WRAP_UP_MESSAGE
         else:
-            response_text = raw_text
-        response_text = response_text + extra_note
+            raw_text = response.content.strip()
+            logger.info("LLM response received, processing output")
+            response_text = (_strip_repeat_greetings(raw_text) if asked_question_ids else raw_text) + extra_note
         response_id = next_question_obj.get("id") if next_question_obj and "id" in next_question_obj else next_question_idx
 
     final_response = {
@@ -244,6 +322,9 @@ Next line (what interviewer should say):
         "question_id": response_id,
         "lastQuestion": last_question
     }
+    if route_meta is not None:
+        # Which model produced this turn (and why), for the response meta
+        final_response["meta"] = route_meta
     
     logger.info("Interview Agent response (standard): question_id=%s, endInterview=%s, lastQuestion=%s", 
                 final_response["question_id"], final_response["endInterview"], final_response["lastQuestion"])
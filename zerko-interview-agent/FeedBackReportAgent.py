@@ -1,13 +1,18 @@
 import os
 import time
 import logging
-from typing import List, Literal, Optional, Dict, Any
+from typing import List, Optional, Dict, Any
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field, ValidationError
 from dotenv import load_dotenv
+from utils.circuit_breaker import CircuitOpenError
+from utils.llm_gateway import invoke_structured, raw_text, route_model
+from utils.interview_planner import output_token_limit
+import config
+# Request models live in InterviewModels so the API can validate without loading this module
+from InterviewModels import MessageModel, QuestionModel, FeedBackReportModel
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -15,10 +20,6 @@ logger = logging.getLogger(__name__)
 
 
 # ---- MODELS ----
-class MessageModel(BaseModel):
-    role: str
-    content: str
-    question_id: Optional[int] = None
 
 
 class FeedBackOutput(BaseModel):
@@ -28,20 +29,6 @@ class FeedBackOutput(BaseModel):
     improvements: List[str] = Field(..., description="List of areas where the candidate can improve.")
 
 
-class QuestionModel(BaseModel):
-    id: int
-    question: str
-
-
-class FeedBackReportModel(BaseModel):
-    post: str
-    jobDescription: str
-    resume_data: str
-    transcript: List[MessageModel]
-    question_list: List[QuestionModel]
-    interview_type: Literal["TECHNICAL", "HR", "SYSTEM_DESIGN", "BEHAVIORAL"]
-
-
 # ---- FEEDBACK AGENT ----
 def feedbackReport_agent(
     post: str,
@@ -72,14 +59,34 @@ def feedbackReport_agent(
             post=post,
             jobDescription=jobDescription,
             resume_data=resume_data,
-            transcript=[MessageModel(**m) if not isinstance(m, MessageModel) else m for m in transcript],
-            question_list=[QuestionModel(**q) if not isinstance(q, QuestionModel) else q for q in question_list],
+            transcript=transcript,
+            question_list=question_list,
             interview_type=interview_type
         )
     except ValidationError as e:
         logger.error("Input validation failed: %s", e)
         return {"success": False, "error": "Input validation failed", "details": e.errors()}
 
+    return generate_feedback_report(
+        payload,
+        model_name=model_name,
+        temperature=temperature,
+        max_retries=max_retries,
+        retry_backoff_seconds=retry_backoff_seconds,
+    )
+
+
+def generate_feedback_report(
+    payload: FeedBackReportModel,
+    model_name: Optional[str] = None,
+    temperature: float = 0.5,
+    max_retries: int = 2,
+    retry_backoff_seconds: float = 1.5,
+) -> Dict[str, Any]:
+    """
+    Same as feedbackReport_agent, for a payload that is already validated
+    (the API passes its request model straight through). Returns the same dict.
+    """
 
     # Configurable model/temperature via env vars or args
     model_name = os.getenv("FEEDBACK_MODEL", model_name or "gemini-3-pro")
@@ -93,12 +100,6 @@ def feedbackReport_agent(
     logger.info("Generating feedback: post=%s, type=%s, model=%s, temp=%s, transcript_length=%d", 
                 payload.post, payload.interview_type, model_name, temperature, len(payload.transcript))
 
-    output_parser = PydanticOutputParser(pydantic_object=FeedBackOutput)
-
-    # Initialize ChatGoogleGenerativeAI with API key read from environment variable GOOGLE_API_KEY
-    # The environment must have GOOGLE_API_KEY set before running this script
-    llm = ChatGoogleGenerativeAI(model=model_name, temperature=temperature)
-
     # Convert structured data to readable strings
     transcript_text = "\n".join([f"{msg.role.upper()}: {msg.content}" for msg in payload.transcript])
     questions_text = "\n".join([f"{q.id}. {q.question}" for q in payload.question_list])
@@ -146,13 +147,8 @@ Conclude if the candidate is recommended, needs improvement, or not suitable —
 Provide an overall rating from 1 to 10.
 
 Keep tone objective and concise. Avoid generic fluff.
-
----
-
-{format_instructions}
 """,
         input_variables=["post", "jobDescription", "resume_data", "transcript", "questions", "interview_type"],
-        partial_variables={"format_instructions": output_parser.get_format_instructions()},
     )
 
     formatted_prompt = feedback_prompt.format(
@@ -164,23 +160,48 @@ Keep tone objective and concise. Avoid generic fluff.
         interview_type=payload.interview_type
     )
 
+    # FEEDBACK_MODEL is the primary; the router may pick the light model when it is slow or throttled
+    route = route_model("feedback", len(formatted_prompt), primary=model_name)
+    model_name = route.model
+
+    # Initialize ChatGoogleGenerativeAI with API key read from environment variable GOOGLE_API_KEY
+    # The environment must have GOOGLE_API_KEY set before running this script
+    llm = ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+        max_output_tokens=output_token_limit("feedback", question_count=len(payload.question_list)),
+    )
+    # Schema-constrained output: FeedBackOutput is enforced by Gemini instead of
+    # described in the prompt. include_raw keeps the AIMessage for token usage.
+    structured_llm = llm.with_structured_output(FeedBackOutput, include_raw=True)
+
     last_error = None
-    raw_text = ""
+    output = None
+    parsed_model: Optional[FeedBackOutput] = None
     attempts = 0
 
     for attempt in range(1, max_retries + 1):
         attempts = attempt
         try:
-            response = llm.invoke(formatted_prompt)
-            raw_text = getattr(response, "content", str(response)).strip()
+            parsed_model, output = invoke_structured(
+                structured_llm,
+                formatted_prompt,
+                agent="feedback",
+                model=model_name,
+                retries=config.STRUCTURED_OUTPUT_RETRIES,
+            )
             logger.info("LLM response received (attempt %d).", attempt)
             break
+        except CircuitOpenError:
+            # Quota circuit is open: don't sleep and retry, surface a 429 now
+            logger.warning("Gemini circuit open, skipping feedback retries (attempt %d).", attempt)
+            raise
         except Exception as e:
             last_error = e
             logger.warning("LLM invocation failed on attempt %d: %s", attempt, e)
             time.sleep(retry_backoff_seconds * attempt)
 
-    if raw_text == "":
+    if output is None:
         logger.error("LLM invocation failed after %d attempts: %s", attempts, last_error)
         return {
             "success": False,
@@ -188,27 +209,25 @@ Keep tone objective and concise. Avoid generic fluff.
             "meta": {"model": model_name, "attempts": attempts, "last_error": str(last_error)}
         }
 
-    # Try parsing structured output
-    parsed_model: Optional[FeedBackOutput] = None
     parse_error = None
-    try:
-        parsed_model = output_parser.parse(raw_text)
+    if parsed_model is not None:
         # Ensure rating bounds
         if parsed_model.overall_rating < 1:
             parsed_model.overall_rating = 1
         elif parsed_model.overall_rating > 10:
             parsed_model.overall_rating = 10
         logger.info("Successfully parsed feedback into FeedBackOutput.")
-    except Exception as e:
-        parse_error = e
-        logger.warning("Parsing LLM output into FeedBackOutput failed: %s", e)
+    else:
+        parse_error = output.get("parsing_error") or "structured output missing"
+        logger.warning("Parsing LLM output into FeedBackOutput failed: %s", parse_error)
 
     result = {
         "success": True,
         "parsed": parsed_model.model_dump() if parsed_model else None,
-        "raw": raw_text,
+        "raw": raw_text(output.get("raw")),
         "meta": {
             "model": model_name,
+            "route_reason": route.reason,
             "temperature": temperature,
             "attempts": attempts,
             "parse_error": str(parse_error) if parse_error else None
@@ -242,7 +261,7 @@ if __name__ == "__main__":
         ]
     )
 
-    result = feedbackReport_agent(**sample.model_dump())
+    result = generate_feedback_report(sample)
 
     if result.get("success"):
         print("=== Parsed Feedback ===")
@@ -0,0 +1,51 @@
+"""
+Request models shared by the API layer and the interview/feedback agents.
+
+Kept free of langchain imports so app.py can validate requests without
+loading an agent. Payloads are validated once at the API boundary and the
+validated objects are passed straight to the agents.
+"""
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
+from typing_extensions import NotRequired, TypedDict
+
+InterviewType = Literal["TECHNICAL", "HR", "SYSTEM_DESIGN", "BEHAVIORAL"]
+
+
+# --- Feedback ---
+
+class MessageModel(BaseModel):
+    role: str
+    content: str
+    question_id: Optional[int] = None
+
+
+class QuestionModel(BaseModel):
+    id: int
+    question: str
+
+
+class FeedBackReportModel(BaseModel):
+    post: str
+    jobDescription: str
+    resume_data: str
+    transcript: List[MessageModel]
+    question_list: List[QuestionModel]
+    interview_type: InterviewType
+    user_id: Optional[str] = None  # only used to attribute LLM token usage
+
+
+# --- Interview turns ---
+# The interview agent works on plain dicts and checks for the presence of
+# "question_id", so these are TypedDicts: validated, but still dicts.
+
+class InterviewMessage(TypedDict):
+    role: str
+    content: str
+    question_id: NotRequired[Optional[int]]
+
+
+class InterviewQuestion(TypedDict):
+    id: int
+    question: str
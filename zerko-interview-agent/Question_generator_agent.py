@@ -1,13 +1,13 @@
 # Question_generator_agent.py
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_core.output_parsers import PydanticOutputParser
-from pydantic import BaseModel, Field
-from typing import List
+from functools import lru_cache
+from pydantic import BaseModel, Field, ValidationError, create_model
+from typing import Callable, List, Tuple, Type
 import requests
 import os
 from dotenv import load_dotenv
+import config
 
 load_dotenv()
 
@@ -16,9 +16,18 @@ if not os.getenv("GOOGLE_API_KEY"):
     raise EnvironmentError("Missing GOOGLE_API_KEY in environment variables.")
 
 
-class QuotaExceededError(Exception):
-    """Raised when the Gemini API quota/rate limit is exceeded."""
-    pass
+# Re-exported here for existing importers; defined in a light module so
+# app.py can classify quota errors without loading this agent.
+from utils.errors import QuotaExceededError
+from utils.circuit_breaker import CircuitOpenError
+from utils.errors import QuestionCountMismatch
+from utils.llm_gateway import invoke_structured, raw_text, route_model, stream_llm
+from utils.incremental_json import ITEM, VALUE, IncrementalJSONParser
+from utils.json_schema import response_schema
+from utils.metrics import metrics
+from utils.pdf_extract import extract_pdf_pages
+from utils.text_normalizer import NormalizationReport, normalize_pages
+from utils.interview_planner import output_token_limit, plan_questions
 
 
 # ---- Pydantic Model for structured output ----
@@ -31,38 +40,54 @@ class InterviewOutput(BaseModel):
     interview_summary: str = Field(..., description="2–3 line summary describing interview focus.")
 
 
-def parse_Resume(resume_url: str) -> str:
-    """Download and extract text from resume PDF, return text content."""
+@lru_cache(maxsize=None)
+def interview_output_model(question_count: int) -> Type[InterviewOutput]:
+    """InterviewOutput whose schema requires exactly question_count questions."""
+    return create_model(
+        f"InterviewOutput{question_count}",
+        __base__=InterviewOutput,
+        questions=(
+            List[Question],
+            Field(
+                ...,
+                min_length=question_count,
+                max_length=question_count,
+                description=f"Exactly {question_count} interview questions.",
+            ),
+        ),
+    )
+
+
+def download_resume(resume_url: str) -> bytes:
+    """Download the resume PDF and return its raw bytes."""
     try:
         resp = requests.get(resume_url, timeout=15)
         resp.raise_for_status()
     except Exception as e:
         raise RuntimeError(f"Failed to download resume from {resume_url}: {e}")
+    return resp.content
 
-    tmp_path = "temp_resume.pdf"
-    with open(tmp_path, "wb") as f:
-        f.write(resp.content)
 
-    try:
-        loader = PyMuPDFLoader(tmp_path)
-        documents = loader.load()
-        if not documents:
-            raise RuntimeError("No pages found in resume PDF.")
-        page_content = "\n".join([d.page_content for d in documents])
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+def parse_resume_with_report(resume_url: str) -> Tuple[str, NormalizationReport]:
+    """
+    Download, extract and normalize the resume. Returns the normalized text
+    that every agent consumes, and a report of what normalization removed.
+    """
+    # Runs on the PDF process pool so CPU-heavy PDFs don't hold this process's GIL
+    pages = extract_pdf_pages(download_resume(resume_url))
+    return normalize_pages(pages)
 
-    return page_content
 
+def parse_Resume(resume_url: str) -> str:
+    """Download and extract text from resume PDF, return normalized text content."""
+    return parse_resume_with_report(resume_url)[0]
 
-def get_questions(post: str, job_description: str, resume_data: str, interviewType: str, duration: str):
-    """Generate structured interview questions using PydanticOutputParser."""
-    output_parser = PydanticOutputParser(pydantic_object=InterviewOutput)
 
-    # ---- Prompt Template ----
-    prompt = PromptTemplate(
-        template="""
+# ---- Prompt Template ----
+# The response schema (InterviewOutput) is sent to Gemini as a structured
+# output constraint, so the prompt no longer carries format instructions.
+QUESTIONS_PROMPT = PromptTemplate(
+    template="""
 You are an **AI Interview Agent** representing a hiring company.
 Your responsibility is to evaluate whether the candidate is suitable for the given position and generate relevant interview questions.
 
@@ -80,69 +105,147 @@ Analyze both the **Job Description** and the **Candidate's Resume** carefully.
 **Interview Type:** {interviewType}  
 **Duration:** {duration}
 
----
-
-{format_instructions}
+{plan_instructions}
 """,
-        input_variables=["post", "JobDescription", "resume_data", "interviewType", "duration"],
-        partial_variables={"format_instructions": output_parser.get_format_instructions()},
-    )
+    input_variables=["post", "JobDescription", "resume_data", "interviewType", "duration", "plan_instructions"],
+)
 
-    final_prompt = prompt.format(
+
+def _build_prompt(post: str, job_description: str, resume_data: str, interviewType: str, duration: str, plan) -> str:
+    return QUESTIONS_PROMPT.format(
         post=post,
         JobDescription=job_description,
         resume_data=resume_data,
         interviewType=interviewType,
         duration=duration,
+        plan_instructions=plan.prompt_instructions(),
     )
 
+
+def _llm_error(e: Exception) -> Exception:
+    """The exception to raise for a failed LLM call."""
+    err_str = str(e)
+    # Catch quota/rate limit errors by type name or message content
+    if (
+        "ResourceExhausted" in type(e).__name__
+        or "429" in err_str
+        or "quota" in err_str.lower()
+        or "rate" in err_str.lower()
+    ):
+        return QuotaExceededError(err_str)
+    return RuntimeError(f"LLM invocation failed: {e}")
+
+
+def get_questions(post: str, job_description: str, resume_data: str, interviewType: str, duration: str):
+    """
+    Generate structured interview questions with schema-constrained output.
+    The question count and output token budget are planned locally from the
+    duration and interview type (utils/interview_planner.py).
+    The result carries a "meta" entry describing the routed model and the plan.
+    """
+    plan = plan_questions(duration, interviewType)
+    final_prompt = _build_prompt(post, job_description, resume_data, interviewType, duration, plan)
+
     # ---- LLM ----
-    model_name = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
-    llm = ChatGoogleGenerativeAI(model=model_name, temperature=0.7)
+    route = route_model("questions", len(final_prompt))
+    llm = ChatGoogleGenerativeAI(
+        model=route.model,
+        temperature=0.7,
+        max_output_tokens=output_token_limit("questions", plan=plan),
+    )
+    # include_raw keeps the AIMessage so the gateway can read its token usage
+    structured_llm = llm.with_structured_output(interview_output_model(plan.question_count), include_raw=True)
 
     try:
-        response = llm.invoke(final_prompt)
+        parsed_output, output = invoke_structured(
+            structured_llm,
+            final_prompt,
+            agent="questions",
+            model=route.model,
+            retries=config.STRUCTURED_OUTPUT_RETRIES,
+        )
+    except CircuitOpenError:
+        # Quota circuit is open: fail fast, the API maps this to a 429
+        raise
     except Exception as e:
-        err_str = str(e)
-        # Catch quota/rate limit errors by type name or message content
-        if (
-            "ResourceExhausted" in type(e).__name__
-            or "429" in err_str
-            or "quota" in err_str.lower()
-            or "rate" in err_str.lower()
-        ):
-            raise QuotaExceededError(err_str)
-        raise RuntimeError(f"LLM invocation failed: {e}")
-
-    # ---- Extract text ----
-    if hasattr(response, "content"):
-        if isinstance(response.content, list):
-            text_output = "".join(
-                [chunk.get("text", "") for chunk in response.content if isinstance(chunk, dict)]
-            )
-        else:
-            text_output = str(response.content)
-    else:
-        text_output = str(response)
-
-    # ---- Parse with Pydantic Parser, fallback to raw JSON extraction ----
+        raise _llm_error(e)
+
+    if parsed_output is None:
+        raise RuntimeError(
+            f"Could not parse structured output from LLM.\n\nRaw output:\n{raw_text(output.get('raw'))}"
+            f"\n\nParse error: {output.get('parsing_error')}"
+        )
+    return {**parsed_output.model_dump(), "meta": {**route.as_meta(), "plan": plan.as_meta()}}
+
+
+def stream_questions(
+    post: str,
+    job_description: str,
+    resume_data: str,
+    interviewType: str,
+    duration: str,
+    on_event: Callable[[str, dict], None],
+):
+    """
+    Streaming variant of get_questions. Gemini is asked for JSON matching the
+    planned schema and its output is parsed while it is generated:
+
+      on_event("plan", {...})                   before the call
+      on_event("question", {"id", "question"})  as soon as each question is complete
+      on_event("summary", {"interview_summary"}) once the summary is complete
+
+    Returns the same dict as get_questions after validating the whole
+    document. Questions have already been emitted by then, so a parse failure
+    is not regenerated; it raises, with QuestionCountMismatch when the model
+    generated a different number of questions than planned. An exception
+    raised by on_event aborts the stream (e.g. when the client has gone away).
+    """
+    plan = plan_questions(duration, interviewType)
+    on_event("plan", plan.as_meta())
+    final_prompt = _build_prompt(post, job_description, resume_data, interviewType, duration, plan)
+    schema = interview_output_model(plan.question_count)
+
+    route = route_model("questions", len(final_prompt))
+    llm = ChatGoogleGenerativeAI(
+        model=route.model,
+        temperature=0.7,
+        max_output_tokens=output_token_limit("questions", plan=plan),
+        response_mime_type="application/json",
+        response_schema=response_schema(schema),
+    )
+
+    parser = IncrementalJSONParser()
+    document = {}
+
+    def on_token(text: str) -> None:
+        for kind, key, value in parser.feed(text):
+            if kind == ITEM and key == "questions":
+                on_event("question", Question.model_validate(value).model_dump())
+            elif kind == VALUE:
+                document[key] = value
+                if key == "interview_summary":
+                    on_event("summary", {"interview_summary": value})
+
+    try:
+        message = stream_llm(llm, final_prompt, agent="questions", on_token=on_token, model=route.model)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise _llm_error(e)
+
+    metrics.incr("structured_output_calls_total", agent="questions")
+    received = len(document.get("questions") or [])
+    if received != plan.question_count:
+        metrics.incr("structured_output_parse_failures_total", agent="questions")
+        raise QuestionCountMismatch(plan.question_count, received)
     try:
-        parsed_output = output_parser.parse(text_output)
-        return parsed_output.dict()
-    except Exception as primary_err:
-        # Fallback: extract JSON block from the raw output
-        import re, json
-        json_match = re.search(r'\{.*\}', text_output, re.DOTALL)
-        if json_match:
-            try:
-                raw_json = json.loads(json_match.group())
-                parsed_output = InterviewOutput(**raw_json)
-                return parsed_output.dict()
-            except Exception:
-                pass
+        parsed_output = schema.model_validate(document)
+    except ValidationError as e:
+        metrics.incr("structured_output_parse_failures_total", agent="questions")
         raise RuntimeError(
-            f"Could not parse structured output from LLM.\n\nRaw output:\n{text_output}\n\nParse error: {primary_err}"
+            f"Could not parse structured output from LLM.\n\nRaw output:\n{raw_text(message)}\n\nParse error: {e}"
         )
+    return {**parsed_output.model_dump(), "meta": {**route.as_meta(), "plan": plan.as_meta()}}
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 import os
 import logging
+from functools import lru_cache
+from typing import Optional, Tuple
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
 from langchain_core.prompts import ChatPromptTemplate
@@ -8,20 +10,19 @@ from dotenv import load_dotenv
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from google.api_core.exceptions import GoogleAPIError
 import config
+from utils.circuit_breaker import circuits_open
+from utils.llm_gateway import invoke_structured, route_model
+from utils.model_router import RouteDecision, model_router
+from utils.interview_planner import output_token_limit
 
 load_dotenv()
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-llm = ChatGoogleGenerativeAI(
-    model=os.getenv("GEMINI_MODEL", "gemini-2.0-flash"),
-    temperature=0,
-    max_retries=2,
-)
-
-# --- THE STRUCTURED CHAIN ---
-structured_llm = llm.with_structured_output(AnalysisResult)
+# Part of the analysis cache key: bump whenever analysis_prompt or AnalysisResult
+# changes so results produced by the old prompt are no longer served.
+PROMPT_VERSION = "1"
 
 analysis_prompt = ChatPromptTemplate.from_messages([
     ("system", """
@@ -53,8 +54,22 @@ analysis_prompt = ChatPromptTemplate.from_messages([
     """)
 ])
 
-# Create the Chain (Prompt -> LLM -> JSON Parser)
-analysis_chain = analysis_prompt | structured_llm
+# --- THE STRUCTURED CHAIN ---
+@lru_cache(maxsize=4)
+def get_analysis_chain(model_name: str):
+    """
+    Build the Prompt -> LLM -> JSON Parser chain on first use, one per routed model.
+    Constructing the Gemini client at import time slowed every cold start.
+    """
+    llm = ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=0,
+        max_retries=2,
+        max_output_tokens=output_token_limit("analysis"),
+    )
+    # include_raw keeps the AIMessage so the gateway can read its token usage
+    structured_llm = llm.with_structured_output(AnalysisResult, include_raw=True)
+    return analysis_prompt | structured_llm
 
 # --- RETRY CONFIGURATION ---
 def should_retry_exception(exception):
@@ -66,8 +81,13 @@ def should_retry_exception(exception):
             return True
     return False
 
+def _analysis_circuits_open(_retry_state=None) -> bool:
+    """tenacity stop condition: neither model a retry could be routed to is accepting calls."""
+    return circuits_open([model_router.primary_model("analysis"), model_router.light_model()])
+
 @retry(
-    stop=stop_after_attempt(config.GEMINI_MAX_RETRIES),
+    # Stop as soon as the quota circuits open instead of sleeping through backoff
+    stop=stop_after_attempt(config.GEMINI_MAX_RETRIES) | _analysis_circuits_open,
     wait=wait_exponential(
         multiplier=config.GEMINI_RETRY_MULTIPLIER, 
         min=config.GEMINI_RETRY_MIN_WAIT, 
@@ -76,19 +96,25 @@ def should_retry_exception(exception):
     retry=retry_if_exception_type((ChatGoogleGenerativeAIError, GoogleAPIError)),
     reraise=False  # Don't reraise after all attempts fail
 )
-def _call_gemini_with_retry(resume_text: str, jd_text: str, formatting_issues: str) -> AnalysisResult:
+def _call_gemini_with_retry(resume_text: str, jd_text: str, formatting_issues: str) -> Tuple[AnalysisResult, RouteDecision]:
     """
-    Internal function that calls Gemini with retry logic
+    Internal function that calls Gemini with retry logic.
+    Returns the result and the route (model) that produced it.
     """
-    logger.info("🤖 Attempting Gemini API call...")
+    resume_text = resume_text[:30000]
+    jd_text = jd_text[:10000]
+    route = route_model("analysis", len(resume_text) + len(jd_text) + len(formatting_issues))
+    logger.info(f"🤖 Attempting Gemini API call (model={route.model}, reason={route.reason})...")
     try:
-        result: AnalysisResult = analysis_chain.invoke({
-            "resume_text": resume_text[:30000], 
-            "jd_text": jd_text[:10000],
+        result, output = invoke_structured(get_analysis_chain(route.model), {
+            "resume_text": resume_text, 
+            "jd_text": jd_text,
             "formatting_issues": formatting_issues
-        })
+        }, agent="analysis", model=route.model)
+        if result is None:
+            raise ValueError(f"Structured output could not be parsed: {output.get('parsing_error')}")
         logger.info("✅ Gemini API call successful")
-        return result
+        return result, route
     except Exception as e:
         logger.warning(f"⚠️ Gemini API call failed: {str(e)}")
         raise
@@ -165,24 +191,37 @@ def analyze_resume(resume_text: str, jd_text: str, formatting_issues: list[str])
     Returns a dictionary that matches the AnalysisResult Pydantic schema.
     Never raises exceptions - always returns a valid response.
     """
+    analysis, _ = analyze_resume_with_route(resume_text, jd_text, formatting_issues)
+    return analysis
+
+
+def analyze_resume_with_route(
+    resume_text: str, jd_text: str, formatting_issues: list[str]
+) -> Tuple[dict, Optional[RouteDecision]]:
+    """
+    analyze_resume(), plus the route that produced the result: None for the
+    fallback analysis. The analysis cache uses it to store primary-model
+    results only.
+    """
     formatting_issues_str = ", ".join(formatting_issues) if formatting_issues else "None detected"
     
     try:
         logger.info("🚀 Starting resume analysis with retry mechanism")
         
         # Try Gemini API with retry logic
-        result = _call_gemini_with_retry(resume_text, jd_text, formatting_issues_str)
+        attempt = _call_gemini_with_retry(resume_text, jd_text, formatting_issues_str)
         
-        if result:
-            logger.info("✅ Analysis completed successfully via Gemini API")
-            return result.model_dump()
+        if attempt:
+            result, route = attempt
+            logger.info(f"✅ Analysis completed successfully via Gemini API (model={route.model})")
+            return result.model_dump(), route
         else:
             logger.warning("⚠️ Gemini API returned empty result, using fallback")
-            return _create_fallback_analysis(resume_text, jd_text, formatting_issues)
+            return _create_fallback_analysis(resume_text, jd_text, formatting_issues), None
             
     except Exception as e:
         logger.error(f"❌ All Gemini API retry attempts failed: {str(e)}")
         logger.info("🔄 Switching to fallback analysis mode")
         
         # Return fallback analysis instead of crashing
-        return _create_fallback_analysis(resume_text, jd_text, formatting_issues)
\ No newline at end of file
+        return _create_fallback_analysis(resume_text, jd_text, formatting_issues), None
\ No newline at end of file
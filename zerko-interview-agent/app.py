@@ -1,65 +1,133 @@
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Dict, Literal, Annotated, Optional
 from fastapi.middleware.cors import CORSMiddleware
-from prisma import Prisma
+from prisma import Json, Prisma
 import os
 import logging
 import time
+import datetime
+import uuid
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Import quota error — also try to import google's ResourceExhausted directly
-from Question_generator_agent import get_questions, parse_Resume, QuotaExceededError
-from AI_interview_agent import interview_agent_auto_number as interview_agent_fn
-from FeedBackReportAgent import feedbackReport_agent
-from service import process_resume_analysis
+import config
+from utils.errors import QuestionCountMismatch, is_quota_error
+from utils.lazy import LazyModule, warm_up, import_report, mark
+from utils.draining import InflightTasks
+from utils.metrics import metrics
+import utils.circuit_breaker  # noqa: F401  (registers the Gemini circuit gauge)
+from utils.singleflight import SingleFlight, make_key
+from utils.analysis_jobs import analysis_jobs
+from utils.pubsub import pubsub, analysis_topic, interview_topic
+from utils import pdf_extract, analysis_cache
+from utils.load_shedding import LoadSheddingMiddleware
+from utils.usage import usage_scope, usage_tracker
+from utils.loop_watchdog import loop_watchdog
+from utils import profiling
+from concurrent.futures import ThreadPoolExecutor
+from anyio import to_thread
+from InterviewModels import FeedBackReportModel, InterviewMessage, InterviewQuestion
+import json
 from contextlib import asynccontextmanager
-
-try:
-    from google.api_core.exceptions import ResourceExhausted as GoogleResourceExhausted
-except ImportError:
-    GoogleResourceExhausted = None
-
-
-def is_quota_error(e: Exception) -> bool:
-    """Reliably detect Gemini quota/rate-limit errors regardless of wrapping."""
-    if isinstance(e, QuotaExceededError):
-        return True
-    if GoogleResourceExhausted and isinstance(e, GoogleResourceExhausted):
-        return True
-    err_str = str(e)
-    type_name = type(e).__name__
-    return (
-        "ResourceExhausted" in type_name
-        or "429" in err_str
-        or "quota exceeded" in err_str.lower()
-        or "rate limit" in err_str.lower()
-    )
+import asyncio
+
+# Agents are loaded on first use (or by the background warm-up) so the
+# container can bind its port without paying for langchain/google-genai first.
+question_agent = LazyModule("Question_generator_agent")
+interview_agent = LazyModule("AI_interview_agent")
+feedback_agent = LazyModule("FeedBackReportAgent")
+resume_service = LazyModule("service")
+
+# Heavy third-party packages, imported one by one during warm-up so the
+# import report attributes their cost individually.
+WARMUP_DEPENDENCIES = [
+    "langchain_core.prompts",
+    "langchain_google_genai",
+    "langchain_community.document_loaders",
+    "tenacity",
+]
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-db=Prisma()
+
+def quota_http_exception(e: Exception) -> HTTPException:
+    """429 for quota errors, with Retry-After when the circuit breaker knows the cool-down."""
+    retry_after = getattr(e, "retry_after", None)
+    headers = {"Retry-After": str(retry_after)} if retry_after else None
+    return HTTPException(
+        status_code=429,
+        detail="AI service quota exceeded. Please try again later.",
+        headers=headers,
+    )
+
+# Analyses run detached from the request; tracked per worker for draining
+inflight_analyses = InflightTasks()
+
+# Duplicate concurrent requests (retries, strict mode, double clicks) share one computation
+parse_flight = SingleFlight("parse")
+questions_flight = SingleFlight("questions")
+
+async def _warm_up_agents():
+    # Give uvicorn a moment to bind the port before competing for the GIL
+    await asyncio.sleep(config.WARMUP_DELAY_SECONDS)
+    await asyncio.to_thread(
+        warm_up,
+        [question_agent, interview_agent, feedback_agent, resume_service],
+        WARMUP_DEPENDENCIES,
+    )
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Explicit threadpool sizes: AnyIO's runs the sync endpoints,
+    # the loop's default executor runs asyncio.to_thread work
+    to_thread.current_default_thread_limiter().total_tokens = config.THREADPOOL_SIZE
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=config.THREADPOOL_SIZE, thread_name_prefix="asyncio")
+    )
+    # Runs once per worker process: each worker owns its own Prisma client
+    # (and query engine), created here rather than at import time so the
+    # multi-worker supervisor process never opens a connection.
+    db = Prisma()
+    app.state.db = db
     try:
         await db.connect()
-        logging.info("Connected to DB")
+        logging.info(f"Connected to DB (worker pid={os.getpid()})")
     except Exception as e:
         logging.warning(f"Could not connect to DB: {e}")
         logging.info("Running without database connection")
+    mark("lifespan_started")
+    if config.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
+    warmup_task = asyncio.create_task(_warm_up_agents()) if config.WARMUP_ENABLED else None
+    usage_task = asyncio.create_task(usage_tracker.run_flusher(db)) if config.USAGE_TRACKING_ENABLED else None
+    purge_task = asyncio.create_task(analysis_cache.run_purger(db)) if config.ANALYSIS_CACHE_ENABLED else None
     yield
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    if purge_task:
+        purge_task.cancel()
+    await inflight_analyses.drain(config.SHUTDOWN_DRAIN_TIMEOUT)
+    pdf_extract.shutdown_pool()
+    if usage_task:
+        # Cancelling makes the flusher write what is still pending
+        usage_task.cancel()
+        try:
+            await usage_task
+        except (asyncio.CancelledError, Exception):
+            pass
+    await loop_watchdog.stop()
     try:
         await db.disconnect()
-        logging.info("Disconnected from DB")
+        logging.info(f"Disconnected from DB (worker pid={os.getpid()})")
     except Exception as e:
         logging.warning(f"Error disconnecting from DB: {e}")
 
-app = FastAPI(title="AI Interview Agent API",lifespan=lifespan)
+app = FastAPI(title="AI Interview Agent API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS
 # Build origins list and filter out falsy values; keep wildcard only if explicitly set
@@ -73,6 +141,9 @@ origins = [o for o in raw_origins if o]
 if allow_wildcard:
     origins = ["*"]
 
+# Added before CORS so shed 503s still carry CORS headers
+app.add_middleware(LoadSheddingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -84,23 +155,8 @@ app.add_middleware(
 # ----------------------------
 # Schemas
 # ----------------------------
-class MessageModel(BaseModel):
-    role: str
-    content: str
-
-
-class QuestionModel(BaseModel):
-    id: int
-    question: str
-
-
-class FeedBackReportRequestModel(BaseModel):
-    post: str
-    jobDescription: str
-    resume_data: str
-    transcript: List[MessageModel]
-    question_list: List[QuestionModel]
-    interview_type: Literal["TECHNICAL", "HR", "SYSTEM_DESIGN", "BEHAVIORAL"]
+# Feedback payloads use the agent's own model so they are validated only once
+FeedBackReportRequestModel = FeedBackReportModel
 
 
 class GenerateQuestionsRequest(BaseModel):
@@ -109,24 +165,43 @@ class GenerateQuestionsRequest(BaseModel):
     resumeData: str
     interview_type: Literal["TECHNICAL", "BEHAVIORAL", "HR", "SYSTEM_DESIGN"]
     duration: str  # e.g., "10m"
+    # Optional, only used to attribute LLM token usage
+    interview_id: Optional[str] = None
+    user_id: Optional[str] = None
 
 class InterviewRequest(BaseModel):
     post: str
     job_description: str
     resumeData: str
     interview_type: Literal["TECHNICAL", "BEHAVIORAL", "HR", "SYSTEM_DESIGN"]
-    questions: List[Dict]
-    messages: List[Dict]
+    questions: List[InterviewQuestion]
+    messages: List[InterviewMessage]
     time_left: Optional[int] = None  # milliseconds remaining
     force_next: Optional[bool] = False
+    # Optional, only used to attribute LLM token usage
+    interview_id: Optional[str] = None
+    user_id: Optional[str] = None
 
 class ParseResume(BaseModel):
     resumeUrl: Annotated[str, Field(description="URL of the resume to be parsed")]
+    user_id: Annotated[Optional[str], Field(description="Requesting user, for usage accounting")] = None
 
 class ResumeAnalysisRequest(BaseModel):
     resumeId: Annotated[str,Field(description="Id of the resume for analysis")]
     fileUrl: Annotated[str,Field(description="URL of the resume file")]
     JobDescription: Annotated[str,Field(description="Details about the Job Role")]
+    userId: Annotated[Optional[str], Field(description="Owner of the resume, for usage accounting")] = None
+
+class ReanalyzeRequest(BaseModel):
+    JobDescription: Annotated[str, Field(description="Details about the new Job Role")]
+    title: Annotated[Optional[str], Field(description="Title of the new analysis; defaults to the source's")] = None
+
+class ProfilingSettings(BaseModel):
+    sample_rate: Annotated[float, Field(ge=0, le=1, description="Fraction of requests to profile; 0 turns sampling off")]
+    targets: Annotated[
+        Optional[List[Literal["interview", "feedback", "parse", "analysis"]]],
+        Field(description="Targets the rate applies to; defaults to all"),
+    ] = None
 
 
 
@@ -139,19 +214,91 @@ class ResumeAnalysisRequest(BaseModel):
 def healthcheck():
     return {"success": True, "health": "Working perfectly! API connected."}
 
+@app.get("/health/startup")
+def startup_report():
+    """Cold-start timings: startup milestones and per-module import cost."""
+    return {"success": True, "report": import_report()}
+
+@app.get("/health/loop")
+def loop_health():
+    """Event-loop lag and the stacks captured for recent stalls (this worker)."""
+    return {"success": True, "pid": os.getpid(), **loop_watchdog.snapshot(), "recent_stalls": loop_watchdog.recent_stalls()}
+
+@app.get("/metrics")
+def get_metrics():
+    """In-process counters and gauges for this worker."""
+    return {"success": True, "pid": os.getpid(), **metrics.snapshot()}
+
+# ----------------------------
+# Profiling (admin, X-Profile-Token)
+# ----------------------------
+def require_profiling_token(request: Request) -> None:
+    if not profiling.enabled():
+        raise HTTPException(status_code=404, detail="Profiling is disabled (PROFILING_TOKEN is not set)")
+    if not profiling.token_valid(request.headers.get(profiling.HEADER)):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+@app.post("/admin/profiling")
+def set_profiling(settings: ProfilingSettings, request: Request):
+    """Profile a sample of requests in this worker; requests with the token header are always profiled."""
+    require_profiling_token(request)
+    return {"success": True, "pid": os.getpid(), "sample_rates": profiling.set_sample_rate(settings.sample_rate, settings.targets)}
+
+@app.get("/admin/profiles")
+def list_profiles(request: Request):
+    """Stored profiles, newest first, without their hotspots."""
+    require_profiling_token(request)
+    profiles = []
+    for profile_id in profiling.list_ids():
+        summary = profiling.load_summary(profile_id)
+        if summary:
+            summary.pop("hotspots", None)
+            profiles.append(summary)
+    return {"success": True, "sample_rates": profiling.sample_rates(), "profiles": profiles}
+
+@app.get("/admin/profiles/{profile_id}")
+def get_profile(profile_id: str, request: Request):
+    """Profile metadata and its top functions by cumulative time."""
+    require_profiling_token(request)
+    summary = profiling.load_summary(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {"success": True, "profile": summary}
+
+@app.get("/admin/profiles/{profile_id}/download")
+def download_profile(profile_id: str, request: Request):
+    """The raw pstats file (snakeviz, `python -m pstats`)."""
+    require_profiling_token(request)
+    path = profiling.artifact_path(profile_id, ".prof")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
 # ----------------------------
 # Resume parsing
 # ----------------------------
 @app.post("/api/parse")
-def get_resume_data(req: ParseResume):
+def get_resume_data(req: ParseResume, request: Request):
     try:
         logger.info("[PARSE] resumeUrl=%s", req.resumeUrl)
-        data = parse_Resume(req.resumeUrl)
-        return {"success": True, "resumeData": data}
+        with usage_scope(user_id=req.user_id), \
+                profiling.profile_request("parse", request.headers), profiling.profiled():
+            (data, report), shared = parse_flight.do(
+                req.resumeUrl.strip(), question_agent.parse_resume_with_report, req.resumeUrl
+            )
+        if shared:
+            logger.info("[PARSE] Coalesced with in-flight parse of the same resume")
+        else:
+            logger.info(
+                "[PARSE] normalized %d -> %d chars (~%d tokens saved, %d furniture lines, %d garbage chars)",
+                report.chars_before, report.chars_after, report.tokens_before - report.tokens_after,
+                report.furniture_lines, report.garbage_chars,
+            )
+        return {"success": True, "resumeData": data, "normalization": report.as_dict()}
     except Exception as e:
         if is_quota_error(e):
             logger.warning("[PARSE] Gemini API quota exceeded")
-            raise HTTPException(status_code=429, detail="AI service quota exceeded. Please try again later.")
+            raise quota_http_exception(e)
         logging.exception("Error parsing resume")
         raise HTTPException(status_code=500, detail=f"Error parsing resume: {e}")
 
@@ -167,51 +314,141 @@ def generate_questions(req: GenerateQuestionsRequest):
             len(req.job_description) if req.job_description else 0,
             len(req.resumeData) if req.resumeData else 0,
         )
-        output = get_questions(
-            post=req.post,
-            job_description=req.job_description,
-            resume_data=req.resumeData,
-            interviewType=req.interview_type,
-            duration=req.duration,
-        )
-        return {"success": True, "data": output}
+        key = make_key(req.post, req.job_description, req.resumeData, req.interview_type, req.duration)
+        with usage_scope(interview_id=req.interview_id, user_id=req.user_id):
+            output, shared = questions_flight.do(
+                key,
+                question_agent.get_questions,
+                post=req.post,
+                job_description=req.job_description,
+                resume_data=req.resumeData,
+                interviewType=req.interview_type,
+                duration=req.duration,
+            )
+        if shared:
+            logger.info("[GENERATE_QUESTIONS] Coalesced with identical in-flight request")
+        # Copy rather than pop: coalesced callers share the same result dict
+        data = {k: v for k, v in output.items() if k != "meta"}
+        return {"success": True, "data": data, "meta": output.get("meta")}
     except Exception as e:
         if is_quota_error(e):
             logger.warning("[GENERATE_QUESTIONS] Gemini API quota exceeded")
-            raise HTTPException(status_code=429, detail="AI service quota exceeded. Please try again later.")
+            raise quota_http_exception(e)
         logging.exception("Error generating questions")
         raise HTTPException(status_code=500, detail=f"Error generating questions: {e}")
 
+@app.post("/api/generate/questions/stream")
+async def stream_generated_questions(req: GenerateQuestionsRequest):
+    """
+    Server-sent events variant of /api/generate/questions. Events:
+      plan      {minutes, question_count, ...}, before generation starts
+      question  {id, question}, as soon as each question has been generated
+      summary   {interview_summary}
+      completed same body as /api/generate/questions
+      error     {code, detail, expected, received}; the questions already sent
+                are not the planned set (code "question_count_mismatch")
+      failed    {status, detail}; status 429 for quota errors
+    The stream ends after a completed, error or failed event. The interview
+    can start on the first question while the rest are generated.
+    """
+    logger.info(
+        "[GENERATE_QUESTIONS_STREAM] post=%s | type=%s | duration=%s | resume_data_len=%d",
+        req.post, req.interview_type, req.duration, len(req.resumeData) if req.resumeData else 0,
+    )
+    agent = await question_agent.aload()
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    disconnected = False
+
+    def on_event(event: str, data: dict) -> None:
+        # Called from the generation thread; raising here aborts the Gemini stream
+        if disconnected:
+            raise RuntimeError("client disconnected")
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    async def generate():
+        try:
+            with usage_scope(interview_id=req.interview_id, user_id=req.user_id):
+                output = await asyncio.to_thread(
+                    agent.stream_questions,
+                    post=req.post,
+                    job_description=req.job_description,
+                    resume_data=req.resumeData,
+                    interviewType=req.interview_type,
+                    duration=req.duration,
+                    on_event=on_event,
+                )
+            data = {k: v for k, v in output.items() if k != "meta"}
+            events.put_nowait(("completed", {"success": True, "data": data, "meta": output.get("meta")}))
+        except QuestionCountMismatch as e:
+            logger.warning(f"[GENERATE_QUESTIONS_STREAM] {e}")
+            events.put_nowait(("error", {
+                "code": "question_count_mismatch",
+                "detail": str(e),
+                "expected": e.expected,
+                "received": e.received,
+            }))
+        except Exception as e:
+            if is_quota_error(e):
+                logger.warning("[GENERATE_QUESTIONS_STREAM] Gemini API quota exceeded")
+                error = quota_http_exception(e)
+                events.put_nowait(("failed", {"status": error.status_code, "detail": error.detail}))
+            else:
+                logger.exception("Error streaming questions")
+                events.put_nowait(("failed", {"status": 500, "detail": f"Error generating questions: {e}"}))
+
+    async def event_stream():
+        nonlocal disconnected
+        task = asyncio.create_task(generate())  # noqa: F841  (held so it isn't garbage collected)
+        try:
+            while True:
+                event, data = await events.get()
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                if event in ("completed", "error", "failed"):
+                    break
+        finally:
+            # If the client went away, the generation thread stops at its next event
+            disconnected = True
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # ----------------------------
 # Interview Flow
 # ----------------------------
 @app.post("/api/interview/next")
-def get_next_interview_question(req: InterviewRequest):
+def get_next_interview_question(req: InterviewRequest, request: Request):
     try:
         logger.info(
             "[INTERVIEW_NEXT] post=%s | type=%s | messages=%d | questions=%d | time_left=%s | resume_data_len=%d",
             req.post, req.interview_type, len(req.messages), len(req.questions),
             req.time_left, len(req.resumeData) if req.resumeData else 0,
         )
-        result = interview_agent_fn(
-            Post=req.post,
-            JobDescription=req.job_description,
-            resume_data=req.resumeData,
-            questions_list=req.questions,
-            messages=req.messages,
-            time_left=req.time_left,
-            force_next=req.force_next,
-        )
+        with usage_scope(interview_id=req.interview_id, user_id=req.user_id), \
+                profiling.profile_request("interview", request.headers, label=req.interview_id or ""), \
+                profiling.profiled():
+            result = interview_agent.interview_agent_auto_number(
+                Post=req.post,
+                JobDescription=req.job_description,
+                resume_data=req.resumeData,
+                questions_list=req.questions,
+                messages=req.messages,
+                time_left=req.time_left,
+                force_next=req.force_next,
+            )
         return {"success": True, "data": result}
     except Exception as e:
         if is_quota_error(e):
             logger.warning("[INTERVIEW_NEXT] Gemini API quota exceeded")
-            raise HTTPException(status_code=429, detail="AI service quota exceeded. Please try again later.")
+            raise quota_http_exception(e)
         logging.exception("Error during interview")
         raise HTTPException(status_code=500, detail=f"Error during interview: {e}")
 
 @app.post("/api/feedback/{interview_id}")
-async def generate_interview_feedback(interview_id: str, req: FeedBackReportRequestModel):
+async def generate_interview_feedback(interview_id: str, req: FeedBackReportRequestModel, request: Request):
     """
     POST endpoint that generates and returns interview feedback.
     Uses feedbackReport_agent which returns a dict with keys:
@@ -227,18 +464,17 @@ async def generate_interview_feedback(interview_id: str, req: FeedBackReportRequ
             len(req.transcript), len(req.question_list),
             len(req.resume_data) if req.resume_data else 0,
         )
-        feedback_result = feedbackReport_agent(
-            post=req.post,
-            jobDescription=req.jobDescription,
-            resume_data=req.resume_data,
-            transcript=[m.dict() if hasattr(m, "dict") else m for m in req.transcript],
-            question_list=[q.dict() if hasattr(q, "dict") else q for q in req.question_list],
-            interview_type=req.interview_type,
-        )
+        pubsub.publish(interview_topic(interview_id), {"event": "stage", "data": {"stage": "generating_feedback"}})
+        agent = await feedback_agent.aload()
+        # In a thread: the call may queue behind interactive turns for a Gemini slot
+        with usage_scope(interview_id=interview_id, user_id=req.user_id), \
+                profiling.profile_request("feedback", request.headers, label=interview_id):
+            feedback_result = await asyncio.to_thread(profiling.call, agent.generate_feedback_report, req)
     except Exception as e:
+        pubsub.publish(interview_topic(interview_id), {"event": "failed", "data": {"error": str(e)}})
         if is_quota_error(e):
             logger.warning("[FEEDBACK] Gemini API quota exceeded for interview %s", interview_id)
-            raise HTTPException(status_code=429, detail="AI service quota exceeded. Please try again later.")
+            raise quota_http_exception(e)
         logger.exception("Unhandled error while generating feedback for interview %s", interview_id)
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -246,6 +482,7 @@ async def generate_interview_feedback(interview_id: str, req: FeedBackReportRequ
         # Provide useful error details when available
         detail = feedback_result.get("error") or feedback_result.get("meta") or "Failed to generate feedback"
         logger.error("Feedback agent failed for interview %s: %s", interview_id, detail)
+        pubsub.publish(interview_topic(interview_id), {"event": "failed", "data": {"error": str(detail)}})
         raise HTTPException(status_code=500, detail=detail)
 
     # Build response: prefer parsed structured output when available
@@ -261,6 +498,9 @@ async def generate_interview_feedback(interview_id: str, req: FeedBackReportRequ
         "meta": meta,
     }
     
+    # Only the status: the report is in the HTTP response, and events are kept for late subscribers
+    pubsub.publish(interview_topic(interview_id), {"event": "completed", "data": {"status": "completed"}})
+
     # Log feedback generation completion with interview ID (Requirement 9.5)
     logger.info("Feedback generation completed successfully: interview_id=%s, post='%s', overall_rating=%s", 
                 interview_id, req.post, 
@@ -272,9 +512,10 @@ async def generate_interview_feedback(interview_id: str, req: FeedBackReportRequ
 # ANALYSIS ROUTE (ASYNC)
 # ----------------------------
 @app.post("/api/analysis")
-async def analyze(req: ResumeAnalysisRequest, background_tasks: BackgroundTasks):
+async def analyze(req: ResumeAnalysisRequest, request: Request):
     """
     Receives request -> Starts Background Task -> Returns Immediately.
+    The task is detached from the request and drained on worker shutdown.
     """
     request_id = f"py_req_{int(time.time())}_{req.resumeId[:8]}"
     logger.info(f"🚀 [PYTHON_API] {request_id} - Analysis request received")
@@ -289,23 +530,321 @@ async def analyze(req: ResumeAnalysisRequest, background_tasks: BackgroundTasks)
     logger.info(f"🔄 [PYTHON_API] {request_id} - Modified fileUrl: {fileUrl}")
     logger.info(f"🔥 [PYTHON_API] {request_id} - Adding background task for processing")
     
-    background_tasks.add_task(
-        process_resume_analysis,
-        req.resumeId,
-        fileUrl,
-        req.JobDescription
-    )
+    if not inflight_analyses.accepting:
+        raise HTTPException(status_code=503, detail="Server is shutting down, please retry")
+
+    service = await resume_service.aload()
+    # Idempotent per resumeId: a submission while one is queued/running returns that job
+    # The job task copies this context, so its LLM calls are attributed to the analysis
+    # (and the AI analysis step is profiled when this request is selected)
+    with usage_scope(user_id=req.userId, resume_analysis_id=req.resumeId), \
+            profiling.profile_request("analysis", request.headers, label=req.resumeId):
+        _, existing = analysis_jobs.submit(
+            req.resumeId,
+            lambda: service.process_resume_analysis(req.resumeId, fileUrl, req.JobDescription),
+            inflight_analyses.spawn,
+        )
+    if existing:
+        logger.info(f"♻️ [PYTHON_API] {request_id} - Analysis already running for {req.resumeId}, returning existing job")
 
     response = {
         "success": True,
-        "message": "Analysis started in background",
+        "message": "Analysis already in progress" if existing else "Analysis started in background",
         "resumeId": req.resumeId,
-        "status": "PROCESSING"
+        "status": "PROCESSING",
+        "coalesced": existing,
+        "job": analysis_jobs.status(req.resumeId),
     }
     logger.info(f"✅ [PYTHON_API] {request_id} - Returning immediate response: {response}")
     return response
 
 
+@app.get("/api/analysis/{resume_id}")
+def analysis_status(resume_id: str):
+    """
+    Progress of an analysis submitted to this worker: stage, queue position
+    and elapsed time, from in-memory state (no DB access).
+    """
+    status = analysis_jobs.status(resume_id)
+    if status is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No analysis job known for this resumeId on this worker; check the ResumeAnalysis record",
+        )
+    return {"success": True, **status}
+
+@app.post("/api/analysis/{resume_id}/reanalyze")
+async def reanalyze(resume_id: str, req: ReanalyzeRequest):
+    """
+    Analyze an already processed resume against a new job description.
+    Creates a new ResumeAnalysis row from the stored resume text and runs the
+    analysis in the background; the PDF is not downloaded or extracted again.
+    """
+    if not inflight_analyses.accepting:
+        raise HTTPException(status_code=503, detail="Server is shutting down, please retry")
+    db = app.state.db
+    if not db.is_connected():
+        raise HTTPException(status_code=503, detail="Database unavailable, please retry")
+
+    source = await db.resumeanalysis.find_unique(where={"id": resume_id})
+    if source is None:
+        raise HTTPException(status_code=404, detail="Resume analysis not found")
+    if not source.resumeText:
+        raise HTTPException(
+            status_code=409,
+            detail="Resume text has not been extracted yet; wait for the first analysis to finish",
+        )
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    data = {
+        "id": str(uuid.uuid4()),
+        "userId": source.userId,
+        "title": req.title or source.title,
+        "cloudinaryUrl": source.cloudinaryUrl,
+        "jobDescription": req.JobDescription,
+        "resumeText": source.resumeText,
+        "totalScore": 0,
+        "status": "PROCESSING",
+        "updatedAt": now,
+    }
+    if source.formattingIssues is not None:
+        data["formattingIssues"] = Json(source.formattingIssues)
+    created = await db.resumeanalysis.create(data=data)
+    logger.info(f"🔁 [PYTHON_API] Re-analyzing {resume_id} as {created.id} without file I/O")
+
+    service = await resume_service.aload()
+    # A re-analysis is a request for a fresh result: evict a cached one for the same inputs
+    if config.ANALYSIS_CACHE_ENABLED:
+        await analysis_cache.invalidate(
+            db, service.analysis_cache_key(source.resumeText, req.JobDescription, source.formattingIssues)
+        )
+    with usage_scope(user_id=source.userId, resume_analysis_id=created.id):
+        analysis_jobs.submit(
+            created.id,
+            lambda: service.process_resume_analysis(
+                created.id,
+                source.cloudinaryUrl,
+                req.JobDescription,
+                resume_text=source.resumeText,
+                formatting_findings=source.formattingIssues,
+            ),
+            inflight_analyses.spawn,
+        )
+    return {
+        "success": True,
+        "message": "Re-analysis started in background",
+        "resumeId": created.id,
+        "sourceResumeId": resume_id,
+        "status": "PROCESSING",
+        "job": analysis_jobs.status(created.id),
+    }
+
+# ----------------------------
+# Interview over WebSocket
+# ----------------------------
+async def _receive_client_message(websocket: WebSocket) -> Dict:
+    """
+    Next client frame as a dict. A malformed frame (not JSON, not an object,
+    or a time_left that is not an integer) raises ValueError with the reason.
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    raw = message.get("text")
+    if raw is None:
+        raw = (message.get("bytes") or b"").decode("utf-8", errors="replace")
+    try:
+        msg = json.loads(raw)
+    except ValueError:
+        raise ValueError("Malformed message: not valid JSON") from None
+    if not isinstance(msg, dict):
+        raise ValueError("Malformed message: expected a JSON object")
+    if msg.get("time_left") is not None:
+        try:
+            msg["time_left"] = int(msg["time_left"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid time_left: {msg['time_left']!r}") from None
+    return msg
+
+@app.websocket("/ws/interview")
+async def interview_socket(websocket: WebSocket):
+    """
+    One connection per candidate. The first message is the interview context
+    (same fields as POST /api/interview/next), validated once. After that:
+      client -> {"type": "answer", "content": str, "time_left"?: int}
+                {"type": "control", "force_next"?: bool, "time_left"?: int}
+                {"type": "end"}
+      server -> {"type": "token", "content": str}      streamed, provisional text
+                {"type": "interviewer", "data": {...}}  final turn, same shape as the HTTP data
+                {"type": "error", "status": int, "detail": str, "retry_after"?: int}
+                {"type": "ended"}
+    The server keeps the transcript; decision logic is interview_agent_auto_number.
+    A malformed or unknown message gets a 400 error frame; the session goes on.
+    """
+    origin = websocket.headers.get("origin")
+    if origin and "*" not in origins and origin not in origins:
+        # CORSMiddleware does not cover WebSockets; apply the same allow-list
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+
+    try:
+        session = InterviewRequest(**(await websocket.receive_json()))
+    except (ValidationError, ValueError, TypeError) as e:
+        await websocket.send_json({"type": "error", "status": 422, "detail": str(e)})
+        await websocket.close(code=1008)
+        return
+    except WebSocketDisconnect:
+        return
+
+    logger.info(
+        "[INTERVIEW_WS] session started | post=%s | type=%s | questions=%d | messages=%d",
+        session.post, session.interview_type, len(session.questions), len(session.messages),
+    )
+    agent = await interview_agent.aload()
+    loop = asyncio.get_running_loop()
+    messages = list(session.messages)
+    state = {"time_left": session.time_left}
+
+    # A single sender task keeps token and turn messages in order
+    outbox: asyncio.Queue = asyncio.Queue()
+
+    async def sender():
+        while True:
+            item = await outbox.get()
+            if item is None:
+                return
+            await websocket.send_json(item)
+
+    sender_task = asyncio.create_task(sender())
+
+    def on_token(text: str):
+        # Called from the worker thread running the LLM stream
+        loop.call_soon_threadsafe(outbox.put_nowait, {"type": "token", "content": text})
+
+    async def run_turn(force_next: bool = False) -> bool:
+        try:
+            result = await asyncio.to_thread(
+                agent.interview_agent_auto_number,
+                Post=session.post,
+                JobDescription=session.job_description,
+                resume_data=session.resumeData,
+                questions_list=session.questions,
+                messages=list(messages),
+                time_left=state["time_left"],
+                force_next=force_next,
+                on_token=on_token,
+            )
+        except Exception as e:
+            if is_quota_error(e):
+                logger.warning("[INTERVIEW_WS] Gemini API quota exceeded")
+                outbox.put_nowait({
+                    "type": "error", "status": 429,
+                    "detail": "AI service quota exceeded. Please try again later.",
+                    "retry_after": getattr(e, "retry_after", None),
+                })
+            else:
+                logger.exception("Error during interview (websocket)")
+                outbox.put_nowait({"type": "error", "status": 500, "detail": f"Error during interview: {e}"})
+            return False
+        messages.append({"role": "interviewer", "content": result["AIResponse"], "question_id": result.get("question_id")})
+        outbox.put_nowait({"type": "interviewer", "data": result})
+        return bool(result.get("endInterview"))
+
+    # Turns run via asyncio.to_thread, which carries this scope into the worker thread
+    with usage_scope(interview_id=session.interview_id, user_id=session.user_id):
+        try:
+            ended = await run_turn(bool(session.force_next)) if not messages else False
+            while not ended:
+                try:
+                    msg = await _receive_client_message(websocket)
+                except ValueError as e:
+                    outbox.put_nowait({"type": "error", "status": 400, "detail": str(e)})
+                    continue
+                kind = msg.get("type")
+                if msg.get("time_left") is not None:
+                    state["time_left"] = msg["time_left"]
+                if kind == "answer":
+                    messages.append({"role": "candidate", "content": str(msg.get("content", ""))})
+                    ended = await run_turn()
+                elif kind == "control":
+                    if msg.get("force_next"):
+                        ended = await run_turn(force_next=True)
+                elif kind == "end":
+                    break
+                else:
+                    outbox.put_nowait({"type": "error", "status": 400, "detail": f"Unknown message type: {kind}"})
+            outbox.put_nowait({"type": "ended"})
+        except WebSocketDisconnect:
+            logger.info("[INTERVIEW_WS] client disconnected after %d messages", len(messages))
+        finally:
+            outbox.put_nowait(None)
+            try:
+                await sender_task
+            except Exception:
+                pass
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+
+# ----------------------------
+# SERVER-SENT EVENTS
+# ----------------------------
+EVENT_TOPICS = {"analysis": analysis_topic, "interview": interview_topic}
+
+@app.get("/api/events/{kind}/{item_id}")
+async def subscribe_events(kind: Literal["analysis", "interview"], item_id: str, request: Request):
+    """
+    Stream stage-change and completion events for a resume analysis
+    (kind=analysis, id=resumeId) or interview feedback (kind=interview).
+    The stream ends after a completed/failed event.
+    """
+    topic = EVENT_TOPICS[kind](item_id)
+
+    async def event_stream():
+        sub = pubsub.subscribe(topic)
+        deadline = time.monotonic() + config.SSE_MAX_STREAM_SECONDS
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+            while time.monotonic() < deadline:
+                event = await sub.get(timeout=config.SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    if await request.is_disconnected():
+                        break
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                if event["event"] in ("completed", "failed"):
+                    break
+        finally:
+            pubsub.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
+    port = int(os.getenv("PORT", 8000))
+    if config.UVICORN_WORKERS > 1:
+        # Multiple processes sidestep the GIL for CPU-bound work (PDF extraction,
+        # validation, JSON). uvicorn needs an import string to spawn workers.
+        uvicorn.run(
+            "app:app",
+            host="0.0.0.0",
+            port=port,
+            workers=config.UVICORN_WORKERS,
+            timeout_graceful_shutdown=int(config.SHUTDOWN_DRAIN_TIMEOUT),
+        )
+    else:
+        uvicorn.run(
+            app,
+            host="0.0.0.0",
+            port=port,
+            timeout_graceful_shutdown=int(config.SHUTDOWN_DRAIN_TIMEOUT),
+        )
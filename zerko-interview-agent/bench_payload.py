@@ -0,0 +1,89 @@
+"""
+Benchmark: validating and encoding a large feedback payload.
+
+Compares the old request path (validate into the API model, dump back to
+dicts, validate again inside the agent, encode with the stdlib json encoder)
+with the current one (validate once, pass the model through, encode with
+orjson). Reports CPU time per request and peak allocation.
+
+Usage: python bench_payload.py [messages] [iterations]
+"""
+import json
+import sys
+import os
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import orjson
+
+from InterviewModels import FeedBackReportModel, MessageModel, QuestionModel
+
+
+def make_payload(n_messages: int) -> bytes:
+    transcript = []
+    for i in range(n_messages):
+        role = "interviewer" if i % 2 == 0 else "candidate"
+        msg = {"role": role, "content": f"Message {i}: " + "some realistic answer text " * 12}
+        if role == "interviewer":
+            msg["question_id"] = i // 2
+        transcript.append(msg)
+    body = {
+        "post": "Backend Engineer",
+        "jobDescription": "Build and operate Python services. " * 40,
+        "resume_data": "Experienced engineer. " * 200,
+        "transcript": transcript,
+        "question_list": [{"id": i, "question": f"Question {i}?"} for i in range(n_messages // 2)],
+        "interview_type": "TECHNICAL",
+    }
+    return json.dumps(body).encode()
+
+
+def old_path(raw: bytes) -> bytes:
+    data = json.loads(raw)
+    req = FeedBackReportModel(**data)  # API model
+    transcript = [m.model_dump() for m in req.transcript]
+    questions = [q.model_dump() for q in req.question_list]
+    FeedBackReportModel(  # agent re-validation
+        post=req.post,
+        jobDescription=req.jobDescription,
+        resume_data=req.resume_data,
+        transcript=[MessageModel(**m) for m in transcript],
+        question_list=[QuestionModel(**q) for q in questions],
+        interview_type=req.interview_type,
+    )
+    return json.dumps({"success": True, "echo": transcript}).encode()
+
+
+def new_path(raw: bytes) -> bytes:
+    req = FeedBackReportModel(**orjson.loads(raw))
+    return orjson.dumps({"success": True, "echo": req.model_dump()["transcript"]})
+
+
+def measure(fn, raw: bytes, iterations: int):
+    fn(raw)  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(raw)
+    cpu_ms = (time.process_time() - start) / iterations * 1000
+
+    tracemalloc.start()
+    fn(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_ms, peak / 1024
+
+
+if __name__ == "__main__":
+    n_messages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    raw = make_payload(n_messages)
+    print(f"Payload: {n_messages} messages, {len(raw) / 1024:.0f} KiB, {iterations} iterations")
+
+    results = {name: measure(fn, raw, iterations) for name, fn in (("old", old_path), ("new", new_path))}
+    for name, (cpu_ms, peak_kib) in results.items():
+        print(f"{name:>4}: {cpu_ms:8.2f} ms CPU/request   peak alloc {peak_kib:9.0f} KiB")
+
+    (old_cpu, old_peak), (new_cpu, new_peak) = results["old"], results["new"]
+    print(f"saved: {100 * (1 - new_cpu / old_cpu):.0f}% CPU, {100 * (1 - new_peak / old_peak):.0f}% peak allocation")
@@ -1,6 +1,12 @@
 """
 Configuration settings for the Resume Analysis Service
 """
+import os
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
 
 # --- GEMINI API RETRY CONFIGURATION ---
 GEMINI_MAX_RETRIES = 5
@@ -8,10 +14,126 @@ GEMINI_RETRY_MIN_WAIT = 4  # seconds
 GEMINI_RETRY_MAX_WAIT = 300  # seconds (5 minutes)
 GEMINI_RETRY_MULTIPLIER = 2  # exponential backoff multiplier
 
+# --- GEMINI QUOTA CIRCUIT BREAKER ---
+# Consecutive quota errors that open a model's circuit (one per model, shared by all agents)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 3))
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", 30))  # seconds before a trial call
+CIRCUIT_MAX_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_MAX_RECOVERY_TIMEOUT", 300))  # cap after failed trials
+CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", 1))
+
+# --- MODEL ROUTING ---
+# Per-call choice between the agent's primary model and GEMINI_LIGHT_MODEL
+ROUTER_ENABLED = _env_flag("ROUTER_ENABLED", "true")
+ROUTER_LATENCY_WINDOW = int(os.getenv("ROUTER_LATENCY_WINDOW", 200))  # samples kept per model
+ROUTER_MIN_SAMPLES = int(os.getenv("ROUTER_MIN_SAMPLES", 20))  # before percentiles are trusted
+# p90 latency (seconds) above which an agent falls back to the light model
+ROUTER_LATENCY_SLO = {
+    "interview": float(os.getenv("ROUTER_SLO_INTERVIEW", 4)),
+    "questions": float(os.getenv("ROUTER_SLO_QUESTIONS", 20)),
+    "feedback": float(os.getenv("ROUTER_SLO_FEEDBACK", 45)),
+    "analysis": float(os.getenv("ROUTER_SLO_ANALYSIS", 60)),
+}
+ROUTER_PROBE_FRACTION = float(os.getenv("ROUTER_PROBE_FRACTION", 0.1))  # calls kept on a slow primary
+ROUTER_LATENCY_CRITICAL_AGENTS = {"interview"}
+ROUTER_LARGE_PROMPT_TOKENS = int(os.getenv("ROUTER_LARGE_PROMPT_TOKENS", 8000))
+ROUTER_THROTTLE_COOLDOWN = float(os.getenv("ROUTER_THROTTLE_COOLDOWN", 60))  # seconds after a 429
+GEMINI_RPM_LIMIT = int(os.getenv("GEMINI_RPM_LIMIT", 0))  # requests/minute per model; 0 = unknown
+ROUTER_QUOTA_RESERVE = float(os.getenv("ROUTER_QUOTA_RESERVE", 0.1))  # switch when <10% of RPM left
+
+# --- HEDGED INTERVIEW TURNS (opt-in) ---
+# If a turn has not answered within the model's observed p90, fire a second identical request
+INTERVIEW_HEDGING_ENABLED = _env_flag("INTERVIEW_HEDGING_ENABLED", "false")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 90))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", 3))  # seconds, until enough samples exist
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", 0.5))
+HEDGE_MAX_DELAY = float(os.getenv("HEDGE_MAX_DELAY", 8))
+HEDGE_BUDGET_PERCENT = float(os.getenv("HEDGE_BUDGET_PERCENT", 10))  # max extra calls, % of hedgeable calls
+HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", 32))
+
+# --- INTERVIEW TURN DEADLINES ---
+# Each turn's LLM call gets min(INTERVIEW_TURN_SLO, time_left * INTERVIEW_TURN_TIME_FRACTION)
+# seconds (never less than INTERVIEW_TURN_MIN_BUDGET); past that the next predefined question is used
+INTERVIEW_DEADLINE_ENABLED = _env_flag("INTERVIEW_DEADLINE_ENABLED", "true")
+INTERVIEW_TURN_SLO = float(os.getenv("INTERVIEW_TURN_SLO", 8))
+INTERVIEW_TURN_TIME_FRACTION = float(os.getenv("INTERVIEW_TURN_TIME_FRACTION", 0.05))
+INTERVIEW_TURN_MIN_BUDGET = float(os.getenv("INTERVIEW_TURN_MIN_BUDGET", 2))
+DEADLINE_MAX_WORKERS = int(os.getenv("DEADLINE_MAX_WORKERS", 32))
+
+# --- LLM PRIORITY SCHEDULER ---
+# Concurrent Gemini calls per worker; interactive turns > feedback > background analysis
+LLM_SCHEDULER_ENABLED = _env_flag("LLM_SCHEDULER_ENABLED", "true")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_RESERVED_INTERACTIVE = int(os.getenv("LLM_RESERVED_INTERACTIVE", 2))  # slots only interview/questions may use
+LLM_AGING_SECONDS = float(os.getenv("LLM_AGING_SECONDS", 10))  # waiting this long promotes a call one class
+
+# --- TOKEN / LATENCY ACCOUNTING ---
+# Per interview/user/analysis totals, written to the LlmUsage table in batches
+USAGE_TRACKING_ENABLED = _env_flag("USAGE_TRACKING_ENABLED", "true")
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", 30))  # seconds between batched writes
+USAGE_MAX_PENDING_ROWS = int(os.getenv("USAGE_MAX_PENDING_ROWS", 10000))  # kept while the DB is unreachable
+
+# --- STRUCTURED OUTPUT ---
+# Extra generations when schema-constrained output still fails to parse
+STRUCTURED_OUTPUT_RETRIES = int(os.getenv("STRUCTURED_OUTPUT_RETRIES", 1))
+
+# --- INTERVIEW PLANNING / OUTPUT TOKEN BUDGETS ---
+# Question count and length come from duration and interview type (utils/interview_planner.py),
+# and every agent call gets a max_output_tokens ceiling
+OUTPUT_BUDGETS_ENABLED = _env_flag("OUTPUT_BUDGETS_ENABLED", "true")
+# Thinking models count reasoning tokens against max_output_tokens; added to every budget
+OUTPUT_THINKING_ALLOWANCE = int(os.getenv("OUTPUT_THINKING_ALLOWANCE", 2048))
+TOKENS_PER_WORD = float(os.getenv("TOKENS_PER_WORD", 1.4))
+# Interview minutes one question (answer + follow-up) takes, per interview type
+MINUTES_PER_QUESTION = {
+    "TECHNICAL": 4,
+    "BEHAVIORAL": 4,
+    "HR": 3,
+    "SYSTEM_DESIGN": 8,
+}
+WORDS_PER_QUESTION = {
+    "TECHNICAL": 40,
+    "BEHAVIORAL": 35,
+    "HR": 30,
+    "SYSTEM_DESIGN": 60,
+}
+DEFAULT_INTERVIEW_MINUTES = int(os.getenv("DEFAULT_INTERVIEW_MINUTES", 15))  # when duration can't be parsed
+MIN_QUESTIONS = int(os.getenv("MIN_QUESTIONS", 2))
+MAX_QUESTIONS = int(os.getenv("MAX_QUESTIONS", 15))
+SUMMARY_WORDS = 60  # interview_summary is 2-3 lines
+INTERVIEW_MAX_OUTPUT_TOKENS = int(os.getenv("INTERVIEW_MAX_OUTPUT_TOKENS", 400))  # one interviewer turn
+FEEDBACK_BASE_OUTPUT_TOKENS = int(os.getenv("FEEDBACK_BASE_OUTPUT_TOKENS", 1200))
+FEEDBACK_OUTPUT_TOKENS_PER_QUESTION = int(os.getenv("FEEDBACK_OUTPUT_TOKENS_PER_QUESTION", 120))
+ANALYSIS_MAX_OUTPUT_TOKENS = int(os.getenv("ANALYSIS_MAX_OUTPUT_TOKENS", 3000))
+
 # --- SERVICE LEVEL RETRY CONFIGURATION ---
 SERVICE_MAX_RETRIES = 3
 SERVICE_RETRY_DELAY = 60  # seconds between service-level retries
 
+# --- ANALYSIS JOB QUEUE ---
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", 4))  # analyses running at once per worker
+ANALYSIS_JOB_RETENTION = float(os.getenv("ANALYSIS_JOB_RETENTION", 900))  # seconds finished jobs stay queryable
+
+# --- ANALYSIS RESULT CACHE ---
+# Identical resume + JD pairs reuse the stored result (see utils/analysis_cache.py)
+ANALYSIS_CACHE_ENABLED = _env_flag("ANALYSIS_CACHE_ENABLED", "true")
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", 30 * 24 * 3600))  # seconds
+ANALYSIS_CACHE_PURGE_INTERVAL = float(os.getenv("ANALYSIS_CACHE_PURGE_INTERVAL", 3600))  # expired rows deleted this often
+# Reuse resumeText already extracted for the same user and cloudinaryUrl instead of re-downloading
+RESUME_TEXT_REUSE_ENABLED = _env_flag("RESUME_TEXT_REUSE_ENABLED", "true")
+# Save extracted text and formatting findings (status ANALYZING) before the AI analysis runs
+PARTIAL_RESULTS_ENABLED = _env_flag("PARTIAL_RESULTS_ENABLED", "true")
+
+# --- PDF EXTRACTION POOL ---
+# Worker processes per uvicorn worker; 0 extracts in the calling thread instead
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", min(2, os.cpu_count() or 1)))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", 8))  # larger PDFs are split across workers
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", 30))  # seconds per document
+
+# --- SERVER-SENT EVENTS ---
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))  # keep-alive comment interval
+SSE_MAX_STREAM_SECONDS = float(os.getenv("SSE_MAX_STREAM_SECONDS", 1800))  # client reconnects after this
+PUBSUB_LAST_EVENT_TTL = float(os.getenv("PUBSUB_LAST_EVENT_TTL", 600))  # final event replayed to late subscribers
+
 # --- FALLBACK ANALYSIS CONFIGURATION ---
 FALLBACK_BASE_SCORE = 50
 FALLBACK_OPTIMAL_RESUME_LENGTH_MIN = 1000
@@ -25,4 +147,47 @@ LOG_DETAILED_ERRORS = True
 LOG_API_ATTEMPTS = True
 
 # --- HEALTH CHECK CONFIGURATION ---
-HEALTH_CHECK_INTERVAL = 300  # seconds (5 minutes)
\ No newline at end of file
+HEALTH_CHECK_INTERVAL = 300  # seconds (5 minutes)
+
+# --- STARTUP / WARM-UP CONFIGURATION ---
+# Agents are imported lazily; warm-up loads them in the background once the port is bound
+WARMUP_ENABLED = _env_flag("WARMUP_ENABLED", "true")
+WARMUP_DELAY_SECONDS = float(os.getenv("WARMUP_DELAY_SECONDS", 1))
+
+# --- SERVER / WORKER CONFIGURATION ---
+# Number of uvicorn worker processes; "auto" uses one per CPU core
+_workers = os.getenv("WEB_CONCURRENCY", "1")
+UVICORN_WORKERS = (os.cpu_count() or 1) if _workers == "auto" else max(1, int(_workers))
+# Seconds a worker waits for open requests and in-flight analyses on shutdown
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", 30))
+# Threads for sync endpoints (AnyIO) and asyncio.to_thread work, per worker
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 40))
+
+# --- LOAD SHEDDING ---
+# Concurrent requests admitted per endpoint; keep the sync ones (interview,
+# questions, parse) within THREADPOOL_SIZE so nothing queues invisibly.
+SHED_ENABLED = _env_flag("SHED_ENABLED", "true")
+SHED_LIMITS = {
+    "interview": int(os.getenv("SHED_LIMIT_INTERVIEW", 24)),
+    "questions": int(os.getenv("SHED_LIMIT_QUESTIONS", 8)),
+    "parse": int(os.getenv("SHED_LIMIT_PARSE", 8)),
+    "feedback": int(os.getenv("SHED_LIMIT_FEEDBACK", 8)),
+}
+SHED_MAX_QUEUE = int(os.getenv("SHED_MAX_QUEUE", 16))  # queued requests per endpoint before 503
+SHED_MAX_WAIT_SECONDS = float(os.getenv("SHED_MAX_WAIT_SECONDS", 10))  # estimated/actual queue wait before 503
+SHED_DEFAULT_LATENCY = float(os.getenv("SHED_DEFAULT_LATENCY", 3))  # seconds per request until measured
+SHED_MAX_RETRY_AFTER = int(os.getenv("SHED_MAX_RETRY_AFTER", 60))
+
+# --- EVENT LOOP WATCHDOG ---
+# A task measures how late the loop wakes it; a thread logs the loop's stack when it stalls
+LOOP_WATCHDOG_ENABLED = _env_flag("LOOP_WATCHDOG_ENABLED", "true")
+LOOP_WATCHDOG_INTERVAL = float(os.getenv("LOOP_WATCHDOG_INTERVAL", 0.5))  # seconds between lag probes
+LOOP_STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", 0.5))  # lag in seconds reported as a stall
+LOOP_STALL_HISTORY = int(os.getenv("LOOP_STALL_HISTORY", 20))  # recent stalls kept for GET /health/loop
+
+# --- ON-DEMAND PROFILING ---
+# Unset disables profiling; requests carrying X-Profile-Token: <token> are profiled (see utils/profiling.py)
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")  # .prof and .json artifacts, shared by all workers
+PROFILE_MAX_ARTIFACTS = int(os.getenv("PROFILE_MAX_ARTIFACTS", 50))  # oldest captures deleted beyond this
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 25))  # hotspots listed in each summary
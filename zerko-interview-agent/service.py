@@ -3,16 +3,26 @@ import logging
 import json
 import datetime
 from DBConnect import DBConnect
-from utils.check import check_formatting_issues
+from utils.check import analyze_formatting, findings_from_json, finding_messages
+from utils import analysis_jobs as jobs
+from utils.analysis_jobs import analysis_jobs
+from typing import List, Optional, Tuple
+from prisma import Json
 import config
+from utils.metrics import metrics
+from utils import profiling
 
 # --- IMPORT MODELS ---
 # Make sure schemas.py is in the same folder, or adjust import path
 from AnalysisModels import AnalysisResult
 
 # --- IMPORT AGENTS ---
-from Question_generator_agent import parse_Resume
-from ResumeOptimizationAgent import analyze_resume
+from Question_generator_agent import download_resume
+from utils.pdf_extract import aextract_pdf_pages
+from utils.text_normalizer import normalize_pages, normalize_text
+from ResumeOptimizationAgent import analyze_resume_with_route, PROMPT_VERSION
+from utils import analysis_cache
+from utils.model_router import model_router
 
 logger = logging.getLogger(__name__)
 
@@ -33,52 +43,178 @@ async def safe_background_task_wrapper(resume_id: str, file_url: str, jd_text: s
             logger.error(f"💥 All retry attempts exhausted for {resume_id}")
             # Service continues running - don't re-raise
 
-async def process_resume_analysis(resume_id: str, file_url: str, jd_text: str):
+async def find_stored_resume_text(db, resume_id: str, file_url: str) -> Optional[Tuple[str, Optional[List[dict]]]]:
+    """
+    (resumeText, formatting findings) already extracted from this file for
+    the same user, or None. The findings are None for rows saved before
+    formattingIssues was stored.
+    """
+    row = await db.resumeanalysis.find_unique(where={"id": resume_id})
+    if row is None:
+        return None
+    existing = await db.resumeanalysis.find_first(
+        where={"userId": row.userId, "cloudinaryUrl": file_url, "resumeText": {"not": None}},
+        order={"updatedAt": "desc"},
+    )
+    if existing is None or not existing.resumeText:
+        return None
+    findings = None if existing.formattingIssues is None else findings_from_json(existing.formattingIssues)
+    return existing.resumeText, findings
+
+
+async def extract_resume(resume_id: str, file_url: str) -> Tuple[str, List[dict]]:
+    """Download, extract and normalize the resume; returns (text, formatting findings)."""
+    parse_start_time = asyncio.get_event_loop().time()
+    analysis_jobs.set_stage(resume_id, jobs.DOWNLOADING)
+    resume_bytes = await asyncio.to_thread(download_resume, file_url)
+    analysis_jobs.set_stage(resume_id, jobs.EXTRACTING)
+    pages = await aextract_pdf_pages(resume_bytes)
+    # Formatting checks judge the layout, so they get the raw text;
+    # the analysis (and the stored resumeText) use the normalized text
+    raw_text = "\n".join(pages)
+    resume_text, normalization = normalize_pages(pages)
+    parse_time = asyncio.get_event_loop().time() - parse_start_time
+    logger.info(f"📄 Resume parsing completed in {parse_time:.2f}s")
+    logger.info(
+        f"🧹 Normalized resume text: {normalization.chars_before} -> {normalization.chars_after} chars "
+        f"(~{normalization.tokens_before - normalization.tokens_after} tokens saved)"
+    )
+    metrics.incr("resume_text_extracted_total")
+    return resume_text, [finding.as_dict() for finding in analyze_formatting(raw_text)]
+
+
+async def save_partial_result(db, resume_id: str, resume_text: str, formatting_findings: List[dict]) -> None:
+    """
+    Save what is known before the AI analysis starts, so the UI can show it
+    while the slow part runs: status ANALYZING, the extracted text and the
+    local formatting findings. Best effort; the final write carries all of
+    it again.
+    """
+    partial = {
+        "partial": True,
+        "stage": "analyzing",
+        "ats_compatibility": {"formatting_issues": finding_messages(formatting_findings)},
+    }
+    try:
+        await db.resumeanalysis.update(
+            where={'id': resume_id},
+            data={
+                'status': "ANALYZING",
+                'analysisResult': Json(partial),
+                'resumeText': resume_text,
+                'formattingIssues': Json(formatting_findings),
+            }
+        )
+        metrics.incr("analysis_partial_writes_total")
+        logger.info(f"📝 Partial result saved for {resume_id}")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not save partial result for {resume_id}: {e}")
+
+
+def _stored_findings(resume_text: str, formatting_findings: Optional[list]) -> List[dict]:
+    """Finding dicts from stored formattingIssues; recomputed for rows saved before they were kept."""
+    if formatting_findings is None:
+        return [finding.as_dict() for finding in analyze_formatting(resume_text)]
+    return findings_from_json(formatting_findings)
+
+
+def analysis_cache_key(resume_text: str, jd_text: str, formatting_findings: Optional[list]) -> str:
+    """Cache key of the primary model's analysis of these inputs (see utils/analysis_cache.py)."""
+    return analysis_cache.cache_key(
+        resume_text,
+        jd_text,
+        finding_messages(_stored_findings(resume_text, formatting_findings)),
+        model_router.primary_model("analysis"),
+        PROMPT_VERSION,
+    )
+
+
+async def process_resume_analysis(
+    resume_id: str,
+    file_url: str,
+    jd_text: str,
+    resume_text: Optional[str] = None,
+    formatting_findings: Optional[list] = None,
+):
     """
     Background worker that performs the analysis and updates the DB.
+
+    The resume is only downloaded and extracted when its text is not already
+    known: callers may pass resume_text (re-analysis against a new JD), and
+    otherwise text stored for the same user and file URL is reused.
+    formatting_findings are stored formattingIssues (finding dicts, or plain
+    messages from older rows).
     """
     logger.info(f"🚀 Starting analysis for resume ID: {resume_id}")
     
     db = None
     try:
-        # 1. Parse Resume
-        parse_start_time = asyncio.get_event_loop().time()
-        resume_text = parse_Resume(file_url) 
-        parse_time = asyncio.get_event_loop().time() - parse_start_time
-        logger.info(f"📄 Resume parsing completed in {parse_time:.2f}s")
+        # Connect to DB
+        db = await DBConnect()
+        logger.info(f"✅ Database connected successfully")
+
+        # 1. Parse Resume (or reuse text already extracted from this file)
+        if resume_text is None and config.RESUME_TEXT_REUSE_ENABLED:
+            stored = await find_stored_resume_text(db, resume_id, file_url)
+            if stored is not None:
+                logger.info(f"♻️ Reusing stored resume text for {file_url[:50]}..., skipping download")
+                metrics.incr("resume_text_reused_total")
+                resume_text, formatting_findings = stored
+                # Rows saved before normalization existed hold raw text; a no-op otherwise
+                resume_text, _ = normalize_text(resume_text)
+        if resume_text is None:
+            resume_text, formatting_findings = await extract_resume(resume_id, file_url)
+        else:
+            formatting_findings = _stored_findings(resume_text, formatting_findings)
+        # The prompt, the cache key and the analysis result use the messages
+        formatting_issues = finding_messages(formatting_findings)
         
         if not resume_text:
             logger.error(f"❌ Empty text extracted from resume: {resume_id}")
             raise ValueError("Empty text extracted from resume")
-        
-        # Connect to DB
-        db = await DBConnect()
-        logger.info(f"✅ Database connected successfully")
 
-        # 2. Check Formatting
-        formatting_issues = check_formatting_issues(resume_text)
+        # 2. Formatting issues
         if formatting_issues:
             logger.info(f"📋 Found {len(formatting_issues)} formatting issues")
+        if config.PARTIAL_RESULTS_ENABLED:
+            await save_partial_result(db, resume_id, resume_text, formatting_findings)
 
-        # 3. Run AI Analysis
-        logger.info(f"🤖 Starting AI analysis")
+        # 3. Run AI Analysis (or reuse the cached result for the same inputs)
+        # Keyed on the primary model: only its results are stored (see below)
+        cache_model = model_router.primary_model("analysis")
+        cache_key = analysis_cache_key(resume_text, jd_text, formatting_findings)
+        cacheable = False
+        cached = await analysis_cache.get(db, cache_key)
+        analysis_jobs.set_stage(resume_id, jobs.ANALYZING)
         ai_start_time = asyncio.get_event_loop().time()
         
         try:
-            analysis_json = await asyncio.to_thread(
-                analyze_resume, 
-                resume_text, 
-                jd_text, 
-                formatting_issues
-            )
+            if cached is not None:
+                logger.info(f"♻️ Reusing cached analysis for identical resume and JD")
+                analysis_json = cached
+            else:
+                logger.info(f"🤖 Starting AI analysis")
+                analysis_json, route = await asyncio.to_thread(
+                    profiling.call,
+                    analyze_resume_with_route, 
+                    resume_text, 
+                    jd_text, 
+                    formatting_issues
+                )
             
-            ai_time = asyncio.get_event_loop().time() - ai_start_time
-            logger.info(f"⏱️ AI analysis completed in {ai_time:.2f}s")
+                ai_time = asyncio.get_event_loop().time() - ai_start_time
+                logger.info(f"⏱️ AI analysis completed in {ai_time:.2f}s")
             
             # Check if this is a fallback response
             is_fallback = analysis_json.get('analysis_status') == 'fallback_mode'
             if is_fallback:
                 logger.warning(f"⚠️ Using fallback analysis: {analysis_json.get('fallback_reason', 'Unknown')}")
+            # Fallback results depend on the outage, not on the inputs, and a light-model
+            # result would outlive the throttling that caused it: cache primary output only
+            analysis_model = route.model if cached is None and route is not None else None
+            cacheable = not is_fallback and analysis_model == cache_model
+            if cached is None and not cacheable:
+                logger.info(f"🗃️ Not caching analysis (model={analysis_model}, fallback={is_fallback})")
             
             if isinstance(analysis_json, dict):
                 total_score = int(analysis_json.get('total_score', 0))
@@ -88,6 +224,7 @@ async def process_resume_analysis(resume_id: str, file_url: str, jd_text: str):
                 total_score = 0
                 
         except Exception as ai_error:
+            cacheable = False
             logger.error(f"❌ AI analysis failed: {str(ai_error)}")
             logger.info(f"🔄 Creating emergency fallback response")
             
@@ -126,6 +263,7 @@ async def process_resume_analysis(resume_id: str, file_url: str, jd_text: str):
 
         # 4. Update Database
         logger.info(f"💾 Updating database with results")
+        analysis_jobs.set_stage(resume_id, jobs.SAVING)
         if not db.is_connected():
             await db.connect()
 
@@ -148,6 +286,8 @@ async def process_resume_analysis(resume_id: str, file_url: str, jd_text: str):
             clean_model = AnalysisResult(**raw_data)
             final_payload = clean_model.model_dump()
             logger.info("✅ Data sanitization successful.")
+            if cacheable:
+                await analysis_cache.put(db, cache_key, final_payload, int(total_score or 0), cache_model, PROMPT_VERSION)
 
         except Exception as validation_error:
             logger.error(f"❌ Pydantic Validation Failed: {validation_error}")
@@ -169,10 +309,12 @@ async def process_resume_analysis(resume_id: str, file_url: str, jd_text: str):
                 'status': "COMPLETED",
                 'analysisResult': analysis_result_json, # Pass as JSON string
                 'resumeText': resume_text,
+                'formattingIssues': Json(formatting_findings),
                 'totalScore': total_score_int
             }
         )
         logger.info(f"✅ SUCCESS: Analysis completed and saved for {resume_id} - Score: {total_score}")
+        analysis_jobs.set_stage(resume_id, jobs.COMPLETED, detail={"totalScore": total_score_int})
 
     except Exception as e:
         logger.error(f"❌ FAILED: Error processing {resume_id}: {str(e)}")
@@ -186,6 +328,7 @@ async def process_resume_analysis(resume_id: str, file_url: str, jd_text: str):
         
         status = "RETRY_NEEDED" if is_recoverable else "FAILED"
         logger.info(f"🔄 Marking as {status}")
+        analysis_jobs.set_stage(resume_id, jobs.FAILED, error=str(e))
         
         # Update DB with appropriate status
         try:
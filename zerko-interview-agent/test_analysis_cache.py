@@ -0,0 +1,149 @@
+"""
+Tests for the persistent analysis result cache (utils/analysis_cache.py)
+
+The AnalysisCache table is replaced by an in-memory stand-in that supports
+the few Prisma calls the cache makes.
+"""
+import sys
+import os
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+# Add parent directory to path to import the utils package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from utils import analysis_cache
+from utils.analysis_cache import cache_key
+
+
+class FakeAnalysisCacheTable:
+    def __init__(self):
+        self.rows = {}
+
+    async def find_unique(self, where):
+        return self.rows.get(where["key"])
+
+    async def update(self, where, data):
+        self.rows[where["key"]].hits += data["hits"]["increment"]
+
+    async def upsert(self, where, data):
+        fields = data["update"] if where["key"] in self.rows else data["create"]
+        row = self.rows.setdefault(where["key"], SimpleNamespace(key=where["key"], hits=0))
+        for name, value in fields.items():
+            # prisma.Json wraps the stored value in .data
+            setattr(row, name, getattr(value, "data", value))
+
+    async def delete_many(self, where):
+        if "key" in where:
+            matches = [where["key"]] if where["key"] in self.rows else []
+        else:
+            cutoff = where["expiresAt"]["lt"]
+            matches = [key for key, row in self.rows.items() if row.expiresAt < cutoff]
+        for key in matches:
+            del self.rows[key]
+        return len(matches)
+
+
+class FakeDB:
+    def __init__(self):
+        self.analysiscache = FakeAnalysisCacheTable()
+
+    def is_connected(self):
+        return True
+
+
+RESUME = "Jane Doe\nSenior engineer,  Python and Go"
+JD = "Backend engineer, Python"
+RESULT = {"total_score": 81, "summary": "Strong match"}
+
+
+def key_for(prompt_version="v1", model="gemini-pro", resume=RESUME):
+    return cache_key(resume, JD, ["Uses tables"], model, prompt_version)
+
+
+def test_put_then_get_hits():
+    async def run():
+        db = FakeDB()
+        key = key_for()
+        assert await analysis_cache.get(db, key) is None
+        await analysis_cache.put(db, key, RESULT, 81, "gemini-pro", "v1")
+        assert await analysis_cache.get(db, key) == RESULT
+        assert db.analysiscache.rows[key].hits == 1
+    asyncio.run(run())
+    print("✅ Stored analysis is served for the same inputs")
+
+
+def test_key_ignores_whitespace_but_not_version_or_model():
+    assert key_for(resume="Jane Doe Senior engineer, Python and Go") == key_for()
+    assert key_for(prompt_version="v2") != key_for()
+    assert key_for(model="gemini-flash") != key_for()
+
+    async def run():
+        db = FakeDB()
+        await analysis_cache.put(db, key_for(), RESULT, 81, "gemini-pro", "v1")
+        assert await analysis_cache.get(db, key_for(prompt_version="v2")) is None, "new prompt version misses"
+        assert await analysis_cache.get(db, key_for()) == RESULT, "old workers still hit their entries"
+    asyncio.run(run())
+    print("✅ Prompt version or model change misses without touching other entries")
+
+
+def test_expired_rows_miss_and_are_purged_by_age():
+    async def run():
+        db = FakeDB()
+        old, current = key_for(), key_for(prompt_version="v2")
+        await analysis_cache.put(db, old, RESULT, 81, "gemini-pro", "v1")
+        await analysis_cache.put(db, current, RESULT, 81, "gemini-pro", "v2")
+        db.analysiscache.rows[current].expiresAt = (
+            datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=1)
+        )
+        assert await analysis_cache.get(db, current) is None
+        assert await analysis_cache.purge_expired(db) == 1
+        assert list(db.analysiscache.rows) == [old], "unexpired rows of any version are kept"
+    asyncio.run(run())
+    print("✅ Expired rows miss and are purged by age only")
+
+
+def test_invalidate_evicts_one_entry():
+    async def run():
+        db = FakeDB()
+        await analysis_cache.put(db, key_for(), RESULT, 81, "gemini-pro", "v1")
+        await analysis_cache.put(db, key_for(prompt_version="v2"), RESULT, 81, "gemini-pro", "v2")
+        assert await analysis_cache.invalidate(db, key_for()) == 1
+        assert await analysis_cache.get(db, key_for()) is None
+        assert await analysis_cache.get(db, key_for(prompt_version="v2")) == RESULT
+        assert await analysis_cache.invalidate(db, key_for()) == 0
+    asyncio.run(run())
+    print("✅ Invalidate evicts only the given entry")
+
+
+def test_disabled_cache_never_hits():
+    async def run():
+        db = FakeDB()
+        await analysis_cache.put(db, key_for(), RESULT, 81, "gemini-pro", "v1")
+        enabled, config.ANALYSIS_CACHE_ENABLED = config.ANALYSIS_CACHE_ENABLED, False
+        try:
+            assert await analysis_cache.get(db, key_for()) is None
+        finally:
+            config.ANALYSIS_CACHE_ENABLED = enabled
+    asyncio.run(run())
+    print("✅ Disabled cache never hits")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Analysis Result Cache")
+    print("=" * 50)
+
+    try:
+        test_put_then_get_hits()
+        test_key_ignores_whitespace_but_not_version_or_model()
+        test_expired_rows_miss_and_are_purged_by_age()
+        test_invalidate_evicts_one_entry()
+        test_disabled_cache_never_hits()
+
+        print("\n✅ All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,131 @@
+"""
+Tests for the single-pass ATS formatting analyzer (utils/check.py)
+"""
+import sys
+import os
+import time
+
+# Add parent directory to path to import the utils package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.check import analyze_formatting, check_formatting_issues, findings_from_json, finding_messages
+
+
+CLEAN_RESUME = """Jane Doe
+jane@example.com | github.com/jane
+
+Experience
+Senior Engineer at Acme Corp, Jan 2020 - Mar 2023
+• Built a billing service handling two million requests a day
+• Led the migration of the payments stack to Python 3
+• Cut p99 latency of the checkout API by forty percent
+• Introduced contract tests between the billing and ledger teams
+
+Education
+B.Sc. Computer Science, University of Somewhere, May 2016
+
+Skills: Python, Go, PostgreSQL, Kubernetes, Terraform
+"""
+
+
+def codes(text):
+    return [f.code for f in analyze_formatting(text)]
+
+
+def test_clean_resume_has_no_findings():
+    assert analyze_formatting(CLEAN_RESUME) == []
+    assert check_formatting_issues(CLEAN_RESUME) == []
+
+
+def test_cid_fonts_reported_with_position():
+    text = CLEAN_RESUME + "Projects (cid:12)(cid:34) something\n"
+    findings = [f for f in analyze_formatting(text) if f.code == "cid_fonts"]
+    assert len(findings) == 1
+    finding = findings[0]
+    assert finding.count == 2
+    assert text[finding.offset:].startswith("Projects (cid:12)")
+    assert finding.line == text[:finding.offset].count("\n") + 1
+
+
+def test_legacy_messages_are_kept():
+    issues = check_formatting_issues("(cid:3) a\nb\nc\nd")
+    assert "Unreadable fonts detected (CID encoding error). Avoid using custom fonts." in issues
+    assert "High fragmentation detected. This often happens when using Tables or Multi-column layouts." in issues
+
+
+def test_multi_column_and_tables():
+    columns = "\n".join(f"Worked on project {i} in detail      Skill number {i} listed" for i in range(6))
+    assert "multi_column" in codes(CLEAN_RESUME + columns)
+    table = "\n".join(f"Python | {i} years | Advanced | daily" for i in range(4))
+    assert "tables" in codes(CLEAN_RESUME + table)
+
+
+def test_repeated_footer_detected_but_not_nearby_repeats():
+    page = "Built and shipped a feature that customers relied on every day\n" * 10
+    text = CLEAN_RESUME + "".join(page + f"Page {n} of 3\n" for n in range(1, 4))
+    finding = [f for f in analyze_formatting(text) if f.code == "repeated_header_footer"][0]
+    assert finding.count == 3
+    assert text[finding.offset:].startswith("Page 1 of 3")
+    # The same short line three times in a row is content, not a footer
+    assert "repeated_header_footer" not in codes(CLEAN_RESUME + "Remote\n" * 3)
+
+
+def test_inconsistent_bullets_and_dates():
+    text = CLEAN_RESUME + "- Mentored four engineers\n- Ran the on-call rotation\n"
+    assert "inconsistent_bullets" in codes(text)
+    text = CLEAN_RESUME + "Engineer at Beta, 03/2017 - 12/2019\nIntern at Gamma, 05/2015 - 08/2015\n"
+    finding = [f for f in analyze_formatting(text) if f.code == "inconsistent_dates"][0]
+    assert "MM/YYYY" in finding.message and "Mon YYYY" in finding.message
+
+
+def test_garbage_density_and_missing_sections():
+    text = CLEAN_RESUME + "Summary ��� text\n"
+    assert "garbage_characters" in codes(text)
+    finding = [f for f in analyze_formatting("Jane Doe\nSome long line of text about me\n") if f.code == "missing_sections"][0]
+    assert finding.count == 3
+    assert analyze_formatting("") == []
+
+
+def test_linear_time_on_large_text():
+    line = "• Improved throughput of the ingestion pipeline by 35% in Jan 2021\n"
+    small, large = CLEAN_RESUME + line * 2000, CLEAN_RESUME + line * 20000
+    start = time.perf_counter()
+    analyze_formatting(small)
+    small_time = time.perf_counter() - start
+    start = time.perf_counter()
+    analyze_formatting(large)
+    large_time = time.perf_counter() - start
+    assert large_time < small_time * 25
+
+
+def test_stored_findings_round_trip_and_legacy_rows():
+    text = CLEAN_RESUME + "Projects (cid:12) something\n"
+    stored = [f.as_dict() for f in analyze_formatting(text)]
+    assert findings_from_json(stored) == stored
+    assert stored[0]["line"] is not None
+    assert finding_messages(stored) == check_formatting_issues(text)
+    # Rows written before positions were stored hold plain messages
+    legacy = findings_from_json(["Tables detected."])
+    assert legacy[0]["message"] == "Tables detected." and legacy[0]["line"] is None
+    assert findings_from_json(None) == []
+
+
+if __name__ == "__main__":
+    print("Running formatting analyzer tests...\n")
+
+    try:
+        test_clean_resume_has_no_findings()
+        test_cid_fonts_reported_with_position()
+        test_legacy_messages_are_kept()
+        test_multi_column_and_tables()
+        test_repeated_footer_detected_but_not_nearby_repeats()
+        test_inconsistent_bullets_and_dates()
+        test_garbage_density_and_missing_sections()
+        test_linear_time_on_large_text()
+        test_stored_findings_round_trip_and_legacy_rows()
+
+        print("\n✅ All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,89 @@
+"""
+Tests for the incremental JSON parser used to stream generated questions (utils/incremental_json.py)
+"""
+import sys
+import os
+import json
+
+# Add parent directory to path to import the utils package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.incremental_json import ITEM, VALUE, IncrementalJSONParser
+
+
+DOCUMENT = {
+    "questions": [
+        {"id": 1, "question": "Explain the \"GIL\" in Python, and {why} it matters."},
+        {"id": 2, "question": "What is a closure?\nGive an example."},
+        {"id": 3, "question": "Describe [a] project you led."},
+    ],
+    "interview_summary": "Focus on Python internals and ownership.",
+}
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return parser, events
+
+
+def test_items_emitted_in_order_for_any_chunking():
+    text = json.dumps(DOCUMENT, indent=2)
+    for size in (1, 2, 5, 17, len(text)):
+        parser, events = feed_in_chunks(text, size)
+        items = [value for kind, key, value in events if kind == ITEM and key == "questions"]
+        assert items == DOCUMENT["questions"], size
+        assert (VALUE, "interview_summary", DOCUMENT["interview_summary"]) in events
+        assert parser.done
+    print("✅ Items parsed for every chunk size")
+
+
+def test_item_emitted_before_document_finishes():
+    text = json.dumps(DOCUMENT)
+    first_end = text.index("},") + 1
+    parser = IncrementalJSONParser()
+    events = parser.feed(text[:first_end])
+    assert events == [(ITEM, "questions", DOCUMENT["questions"][0])]
+    assert not parser.done
+    # Summary comes last, after the whole questions array
+    rest = parser.feed(text[first_end:])
+    assert [kind for kind, _, _ in rest] == [ITEM, ITEM, VALUE, VALUE]
+    assert rest[-1] == (VALUE, "interview_summary", DOCUMENT["interview_summary"])
+    print("✅ First question available early")
+
+
+def test_scalars_and_nested_members():
+    text = '{"count": 3, "ok": true, "none": null, "nested": {"a": [1, 2]}, "scores": [1.5, -2]}'
+    _, events = feed_in_chunks(text, 3)
+    values = {key: value for kind, key, value in events if kind == VALUE}
+    assert values == json.loads(text)
+    assert [value for kind, key, value in events if kind == ITEM] == [1.5, -2]
+    print("✅ Scalars and nested members")
+
+
+def test_preamble_and_trailer_ignored():
+    text = "```json\n" + json.dumps(DOCUMENT) + "\n```"
+    parser, events = feed_in_chunks(text, 4)
+    assert parser.done
+    assert len([e for e in events if e[0] == ITEM]) == 3
+    assert parser.feed("{\"more\": 1}") == []
+    print("✅ Fences ignored")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Incremental JSON Parser")
+    print("=" * 50)
+
+    try:
+        test_items_emitted_in_order_for_any_chunking()
+        test_item_emitted_before_document_finishes()
+        test_scalars_and_nested_members()
+        test_preamble_and_trailer_ignored()
+
+        print("\n✅ All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
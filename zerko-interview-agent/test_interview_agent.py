@@ -8,7 +8,9 @@ import os
 # Add parent directory to path to import the agent
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import AI_interview_agent
 from AI_interview_agent import interview_agent_auto_number
+from utils.deadline import DeadlineExceeded
 
 
 def test_no_answer_detected_moves_to_next_question():
@@ -209,6 +211,48 @@ def test_no_answer_with_time_constraints():
     print("✓ Test passed: No answer handling with time constraints")
 
 
+def test_deadline_on_last_turn_wraps_up_without_ending():
+    """
+    Test that a model overrunning the turn budget after the last question
+    yields a wrap-up turn, not the end of the interview
+    """
+    questions = [
+        {"id": 0, "question": "Question 1"},
+        {"id": 1, "question": "Question 2"}
+    ]
+    messages = [
+        {"role": "interviewer", "content": "Question 1", "question_id": 0},
+        {"role": "candidate", "content": "Answer 1"},
+        {"role": "interviewer", "content": "Question 2", "question_id": 1},
+        {"role": "candidate", "content": "Answer 2"}
+    ]
+
+    def over_budget(fn, budget):
+        raise DeadlineExceeded("turn budget spent")
+
+    # No model is built or called: the deadline fires first
+    saved = AI_interview_agent.ChatGoogleGenerativeAI, AI_interview_agent.call_with_deadline
+    AI_interview_agent.ChatGoogleGenerativeAI = lambda **kwargs: None
+    AI_interview_agent.call_with_deadline = over_budget
+    try:
+        result = interview_agent_auto_number(
+            Post="Software Engineer",
+            JobDescription="Test",
+            resume_data="Test",
+            questions_list=questions,
+            messages=messages,
+            time_left=10 * 60 * 1000  # 10 minutes
+        )
+    finally:
+        AI_interview_agent.ChatGoogleGenerativeAI, AI_interview_agent.call_with_deadline = saved
+
+    assert result["endInterview"] == False, "A slow model must not end the interview"
+    assert result["AIResponse"] == AI_interview_agent.WRAP_UP_MESSAGE, "Should wrap up"
+    assert result["meta"]["reason"] == "deadline_exceeded"
+
+    print("✓ Test passed: Turn deadline after the last question wraps up")
+
+
 if __name__ == "__main__":
     print("Running Interview Agent 'no answer detected' tests...\n")
     
@@ -218,6 +262,7 @@ if __name__ == "__main__":
         test_question_id_integrity_with_no_answers()
         test_various_no_answer_patterns()
         test_no_answer_with_time_constraints()
+        test_deadline_on_last_turn_wraps_up_without_ending()
         
         print("\n✅ All tests passed!")
         print("\nValidated Requirements:")
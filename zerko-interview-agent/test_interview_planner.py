@@ -0,0 +1,92 @@
+"""
+Tests for interview size planning and output token budgets (utils/interview_planner.py)
+"""
+import sys
+import os
+
+# Add parent directory to path to import the utils package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from utils.interview_planner import output_token_limit, parse_duration_minutes, plan_questions
+
+
+def test_parse_duration_formats():
+    assert parse_duration_minutes("30m") == 30
+    assert parse_duration_minutes("15") == 15
+    assert parse_duration_minutes(60) == 60
+    assert parse_duration_minutes("1h") == 60
+    assert parse_duration_minutes("1h 30m") == 90
+    assert parse_duration_minutes("45 minutes") == 45
+    assert parse_duration_minutes("90s") == 2
+    print("✅ Durations parsed")
+
+
+def test_unparseable_duration_uses_default():
+    assert parse_duration_minutes("") == config.DEFAULT_INTERVIEW_MINUTES
+    assert parse_duration_minutes(None) == config.DEFAULT_INTERVIEW_MINUTES
+    assert parse_duration_minutes("soon") == config.DEFAULT_INTERVIEW_MINUTES
+    print("✅ Default duration used")
+
+
+def test_question_count_scales_with_duration_and_type():
+    short = plan_questions("5m", "TECHNICAL")
+    long = plan_questions("60m", "TECHNICAL")
+    design = plan_questions("60m", "SYSTEM_DESIGN")
+
+    assert config.MIN_QUESTIONS <= short.question_count < long.question_count <= config.MAX_QUESTIONS
+    assert design.question_count < long.question_count
+    assert design.words_per_question > long.words_per_question
+    assert plan_questions("30m", "TECHNICAL").question_count == round(30 / config.MINUTES_PER_QUESTION["TECHNICAL"])
+    print("✅ Question count follows duration and type")
+
+
+def test_unknown_type_falls_back_to_technical():
+    plan = plan_questions("30m", "workshop")
+    assert plan.interview_type == "TECHNICAL"
+    assert plan == plan_questions("30m", "technical")
+    print("✅ Unknown type falls back")
+
+
+def test_token_budget_grows_with_questions_and_is_in_prompt():
+    short = plan_questions("5m", "HR")
+    long = plan_questions("60m", "HR")
+    assert long.max_output_tokens > short.max_output_tokens > config.OUTPUT_THINKING_ALLOWANCE
+    assert f"exactly {long.question_count} questions" in long.prompt_instructions()
+    assert output_token_limit("questions", plan=long) == long.max_output_tokens
+    print("✅ Token budget follows the plan")
+
+
+def test_agent_limits():
+    assert output_token_limit("feedback", question_count=10) > output_token_limit("feedback", question_count=2)
+    assert output_token_limit("interview") == config.INTERVIEW_MAX_OUTPUT_TOKENS + config.OUTPUT_THINKING_ALLOWANCE
+    assert output_token_limit("analysis") is not None
+    assert output_token_limit("questions") is None  # needs a plan
+    assert output_token_limit("unknown") is None
+
+    enabled = config.OUTPUT_BUDGETS_ENABLED
+    config.OUTPUT_BUDGETS_ENABLED = False
+    try:
+        assert output_token_limit("interview") is None
+    finally:
+        config.OUTPUT_BUDGETS_ENABLED = enabled
+    print("✅ Per-agent limits")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Interview Planner")
+    print("=" * 50)
+
+    try:
+        test_parse_duration_formats()
+        test_unparseable_duration_uses_default()
+        test_question_count_scales_with_duration_and_type()
+        test_unknown_type_falls_back_to_technical()
+        test_token_budget_grows_with_questions_and_is_in_prompt()
+        test_agent_limits()
+
+        print("\n✅ All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,69 @@
+"""
+Tests for the Gemini response schema builder (utils/json_schema.py)
+"""
+import sys
+import os
+import json
+from typing import List, Optional
+
+# Add parent directory to path to import the utils package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pydantic import BaseModel, Field
+
+from utils.json_schema import response_schema
+
+
+class Item(BaseModel):
+    id: int = Field(..., description="Item id.")
+    title: str = Field(..., description="A property that happens to be called title.")
+
+
+class Document(BaseModel):
+    items: List[Item] = Field(..., min_length=3, max_length=3, description="Exactly 3 items.")
+    best: Optional[Item] = Field(None, description="The best item.")
+    summary: str
+
+
+def test_refs_inlined():
+    schema = response_schema(Document)
+    text = json.dumps(schema)
+    assert "$ref" not in text and "$defs" not in text, text
+    items = schema["properties"]["items"]
+    assert items["minItems"] == 3 and items["maxItems"] == 3
+    assert items["items"]["type"] == "object"
+    assert set(items["items"]["required"]) == {"id", "title"}
+    print("✅ $ref/$defs inlined")
+
+
+def test_titles_dropped_but_title_property_kept():
+    schema = response_schema(Document)
+    assert "title" not in schema
+    item = schema["properties"]["items"]["items"]
+    assert "title" not in item
+    assert item["properties"]["title"]["type"] == "string"
+    assert "title" not in item["properties"]["id"]
+    print("✅ Schema titles dropped, a property named title kept")
+
+
+def test_field_description_overrides_referenced_schema():
+    best = response_schema(Document)["properties"]["best"]
+    assert best["description"] == "The best item."
+    assert any(option.get("type") == "object" for option in best["anyOf"])
+    print("✅ Field metadata kept next to the inlined schema")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Gemini Response Schemas")
+    print("=" * 50)
+
+    try:
+        test_refs_inlined()
+        test_titles_dropped_but_title_property_kept()
+        test_field_description_overrides_referenced_schema()
+
+        print("\n✅ All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
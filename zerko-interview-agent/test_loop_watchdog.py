@@ -0,0 +1,71 @@
+"""
+Tests for the event-loop stall watchdog (utils/loop_watchdog.py)
+"""
+import sys
+import os
+import asyncio
+import time
+
+# Add parent directory to path to import the utils package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.loop_watchdog import LoopWatchdog
+from utils.metrics import metrics
+
+
+def blocking_parse():
+    time.sleep(0.4)
+
+
+async def run_with_watchdog(body):
+    watchdog = LoopWatchdog(interval=0.05, threshold=0.15, history=5)
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.2)
+        await body()
+        await asyncio.sleep(0.2)
+    finally:
+        await watchdog.stop()
+    return watchdog
+
+
+def test_stall_reported_with_blocking_stack():
+    before = metrics.get("event_loop_stalls_total")
+
+    async def stall():
+        blocking_parse()
+
+    watchdog = asyncio.run(run_with_watchdog(stall))
+    stalls = watchdog.recent_stalls()
+    assert len(stalls) == 1
+    assert metrics.get("event_loop_stalls_total") == before + 1
+    assert any("blocking_parse" in line for line in stalls[0]["stack"])
+    assert stalls[0]["task"].startswith("Task-")
+    assert watchdog.snapshot()["max_lag_ms"] >= 300
+    print("✅ Stall reported once, with the blocking frame")
+
+
+def test_no_stall_when_loop_is_free():
+    async def idle():
+        await asyncio.sleep(0.3)
+
+    watchdog = asyncio.run(run_with_watchdog(idle))
+    assert watchdog.recent_stalls() == []
+    assert watchdog.snapshot()["max_lag_ms"] < 150
+    assert not watchdog.snapshot()["running"]
+    print("✅ No stall on a free loop")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Event Loop Watchdog")
+    print("=" * 50)
+
+    try:
+        test_stall_reported_with_blocking_stack()
+        test_no_stall_when_loop_is_free()
+
+        print("\n✅ All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
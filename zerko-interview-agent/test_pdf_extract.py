@@ -0,0 +1,85 @@
+"""
+Tests for PDF extraction on the process pool (utils/pdf_extract.py)
+"""
+import sys
+import os
+import asyncio
+
+# Add parent directory to path to import the utils package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pymupdf
+
+import config
+from utils import pdf_extract
+from utils.pdf_extract import PdfExtractionTimeout, aextract_pdf_pages, extract_pdf_pages
+
+
+def make_pdf(pages):
+    doc = pymupdf.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {i + 1} text")
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+def with_pool(workers, chunk_size):
+    """Run a test body against a fresh pool of this size, restoring config afterwards."""
+    def decorate(test):
+        def run():
+            saved = (config.PDF_EXTRACT_WORKERS, config.PDF_PAGES_PER_CHUNK)
+            config.PDF_EXTRACT_WORKERS, config.PDF_PAGES_PER_CHUNK = workers, chunk_size
+            try:
+                test()
+            finally:
+                pdf_extract.shutdown_pool()
+                config.PDF_EXTRACT_WORKERS, config.PDF_PAGES_PER_CHUNK = saved
+        run.__name__ = test.__name__
+        return run
+    return decorate
+
+
+@with_pool(workers=2, chunk_size=2)
+def test_pages_extracted_in_order_across_chunks():
+    content = make_pdf(5)
+    pages = extract_pdf_pages(content, timeout=60)
+    assert [p.strip() for p in pages] == [f"Page {i} text" for i in range(1, 6)], pages
+    assert asyncio.run(aextract_pdf_pages(content, timeout=60)) == pages
+    print("✅ Chunked extraction keeps page order")
+
+
+@with_pool(workers=1, chunk_size=2)
+def test_timeout_raises_pdf_extraction_timeout():
+    content = make_pdf(3)
+    # Far shorter than starting a spawned worker, so the first job cannot finish
+    for extract in (lambda: extract_pdf_pages(content, timeout=0.001),
+                    lambda: asyncio.run(aextract_pdf_pages(content, timeout=0.001))):
+        try:
+            extract()
+            assert False, "extraction should have timed out"
+        except PdfExtractionTimeout as e:
+            assert "exceeded" in str(e)
+    print("✅ Slow extraction raises PdfExtractionTimeout")
+
+
+@with_pool(workers=0, chunk_size=2)
+def test_inline_extraction_without_pool():
+    assert len(extract_pdf_pages(make_pdf(3))) == 3
+    print("✅ PDF_EXTRACT_WORKERS=0 extracts inline")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing PDF Extraction Pool")
+    print("=" * 50)
+
+    try:
+        test_pages_extracted_in_order_across_chunks()
+        test_timeout_raises_pdf_extraction_timeout()
+        test_inline_extraction_without_pool()
+
+        print("\n✅ All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,98 @@
+"""
+Tests for on-demand request profiling (utils/profiling.py)
+"""
+import sys
+import os
+import asyncio
+import tempfile
+
+# Add parent directory to path to import the utils package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from utils import profiling
+
+TOKEN = "s3cret"
+
+
+def slow_agent_call():
+    return sum(i * i for i in range(200_000))
+
+
+def setup(max_artifacts=50):
+    config.PROFILING_TOKEN = TOKEN
+    config.PROFILE_DIR = tempfile.mkdtemp(prefix="profiles-")
+    config.PROFILE_MAX_ARTIFACTS = max_artifacts
+    profiling.set_sample_rate(0.0)
+
+
+def test_header_selects_request_and_saves_artifacts():
+    setup()
+    with profiling.profile_request("interview", {profiling.HEADER: TOKEN}, label="iv-1") as reason, profiling.profiled():
+        slow_agent_call()
+    assert reason == "header"
+    [profile_id] = profiling.list_ids()
+    summary = profiling.load_summary(profile_id)
+    assert summary["target"] == "interview" and summary["label"] == "iv-1"
+    assert any("slow_agent_call" in row["function"] for row in summary["hotspots"])
+    assert os.path.getsize(profiling.artifact_path(profile_id, ".prof")) > 0
+    print("✅ Header-selected request profiled")
+
+
+def test_unselected_requests_not_profiled():
+    setup()
+    for headers in ({}, {profiling.HEADER: "wrong"}):
+        with profiling.profile_request("parse", headers) as reason, profiling.profiled():
+            slow_agent_call()
+        assert reason is None
+    config.PROFILING_TOKEN = None
+    with profiling.profile_request("parse", {profiling.HEADER: TOKEN}), profiling.profiled():
+        slow_agent_call()
+    assert profiling.list_ids() == []
+    print("✅ Nothing captured without a valid token")
+
+
+def test_sample_rate_and_thread_propagation():
+    setup()
+    profiling.set_sample_rate(1.0, ["feedback"])
+
+    async def endpoint():
+        with profiling.profile_request("feedback", {}) as reason:
+            await asyncio.to_thread(profiling.call, slow_agent_call)
+        return reason
+
+    assert asyncio.run(endpoint()) == "sampled"
+    assert profiling.load_summary(profiling.list_ids()[0])["reason"] == "sampled"
+    # Other targets keep their own rate
+    with profiling.profile_request("parse", {}) as reason:
+        assert reason is None
+    profiling.set_sample_rate(0.0)
+    print("✅ Sampled request profiled in its worker thread")
+
+
+def test_old_artifacts_pruned_and_ids_validated():
+    setup(max_artifacts=2)
+    for _ in range(3):
+        with profiling.profile_request("analysis", {profiling.HEADER: TOKEN}), profiling.profiled():
+            slow_agent_call()
+    assert len(profiling.list_ids()) == 2
+    assert len(os.listdir(config.PROFILE_DIR)) == 4
+    assert profiling.artifact_path("../config", ".py") is None
+    print("✅ Pruned to PROFILE_MAX_ARTIFACTS")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Request Profiling")
+    print("=" * 50)
+
+    try:
+        test_header_selects_request_and_saves_artifacts()
+        test_unselected_requests_not_profiled()
+        test_sample_rate_and_thread_propagation()
+        test_old_artifacts_pruned_and_ids_validated()
+
+        print("\n✅ All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
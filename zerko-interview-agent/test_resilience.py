@@ -5,7 +5,24 @@ Test script to verify the resilience of the resume analysis service
 
 import asyncio
 import logging
+import sys
+import threading
+import time
+import config
 from ResumeOptimizationAgent import analyze_resume
+from utils.analysis_jobs import ANALYZING, COMPLETED, FAILED, QUEUED, AnalysisJobRegistry
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, breaker_for, circuits_open
+from utils.deadline import DeadlineExceeded, call_with_deadline
+from utils.draining import InflightTasks
+from utils.errors import QuotaExceededError
+from utils.metrics import metrics
+from utils.pubsub import PubSub
+from utils.singleflight import SingleFlight, make_key
+from utils.hedging import HedgeBudget, hedge_budget, invoke_llm_hedged
+from utils.llm_gateway import invoke_llm
+from utils.llm_scheduler import PriorityScheduler, SlotTimeout
+from utils.load_shedding import EndpointLimiter, LoadSheddingMiddleware
+from utils.usage import usage_scope, usage_tracker
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -78,7 +95,650 @@ async def test_resilience():
         print("💥 This should NOT happen - the service should handle all errors gracefully")
         return False
 
+
+# ----------------------------
+# Circuit breaker
+# ----------------------------
+class FakeModel:
+    """Stands in for a langchain runnable: invoke() returns, or raises, the given outcome."""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def test_light_model_passes_while_primary_circuit_open():
+    primary, light = "test-primary", "test-light"
+    throttled = FakeModel(QuotaExceededError("429 quota exceeded"))
+    for _ in range(config.CIRCUIT_FAILURE_THRESHOLD):
+        try:
+            invoke_llm(throttled, "hi", agent="analysis", model=primary)
+        except QuotaExceededError:
+            pass
+    assert breaker_for(primary).is_open
+
+    healthy = FakeModel("ok")
+    try:
+        invoke_llm(healthy, "hi", agent="analysis", model=primary)
+        assert False, "primary call should be rejected while its circuit is open"
+    except CircuitOpenError:
+        pass
+    assert healthy.calls == 0
+    # The router's fallback target has its own circuit
+    assert invoke_llm(healthy, "hi", agent="analysis", model=light) == "ok"
+    assert not circuits_open([primary, light])
+    print("✅ Light model still served while the primary circuit is open")
+
+
+def _test_breaker():
+    return CircuitBreaker(
+        "test", failure_threshold=2, recovery_timeout=10, max_recovery_timeout=15, half_open_max_calls=1,
+    )
+
+
+def _expire_cooldown(breaker):
+    with breaker._lock:
+        breaker._opened_at -= breaker._recovery_timeout
+
+
+def _trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        try:
+            breaker.call(FakeModel(QuotaExceededError("429 quota exceeded")).invoke, "hi")
+        except QuotaExceededError:
+            pass
+
+
+def test_breaker_opens_after_quota_errors_only():
+    breaker = _test_breaker()
+    breaker.record_failure(QuotaExceededError("429 quota exceeded"), breaker.before_call())
+    breaker.record_failure(ValueError("bad prompt"), breaker.before_call())  # not a quota error: resets the count
+    breaker.record_failure(QuotaExceededError("429 quota exceeded"), breaker.before_call())
+    assert breaker.state == CLOSED
+
+    _trip(breaker)
+    assert breaker.state == OPEN
+    model = FakeModel("ok")
+    try:
+        breaker.call(model.invoke, "hi")
+        assert False, "open circuit should reject the call"
+    except CircuitOpenError as e:
+        assert e.retry_after >= 1
+    assert model.calls == 0
+    print("✅ Circuit opens after consecutive quota errors and fails fast")
+
+
+def test_breaker_half_open_allows_one_probe_then_closes():
+    breaker = _test_breaker()
+    _trip(breaker)
+    _expire_cooldown(breaker)
+    assert breaker.state == HALF_OPEN
+
+    probe = breaker.before_call()  # the probe is in flight
+    try:
+        breaker.before_call()
+        assert False, "only one trial call may run while half-open"
+    except CircuitOpenError:
+        pass
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+    assert breaker.call(FakeModel("ok").invoke, "hi") == "ok"
+    print("✅ Half-open admits one probe; its success closes the circuit")
+
+
+def test_breaker_failed_probe_reopens_with_longer_cooldown():
+    breaker = _test_breaker()
+    _trip(breaker)
+    _expire_cooldown(breaker)
+    try:
+        breaker.call(FakeModel(QuotaExceededError("429 quota exceeded")).invoke, "hi")
+    except QuotaExceededError:
+        pass
+    assert breaker.state == OPEN
+    assert breaker._recovery_timeout == 15, "doubled, capped at max_recovery_timeout"
+    assert 10 < breaker.retry_after() <= 15
+
+    _expire_cooldown(breaker)
+    breaker.call(FakeModel("ok").invoke, "hi")
+    assert breaker.state == CLOSED
+    assert breaker._recovery_timeout == 10, "success resets the cool-down"
+    print("✅ Failed probe re-opens with a longer cool-down")
+
+
+def test_breaker_ignores_late_results_while_open():
+    breaker = _test_breaker()
+    slow_success = breaker.before_call()  # admitted while closed, still running
+    slow_error = breaker.before_call()
+    _trip(breaker)
+    _expire_cooldown(breaker)
+    _trip(breaker)  # failed probe: cool-down doubled
+    assert breaker.state == OPEN and breaker._recovery_timeout == 15
+
+    breaker.record_success(slow_success)
+    breaker.record_failure(ValueError("500 internal error"), slow_error)
+    assert breaker.state == OPEN, "late results must not close an open circuit"
+    assert breaker._recovery_timeout == 15, "nor reset its back-off"
+    try:
+        breaker.call(FakeModel("ok").invoke, "hi")
+        assert False, "circuit should still fail fast"
+    except CircuitOpenError:
+        pass
+    print("✅ Late success or non-quota error leaves an open circuit open")
+
+
+# ----------------------------
+# Hedged requests
+# ----------------------------
+def test_hedge_budget_refills_with_calls():
+    budget = HedgeBudget(10, max_tokens=2)
+    for _ in range(9):
+        budget.deposit()
+    assert not budget.try_spend(), "9 calls at 10% do not earn a hedge yet"
+    budget.deposit()
+    assert budget.try_spend(), "the 10th call earns one hedge"
+    assert not budget.try_spend()
+
+    for _ in range(100):
+        budget.deposit()
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend(), "savings are capped at max_tokens"
+    print("✅ Hedge budget refills at the configured rate and is capped")
+
+
+class SlowModel(FakeModel):
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(0.3)
+        return self.outcome
+
+
+def test_hedge_fired_only_with_budget():
+    saved = (config.INTERVIEW_HEDGING_ENABLED, config.HEDGE_MIN_DELAY, config.HEDGE_MAX_DELAY, hedge_budget._tokens)
+    config.INTERVIEW_HEDGING_ENABLED = True
+    config.HEDGE_MIN_DELAY = config.HEDGE_MAX_DELAY = 0.05
+    try:
+        hedge_budget._tokens = 0.0
+        model = SlowModel("answer")
+        assert invoke_llm_hedged(model, "hi", agent="interview", model="test-hedge") == "answer"
+        assert model.calls == 1, "no budget: no second request"
+
+        hedge_budget._tokens = hedge_budget.max_tokens
+        model = SlowModel("answer")
+        assert invoke_llm_hedged(model, "hi", agent="interview", model="test-hedge") == "answer"
+        assert model.calls == 2, "slow first request should have been hedged"
+    finally:
+        config.INTERVIEW_HEDGING_ENABLED, config.HEDGE_MIN_DELAY, config.HEDGE_MAX_DELAY, hedge_budget._tokens = saved
+    print("✅ Slow call hedged only when the budget allows")
+
+
+def test_failed_first_call_not_hedged():
+    saved = (config.INTERVIEW_HEDGING_ENABLED, config.HEDGE_MIN_DELAY, config.HEDGE_MAX_DELAY, hedge_budget._tokens)
+    config.INTERVIEW_HEDGING_ENABLED = True
+    config.HEDGE_MIN_DELAY = config.HEDGE_MAX_DELAY = 0.2
+    fired = metrics.get("hedges_fired_total", agent="interview")
+    try:
+        hedge_budget._tokens = hedge_budget.max_tokens
+        model = FakeModel(DeadlineExceeded("turn budget spent"))
+        try:
+            invoke_llm_hedged(model, "hi", agent="interview", model="test-hedge")
+            assert False, "the first call's error should propagate"
+        except DeadlineExceeded:
+            pass
+        assert model.calls == 1, "a failed first call must not be hedged"
+        assert metrics.get("hedges_fired_total", agent="interview") == fired
+        assert hedge_budget._tokens == hedge_budget.max_tokens, "no budget spent"
+    finally:
+        config.INTERVIEW_HEDGING_ENABLED, config.HEDGE_MIN_DELAY, config.HEDGE_MAX_DELAY, hedge_budget._tokens = saved
+    print("✅ First call failing with DeadlineExceeded is not hedged")
+
+
+# ----------------------------
+# Single-flight coalescing
+# ----------------------------
+def _run_flight(flight, key, fn, followers=2):
+    """Leader plus followers on one key; returns [(result or exception, shared)] once all finish."""
+    outcomes = []
+    coalesced = metrics.get("singleflight_coalesced_total", group=flight.name)
+
+    def run():
+        try:
+            outcomes.append(flight.do(key, fn))
+        except Exception as e:
+            outcomes.append((e, None))
+
+    threads = [threading.Thread(target=run, daemon=True) for _ in range(followers + 1)]
+    threads[0].start()
+    deadline = time.monotonic() + 2
+    while key not in flight._calls:
+        assert time.monotonic() < deadline, "leader never started"
+        time.sleep(0.005)
+    for thread in threads[1:]:
+        thread.start()
+    while metrics.get("singleflight_coalesced_total", group=flight.name) < coalesced + followers:
+        assert time.monotonic() < deadline, "followers never joined the flight"
+        time.sleep(0.005)
+    return threads, outcomes
+
+
+def test_singleflight_coalesces_concurrent_calls():
+    flight = SingleFlight("test_coalesce")
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(2)
+        return {"questions": [1, 2, 3]}
+
+    threads, outcomes = _run_flight(flight, "k", work)
+    release.set()
+    _finish(*threads)
+    assert len(calls) == 1, "identical concurrent calls should run once"
+    assert sorted(shared for _, shared in outcomes) == [False, True, True]
+    assert all(result is outcomes[0][0] for result, _ in outcomes)
+    assert not flight._calls
+    assert flight.do("k", work) == ({"questions": [1, 2, 3]}, False), "nothing is cached afterwards"
+    print("✅ Concurrent identical calls share one computation")
+
+
+def test_singleflight_propagates_leader_error():
+    flight = SingleFlight("test_error")
+    release = threading.Event()
+
+    def work():
+        release.wait(2)
+        raise QuotaExceededError("429 quota exceeded")
+
+    threads, outcomes = _run_flight(flight, "k", work)
+    release.set()
+    _finish(*threads)
+    errors = [result for result, _ in outcomes]
+    assert len(errors) == 3 and all(isinstance(e, QuotaExceededError) for e in errors)
+    assert all(e is errors[0] for e in errors), "followers get the leader's exception"
+    assert not flight._calls
+    print("✅ Leader's error propagated to every waiter")
+
+
+def test_singleflight_key_ignores_whitespace_only():
+    assert make_key("Backend  Engineer", "Go,\n Python") == make_key("Backend Engineer ", "Go, Python")
+    assert make_key("Backend Engineer", "Go") != make_key("backend engineer", "go")
+    assert make_key("a b", None) != make_key("a", "b")
+    print("✅ Flight keys collapse whitespace but keep case")
+
+
+# ----------------------------
+# Deadlines
+# ----------------------------
+def test_expired_deadline_work_never_calls_the_model():
+    model = FakeModel("too late")
+    dropped = metrics.get("llm_deadline_dropped_total", agent="interview", stage="before_slot")
+
+    def generate():
+        time.sleep(0.3)  # e.g. stuck behind other work
+        return invoke_llm(model, "hi", agent="interview", model="test-deadline")
+
+    try:
+        call_with_deadline(generate, 0.1)
+        assert False, "the caller should have given up"
+    except DeadlineExceeded:
+        pass
+    time.sleep(0.4)  # let the abandoned thread reach the gateway
+    assert model.calls == 0
+    assert metrics.get("llm_deadline_dropped_total", agent="interview", stage="before_slot") == dropped + 1
+    print("✅ Abandoned call dropped before taking a slot")
+
+
+# ----------------------------
+# LLM priority scheduler
+# ----------------------------
+def _queue_waiter(scheduler, cls, order):
+    """Start a thread that takes a slot for cls, records it and releases; returns once it is queued."""
+    queued = len(scheduler._waiters)
+
+    def run():
+        scheduler.acquire(cls)
+        order.append(cls)
+        scheduler.release(cls)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while len(scheduler._waiters) <= queued:
+        assert time.monotonic() < deadline, f"{cls} waiter never queued"
+        time.sleep(0.005)
+    return thread
+
+
+def _finish(*threads):
+    for thread in threads:
+        thread.join(timeout=2)
+        assert not thread.is_alive(), "waiter never got a slot"
+
+
+def test_scheduler_serves_interactive_before_background():
+    scheduler = PriorityScheduler(capacity=1, reserved=0)
+    order = []
+    scheduler.acquire("background")
+    batch = _queue_waiter(scheduler, "background", order)
+    live = _queue_waiter(scheduler, "interactive", order)
+    scheduler.release("background")
+    _finish(batch, live)
+    assert order == ["interactive", "background"], order
+    print("✅ Interactive call served ahead of an earlier background call")
+
+
+def test_scheduler_keeps_reserved_slot_for_interactive():
+    scheduler = PriorityScheduler(capacity=2, reserved=1)
+    scheduler.acquire("background")
+    try:
+        scheduler.acquire("background", timeout=0)
+        assert False, "background call must not take the reserved slot"
+    except SlotTimeout:
+        pass
+    scheduler.acquire("interactive", timeout=0)
+    assert scheduler._in_use == 2
+    print("✅ Reserved slot kept for interactive calls")
+
+
+def test_scheduler_aging_promotes_starved_background_waiter():
+    scheduler = PriorityScheduler(capacity=1, reserved=0)
+    order = []
+    scheduler.acquire("interactive")
+    batch = _queue_waiter(scheduler, "background", order)
+    with scheduler._cond:
+        # Waited long enough to be aged up to interactive level
+        scheduler._waiters[0].since -= 3 * config.LLM_AGING_SECONDS
+    live = _queue_waiter(scheduler, "interactive", order)
+    scheduler.release("interactive")
+    _finish(batch, live)
+    assert order == ["background", "interactive"], order
+    print("✅ Aged background call served ahead of a newer interactive call")
+
+
+def test_scheduler_releases_slot_when_call_raises():
+    scheduler = PriorityScheduler(capacity=1, reserved=0)
+    try:
+        with scheduler.slot("analysis"):
+            raise RuntimeError("gemini failed")
+    except RuntimeError:
+        pass
+    assert scheduler._in_use == 0
+    assert scheduler.snapshot()["classes"]["background"]["running"] == 0
+    scheduler.acquire("background", timeout=0)
+    print("✅ Slot released when the call raises")
+
+
+# ----------------------------
+# Usage accounting
+# ----------------------------
+class FakeMessage:
+    usage_metadata = {"input_tokens": 120, "output_tokens": 30, "total_tokens": 150}
+
+
+def test_llm_usage_attributed_to_requesting_user():
+    if not config.USAGE_TRACKING_ENABLED:
+        print("⏭️ Usage tracking disabled, skipping attribution test")
+        return
+    with usage_scope(interview_id="i1", user_id="u1"):
+        invoke_llm(FakeModel(FakeMessage()), "hi", agent="feedback", model="test-usage")
+
+    totals = usage_tracker._pending.get(("i1", "u1", None, "feedback", "test-usage"))
+    assert totals is not None, "usage should be keyed by the requesting user"
+    assert totals.calls == 1
+    assert (totals.prompt_tokens, totals.completion_tokens, totals.total_tokens) == (120, 30, 150)
+    print("✅ LLM usage attributed to the requesting user")
+
+
+# ----------------------------
+# Background analysis jobs
+# ----------------------------
+async def _analysis_jobs_respect_concurrency():
+    registry = AnalysisJobRegistry(concurrency=1)
+    tasks = InflightTasks()
+    release = {rid: asyncio.Event() for rid in ("r1", "r2", "r3")}
+    running = []
+
+    def analysis(rid):
+        async def run():
+            running.append(rid)
+            registry.set_stage(rid, ANALYZING)
+            await release[rid].wait()
+            if rid == "r3":
+                raise RuntimeError("extraction failed")
+        return run
+
+    for rid in release:
+        registry.submit(rid, analysis(rid), tasks.spawn)
+    job, existing = registry.submit("r1", analysis("r1"), tasks.spawn)
+    assert existing and job is registry.get("r1"), "duplicate submission should return the running job"
+    await asyncio.sleep(0.01)
+
+    assert running == ["r1"], f"only one analysis may run at a time: {running}"
+    assert registry.get("r2").stage == QUEUED
+    assert [registry.status(rid)["queue_position"] for rid in ("r2", "r3")] == [1, 2]
+
+    release["r1"].set()
+    await asyncio.sleep(0.01)
+    assert registry.get("r1").stage == COMPLETED
+    assert running == ["r1", "r2"]
+    assert registry.status("r3")["queue_position"] == 1
+
+    release["r2"].set()
+    release["r3"].set()
+    await tasks.drain(timeout=1)
+    assert registry.get("r2").stage == COMPLETED
+    assert registry.get("r3").stage == FAILED and registry.get("r3").error == "extraction failed"
+    assert len(tasks) == 0
+
+
+async def _draining_cancels_stragglers():
+    registry = AnalysisJobRegistry(concurrency=2)
+    tasks = InflightTasks()
+    quick_done = asyncio.Event()
+
+    async def quick():
+        await asyncio.sleep(0.01)
+        quick_done.set()
+
+    async def stuck():
+        await asyncio.Event().wait()
+
+    registry.submit("quick", quick, tasks.spawn)
+    registry.submit("stuck", stuck, tasks.spawn)
+    await tasks.drain(timeout=0.2)
+    assert quick_done.is_set(), "drain should wait for in-flight analyses"
+    assert registry.get("quick").stage == COMPLETED
+    assert registry.get("stuck").stage == FAILED, "a cancelled straggler is reported as failed"
+    assert len(tasks) == 0
+    try:
+        registry.submit("late", quick, tasks.spawn)
+        assert False, "no new work once draining started"
+    except RuntimeError:
+        pass
+
+
+def test_analysis_jobs_queue_behind_semaphore():
+    asyncio.run(_analysis_jobs_respect_concurrency())
+    print("✅ Analyses run ANALYSIS_CONCURRENCY at a time, duplicates share the job")
+
+
+def test_analysis_jobs_drained_on_shutdown():
+    asyncio.run(_draining_cancels_stragglers())
+    print("✅ Draining waits for analyses and cancels stragglers")
+
+
+# ----------------------------
+# Progress pub/sub
+# ----------------------------
+async def _pubsub_fan_out_and_unsubscribe():
+    bus = PubSub(queue_size=2)
+    first, second = bus.subscribe("analysis:r1"), bus.subscribe("analysis:r1")
+    other = bus.subscribe("analysis:r2")
+
+    assert bus.publish("analysis:r1", {"event": "stage", "n": 1}) == 2
+    assert await first.get(0.1) == {"event": "stage", "n": 1}
+    assert await second.get(0.1) == {"event": "stage", "n": 1}
+    assert await other.get(0.01) is None, "other topics see nothing"
+
+    # Published from a worker thread, delivered on the subscriber's loop
+    await asyncio.to_thread(bus.publish, "analysis:r1", {"event": "stage", "n": 2})
+    assert (await first.get(0.5))["n"] == 2
+
+    bus.unsubscribe(first)
+    assert bus.publish("analysis:r1", {"event": "completed", "n": 3}) == 1
+    assert first.queue.empty(), "no events after unsubscribe"
+    assert (await second.get(0.1))["n"] == 2
+    assert (await second.get(0.1))["n"] == 3
+
+    late = bus.subscribe("analysis:r1")
+    assert (await late.get(0.1))["event"] == "completed", "late subscribers get the last event"
+
+    for n in range(5):
+        bus.publish("analysis:r2", {"n": n})
+    assert [(await other.get(0.1))["n"] for _ in range(2)] == [3, 4], "a slow subscriber keeps the newest events"
+
+    for sub in (second, late, other):
+        bus.unsubscribe(sub)
+    assert bus.subscriber_count() == 0 and not bus._topics
+
+
+async def _pubsub_last_event_expires():
+    bus = PubSub(last_event_ttl=60)
+    bus.publish("interview:i1", {"event": "completed", "data": {"status": "completed"}})
+    bus.publish("interview:i2", {"event": "completed", "data": {"status": "completed"}})
+    with bus._lock:
+        # Published longer than the TTL ago
+        bus._last["interview:i1"] = (bus._last["interview:i1"][0] - 61, bus._last["interview:i1"][1])
+    sub = bus.subscribe("interview:i1")
+    assert await sub.get(0.01) is None, "an expired final event is not replayed"
+    assert list(bus._last) == ["interview:i2"]
+    assert (await bus.subscribe("interview:i2").get(0.1))["data"] == {"status": "completed"}
+
+
+def test_pubsub_fan_out_and_unsubscribe():
+    asyncio.run(_pubsub_fan_out_and_unsubscribe())
+    print("✅ Events fan out per topic and stop after unsubscribe")
+
+
+def test_pubsub_last_event_expires():
+    asyncio.run(_pubsub_last_event_expires())
+    print("✅ Last events kept for late subscribers until their TTL")
+
+
+# ----------------------------
+# Load shedding
+# ----------------------------
+async def _asgi_request(app, method, path):
+    """Run one HTTP request through an ASGI app; returns (status, headers)."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": [], "query_string": b""}
+    await app(scope, receive, send)
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    return start["status"], {k.decode().lower(): v.decode() for k, v in start["headers"]}
+
+
+def _shedding_app(release: asyncio.Event):
+    async def endpoint(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = LoadSheddingMiddleware(endpoint)
+    middleware.limiters["parse"] = EndpointLimiter("parse", 1)
+    middleware.limiters["questions"] = EndpointLimiter("questions", 1)
+    return middleware
+
+
+async def _shed_over_limit_then_release():
+    release = asyncio.Event()
+    app = _shedding_app(release)
+    limiter = app.limiters["parse"]
+
+    first = asyncio.create_task(_asgi_request(app, "POST", "/api/parse"))
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 1
+    status, headers = await _asgi_request(app, "POST", "/api/parse")
+    assert status == 503, f"expected 503 over the limit, got {status}"
+    assert int(headers["retry-after"]) >= 1
+
+    release.set()
+    assert (await first)[0] == 200
+    assert limiter.in_flight == 0, "slot should be released after the response"
+    assert (await _asgi_request(app, "POST", "/api/parse"))[0] == 200
+
+
+async def _stream_not_limited_by_questions():
+    release = asyncio.Event()
+    app = _shedding_app(release)
+    limiter = app.limiters["questions"]
+
+    stream = asyncio.create_task(_asgi_request(app, "POST", "/api/generate/questions/stream"))
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 0, "the stream endpoint must not hold a questions slot"
+    assert app._limiter_for("POST", "/api/generate/questions") is limiter
+    assert app._limiter_for("POST", "/api/feedback/abc") is app.limiters.get("feedback")
+    assert app._limiter_for("POST", "/api/feedback/abc/extra") is None
+    release.set()
+    assert (await stream)[0] == 200
+
+
+def test_load_shedding_rejects_over_limit_and_releases_slot():
+    max_queue = config.SHED_MAX_QUEUE
+    config.SHED_MAX_QUEUE = 0  # reject instead of queueing
+    try:
+        asyncio.run(_shed_over_limit_then_release())
+    finally:
+        config.SHED_MAX_QUEUE = max_queue
+    print("✅ 503 + Retry-After over the limit, slot released after the response")
+
+
+def test_load_shedding_matches_paths_exactly():
+    asyncio.run(_stream_not_limited_by_questions())
+    print("✅ Question stream is not counted against the questions limit")
+
+
 if __name__ == "__main__":
+    try:
+        test_breaker_opens_after_quota_errors_only()
+        test_breaker_half_open_allows_one_probe_then_closes()
+        test_breaker_failed_probe_reopens_with_longer_cooldown()
+        test_breaker_ignores_late_results_while_open()
+        test_light_model_passes_while_primary_circuit_open()
+        test_hedge_budget_refills_with_calls()
+        test_hedge_fired_only_with_budget()
+        test_failed_first_call_not_hedged()
+        test_singleflight_coalesces_concurrent_calls()
+        test_singleflight_propagates_leader_error()
+        test_singleflight_key_ignores_whitespace_only()
+        test_expired_deadline_work_never_calls_the_model()
+        test_scheduler_serves_interactive_before_background()
+        test_scheduler_keeps_reserved_slot_for_interactive()
+        test_scheduler_aging_promotes_starved_background_waiter()
+        test_scheduler_releases_slot_when_call_raises()
+        test_llm_usage_attributed_to_requesting_user()
+        test_analysis_jobs_queue_behind_semaphore()
+        test_analysis_jobs_drained_on_shutdown()
+        test_pubsub_fan_out_and_unsubscribe()
+        test_pubsub_last_event_expires()
+        test_load_shedding_rejects_over_limit_and_releases_slot()
+        test_load_shedding_matches_paths_exactly()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
+
     success = asyncio.run(test_resilience())
     
     if success:
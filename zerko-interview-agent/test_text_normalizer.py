@@ -0,0 +1,158 @@
+"""
+Tests for resume text normalization (utils/text_normalizer.py)
+"""
+import sys
+import os
+
+# Add parent directory to path to import the utils package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.text_normalizer import normalize_pages, normalize_text
+
+
+HEADER = "Jane Doe | jane@example.com | +1 555 0100"
+
+PAGE_1 = f"""{HEADER}
+Experience
+Senior  Engineer at Acme Corp,   Jan 2020 - Mar 2023
+• Built a billing ser-
+vice handling two million requests
+a day
+• Led the migration to Python 3
+
+
+
+Page 1 of 2"""
+
+PAGE_2 = f"""{HEADER}
+Education
+BSc Computer Science, 2016
+Skills
+Python, Go, PostgreSQL
+Page 2 of 2"""
+
+
+def test_page_furniture_removed_but_header_kept_once():
+    text, report = normalize_pages([PAGE_1, PAGE_2])
+    assert text.count(HEADER) == 1
+    assert "Page" not in text
+    assert report.furniture_lines == 3  # second header + two page footers
+    print("✅ Page furniture removed")
+
+
+def test_hyphenation_and_wrapped_lines_rejoined():
+    text, report = normalize_pages([PAGE_1, PAGE_2])
+    assert "• Built a billing service handling two million requests a day" in text
+    assert "• Led the migration to Python 3" in text
+    assert report.hyphen_joins == 1 and report.line_joins == 1
+    # Headings and capitalized lines are left alone
+    assert "\nEducation\nBSc Computer Science, 2016\nSkills\n" in text
+    print("✅ Broken lines rejoined")
+
+
+def test_hyphenated_compounds_keep_their_hyphen():
+    text, report = normalize_text(
+        "Drove the long-\nterm roadmap as a full-\nstack engineer on a data-\ndriven team\n"
+        "Built an end-to-\nend pipeline for the billing ser-\nvice and its develop-\nment tooling"
+    )
+    assert "long-term roadmap as a full-stack engineer on a data-driven team" in text, text
+    assert "end-to-end pipeline" in text, text
+    assert "billing service and its development tooling" in text, text
+    assert report.hyphen_joins == 6
+    print("✅ Compounds keep their hyphen, broken words are joined")
+
+
+def test_email_and_url_lines_kept_separate():
+    text, report = normalize_text(
+        "Jane Doe\njane.doe@example.com\nSenior backend engineer based in Berlin\n"
+        "github.com/janedoe\nhttps://janedoe.dev\nlinkedin.com/in/janedoe"
+    )
+    assert text.split("\n") == [
+        "Jane Doe",
+        "jane.doe@example.com",
+        "Senior backend engineer based in Berlin",
+        "github.com/janedoe",
+        "https://janedoe.dev",
+        "linkedin.com/in/janedoe",
+    ], text
+    assert report.line_joins == 0
+    print("✅ Email and URL lines not folded into the previous line")
+
+
+def test_lowercase_items_after_headings_kept_separate():
+    text, report = normalize_text(
+        "Skills\npython, go, postgresql\nTools:\ndocker, terraform\n"
+        "Shipped the search service.\nkubernetes, helm\n"
+        "Reduced p99 latency of the checkout\nflow by 40%"
+    )
+    lines = text.split("\n")
+    assert lines[:6] == ["Skills", "python, go, postgresql", "Tools:", "docker, terraform",
+                         "Shipped the search service.", "kubernetes, helm"], text
+    # A sentence wrapped mid-line is still rejoined
+    assert lines[6] == "Reduced p99 latency of the checkout flow by 40%"
+    assert report.line_joins == 1
+    print("✅ Lowercase list items after headings and sentences kept separate")
+
+
+def test_whitespace_collapsed():
+    text, _ = normalize_pages([PAGE_1, PAGE_2])
+    assert "  " not in text
+    assert "\n\n\n" not in text
+    assert "Senior Engineer at Acme Corp, Jan 2020 - Mar 2023" in text
+    print("✅ Whitespace collapsed")
+
+
+def test_garbage_stripped_and_counted():
+    raw = "Skills(cid:3)(cid:17)\nPython\x07, Go\ufffd\n\ufb01nance  and\u200b ops"
+    text, report = normalize_text(raw)
+    assert text == "Skills\nPython, Go finance and ops"
+    assert report.garbage_chars == 4
+    print("✅ Garbage stripped")
+
+
+def test_years_and_single_page_content_kept():
+    text, report = normalize_text("Certifications\n2021\nAWS Solutions Architect\n3")
+    assert "2021" in text
+    assert text.endswith("AWS Solutions Architect")
+    assert report.furniture_lines == 1
+    print("✅ Years kept, page number dropped")
+
+
+def test_savings_reported():
+    text, report = normalize_pages([PAGE_1, PAGE_2])
+    summary = report.as_dict()
+    assert summary["chars_after"] == len(text)
+    assert summary["chars_saved"] == len("\n".join([PAGE_1, PAGE_2])) - len(text) > 0
+    assert summary["tokens_saved"] > 0
+    print("✅ Savings reported")
+
+
+def test_idempotent():
+    text, _ = normalize_pages([PAGE_1, PAGE_2])
+    again, report = normalize_text(text)
+    assert again == text
+    assert report.chars_saved == 0
+    print("✅ Normalizing twice changes nothing")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Resume Text Normalizer")
+    print("=" * 50)
+
+    try:
+        test_page_furniture_removed_but_header_kept_once()
+        test_hyphenation_and_wrapped_lines_rejoined()
+        test_hyphenated_compounds_keep_their_hyphen()
+        test_email_and_url_lines_kept_separate()
+        test_lowercase_items_after_headings_kept_separate()
+        test_whitespace_collapsed()
+        test_garbage_stripped_and_counted()
+        test_years_and_single_page_content_kept()
+        test_savings_reported()
+        test_idempotent()
+
+        print("\n✅ All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
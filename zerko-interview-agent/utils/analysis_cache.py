@@ -0,0 +1,131 @@
+"""
+Persistent cache of resume analysis results (AnalysisCache table).
+
+analyze_resume runs at temperature 0 and depends only on the resume text,
+the job description and the formatting issues, so a resubmission of the same
+pair can reuse the stored result instead of paying for another structured
+Gemini call. The key is a hash of the normalized inputs plus the model and
+the prompt version, so changing either produces new keys. Rows are removed
+by age only: run_purger() deletes expired rows every
+ANALYSIS_CACHE_PURGE_INTERVAL seconds. Rows of another prompt version are
+left to expire, since during a rolling deploy the old workers still use them.
+A re-analysis invalidates the entry for its inputs, so a bad result can
+always be replaced.
+
+Only real output of the primary model is cached: never fallback results,
+and never results the router sent to the light model (they would be served
+for the whole TTL after the primary recovered). Cache errors are
+logged and treated as a miss: the cache can never fail an analysis.
+"""
+import asyncio
+import datetime
+import hashlib
+import logging
+from typing import Iterable, Optional
+
+import config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text: str) -> str:
+    # Extraction noise (line wrapping, trailing spaces) shouldn't change the key
+    return " ".join((text or "").split())
+
+
+def cache_key(
+    resume_text: str,
+    jd_text: str,
+    formatting_issues: Iterable[str],
+    model: str,
+    prompt_version: str,
+) -> str:
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, _normalize(resume_text), _normalize(jd_text), *sorted(formatting_issues or ())):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+async def get(db, key: str) -> Optional[dict]:
+    """Cached analysis for key, or None on a miss, an expired row or any error."""
+    if not config.ANALYSIS_CACHE_ENABLED:
+        return None
+    try:
+        row = await db.analysiscache.find_unique(where={"key": key})
+        if row is None or row.expiresAt <= _now():
+            metrics.incr("analysis_cache_misses_total")
+            return None
+        await db.analysiscache.update(where={"key": key}, data={"hits": {"increment": 1}})
+    except Exception as e:
+        logger.warning(f"⚠️ Analysis cache lookup failed, treating as miss: {e}")
+        metrics.incr("analysis_cache_errors_total")
+        return None
+    metrics.incr("analysis_cache_hits_total")
+    return row.result
+
+
+async def put(db, key: str, result: dict, total_score: int, model: str, prompt_version: str) -> None:
+    """Store a result for ANALYSIS_CACHE_TTL seconds, replacing any previous entry."""
+    if not config.ANALYSIS_CACHE_ENABLED:
+        return
+    # prisma is imported here so the module stays importable without a generated client
+    from prisma import Json
+
+    expires_at = _now() + datetime.timedelta(seconds=config.ANALYSIS_CACHE_TTL)
+    fields = {
+        "model": model,
+        "promptVersion": prompt_version,
+        "result": Json(result),
+        "totalScore": total_score,
+        "expiresAt": expires_at,
+    }
+    try:
+        await db.analysiscache.upsert(
+            where={"key": key},
+            data={"create": {"key": key, **fields}, "update": {**fields, "hits": 0}},
+        )
+        metrics.incr("analysis_cache_writes_total")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not store analysis in cache: {e}")
+        metrics.incr("analysis_cache_errors_total")
+
+
+async def invalidate(db, key: str) -> int:
+    """Drop the entry for key, if any. Returns rows deleted; errors count as 0."""
+    try:
+        deleted = await db.analysiscache.delete_many(where={"key": key})
+    except Exception as e:
+        logger.warning(f"⚠️ Could not invalidate cached analysis: {e}")
+        metrics.incr("analysis_cache_errors_total")
+        return 0
+    if deleted:
+        metrics.incr("analysis_cache_invalidations_total")
+        logger.info(f"🧹 Invalidated cached analysis {key[:12]}")
+    return deleted
+
+
+async def purge_expired(db) -> int:
+    """Delete entries whose TTL has passed."""
+    deleted = await db.analysiscache.delete_many(where={"expiresAt": {"lt": _now()}})
+    if deleted:
+        metrics.incr("analysis_cache_purged_total", deleted)
+        logger.info(f"🧹 Purged {deleted} expired cached analyses")
+    return deleted
+
+
+async def run_purger(db) -> None:
+    """Purge expired entries now and every ANALYSIS_CACHE_PURGE_INTERVAL seconds until cancelled."""
+    while True:
+        if db.is_connected():
+            try:
+                await purge_expired(db)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not purge expired cached analyses: {e}")
+                metrics.incr("analysis_cache_errors_total")
+        await asyncio.sleep(config.ANALYSIS_CACHE_PURGE_INTERVAL)
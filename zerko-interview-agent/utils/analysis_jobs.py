@@ -0,0 +1,175 @@
+"""
+In-memory registry of resume analysis jobs for this worker.
+
+Tracks every submitted analysis through its stages (queued, downloading,
+extracting, analyzing, saving, completed/failed) so GET /api/analysis/{id}
+can report progress without a DB round trip, and so a duplicate submission
+for a resumeId that is still running returns the existing job instead of
+starting a second one.
+
+Analyses run at most ANALYSIS_CONCURRENCY at a time; the rest wait in FIFO
+order, which is what the reported queue position refers to. Finished jobs
+are kept for ANALYSIS_JOB_RETENTION seconds.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Coroutine, Dict, List, Optional, Tuple
+
+import config
+from utils.metrics import metrics
+from utils.pubsub import pubsub, analysis_topic
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+DOWNLOADING = "downloading"
+EXTRACTING = "extracting"
+ANALYZING = "analyzing"
+SAVING = "saving"
+COMPLETED = "completed"
+FAILED = "failed"
+
+TERMINAL_STAGES = (COMPLETED, FAILED)
+
+
+@dataclass
+class AnalysisJob:
+    resume_id: str
+    submitted_at: float = field(default_factory=time.monotonic)
+    submitted_wall: float = field(default_factory=time.time)
+    stage: str = QUEUED
+    stage_started_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    detail: Optional[dict] = None
+    history: List[Tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def active(self) -> bool:
+        return self.stage not in TERMINAL_STAGES
+
+
+class AnalysisJobRegistry:
+    def __init__(self, concurrency: int):
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        metrics.register_gauge("analysis_jobs", self.counts)
+
+    def get(self, resume_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(resume_id)
+
+    def submit(
+        self,
+        resume_id: str,
+        run: Callable[[], Coroutine],
+        spawn: Callable[[Coroutine, str], asyncio.Task],
+    ) -> Tuple[AnalysisJob, bool]:
+        """
+        Queue an analysis unless one is already active for resume_id.
+        Returns (job, existing). Synchronous, so two submissions handled in
+        the same loop iteration cannot both start work.
+        """
+        self._prune()
+        job = self._jobs.get(resume_id)
+        if job is not None and job.active:
+            metrics.incr("analysis_duplicate_submissions_total")
+            return job, True
+
+        job = AnalysisJob(resume_id=resume_id)
+        self._jobs[resume_id] = job
+        # Also replaces a previous run's final event replayed to new subscribers
+        pubsub.publish(analysis_topic(resume_id), {"event": "stage", "data": self.status(resume_id)})
+        spawn(self._run(job, run), f"analysis:{resume_id}")
+        metrics.incr("analysis_jobs_submitted_total")
+        return job, False
+
+    async def _run(self, job: AnalysisJob, run: Callable[[], Coroutine]) -> None:
+        try:
+            async with self._semaphore:
+                job.started_at = time.monotonic()
+                metrics.incr("analysis_queue_wait_seconds_total", job.started_at - job.submitted_at)
+                await run()
+        except BaseException as e:
+            self.set_stage(job.resume_id, FAILED, error=str(e) or type(e).__name__)
+            raise
+        finally:
+            if job.active:
+                self.set_stage(job.resume_id, COMPLETED)
+
+    def set_stage(
+        self,
+        resume_id: str,
+        stage: str,
+        error: Optional[str] = None,
+        detail: Optional[dict] = None,
+    ) -> None:
+        """
+        Called by the analysis worker as it moves forward; unknown ids are ignored.
+        Every change is published to SSE subscribers of the analysis topic.
+        """
+        job = self._jobs.get(resume_id)
+        if job is None or not job.active:
+            return
+        now = time.monotonic()
+        job.history.append((job.stage, round(now - job.stage_started_at, 3)))
+        job.stage = stage
+        job.stage_started_at = now
+        if error:
+            job.error = error
+        if detail:
+            job.detail = detail
+        if stage in TERMINAL_STAGES:
+            job.finished_at = now
+        logger.info(f"📍 Analysis {resume_id} -> {stage}")
+        event = stage if stage in TERMINAL_STAGES else "stage"
+        pubsub.publish(analysis_topic(resume_id), {"event": event, "data": self.status(resume_id)})
+
+    def queue_position(self, job: AnalysisJob) -> Optional[int]:
+        """1-based position among queued jobs, or None once the job has started."""
+        if job.stage != QUEUED:
+            return None
+        ahead = sum(
+            1 for other in self._jobs.values()
+            if other.stage == QUEUED and other.submitted_at < job.submitted_at
+        )
+        return ahead + 1
+
+    def status(self, resume_id: str) -> Optional[dict]:
+        job = self._jobs.get(resume_id)
+        if job is None:
+            return None
+        now = time.monotonic()
+        end = job.finished_at or now
+        return {
+            "resumeId": resume_id,
+            "stage": job.stage,
+            "active": job.active,
+            "queue_position": self.queue_position(job),
+            "elapsed_seconds": round(end - job.submitted_at, 3),
+            "stage_elapsed_seconds": round(end - job.stage_started_at, 3) if job.active else None,
+            "queue_wait_seconds": round((job.started_at or end) - job.submitted_at, 3),
+            "submitted_at": job.submitted_wall,
+            "stages": [{"stage": s, "seconds": secs} for s, secs in job.history],
+            "error": job.error,
+            "detail": job.detail,
+        }
+
+    def counts(self) -> dict:
+        stages: Dict[str, int] = {}
+        for job in self._jobs.values():
+            stages[job.stage] = stages.get(job.stage, 0) + 1
+        return stages
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - config.ANALYSIS_JOB_RETENTION
+        for resume_id in [
+            rid for rid, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del self._jobs[resume_id]
+
+
+analysis_jobs = AnalysisJobRegistry(config.ANALYSIS_CONCURRENCY)
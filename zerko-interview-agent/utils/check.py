@@ -1,22 +1,250 @@
-from typing import List
+"""
+ATS formatting analysis of extracted resume text.
+
+analyze_formatting() walks the text once, line by line, without splitting it
+into an intermediate list, and returns structured findings with the line
+number and character offset where each problem first shows up. It is linear
+in the text length and cheap enough to run on every parse.
+
+The findings (as_dict()) are what gets stored in ResumeAnalysis.formattingIssues
+and shown by the frontend; the analysis prompt and the fallback scorer only
+need the messages (finding_messages(), or check_formatting_issues()).
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+
+# --- Thresholds ---
+FRAGMENTATION_RATIO = 0.4       # share of lines with fewer than 4 words
+MULTI_COLUMN_RATIO = 0.15       # share of lines with a wide gap between two text runs
+MULTI_COLUMN_MIN_LINES = 3
+TABLE_MIN_LINES = 3
+REPEATED_LINE_MIN = 3           # same short line seen this often -> header/footer
+REPEATED_LINE_MAX_CHARS = 60
+REPEATED_LINE_MIN_GAP = 10      # repeats closer than this are content, not page furniture
+GARBAGE_DENSITY = 0.005         # share of characters that are unreadable
+GARBAGE_MIN_CHARS = 5
+
+REQUIRED_SECTIONS = ("experience", "education", "skills")
+_SECTION_ALIASES = {
+    "experience": ("experience", "work experience", "professional experience", "employment", "work history"),
+    "education": ("education", "academic background", "academics", "qualifications"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "competencies", "technologies"),
+}
+_SECTION_LOOKUP = {alias: section for section, aliases in _SECTION_ALIASES.items() for alias in aliases}
+
+_BULLETS = "•●○◦▪■□►▸‣–—*-·"
+_COLUMN_GAP = re.compile(r"\S(?: {4,}|\t+)\S")
+_TABLE_CELL = re.compile(r"\s\|\s|\t")
+_GARBAGE = re.compile(r"[\ue000-\uf8ff\ufffd\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")  # private use, U+FFFD, control
+_DIGITS = re.compile(r"\d+")
+_MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = re.compile(
+    r"(?P<month_name>\b" + _MONTHS + r"\s+\d{4}\b)"
+    r"|(?P<slash>\b\d{1,2}/\d{4}\b)"
+    r"|(?P<iso>\b\d{4}-\d{2}\b)"
+    r"|(?P<dash>\b\d{1,2}-\d{4}\b)",
+    re.IGNORECASE,
+)
+_DATE_STYLE_LABELS = {
+    "month_name": "Mon YYYY",
+    "slash": "MM/YYYY",
+    "iso": "YYYY-MM",
+    "dash": "MM-YYYY",
+}
+
+
+@dataclass
+class FormattingFinding:
+    code: str
+    message: str
+    severity: str = "warning"      # "warning" | "error"
+    line: Optional[int] = None     # 1-based line of the first occurrence
+    offset: Optional[int] = None   # character offset of that line in the text
+    count: int = 1
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _iter_lines(text: str):
+    """Yield (line_no, offset, line) without building a list of lines."""
+    start, line_no, length = 0, 1, len(text)
+    while start <= length:
+        end = text.find("\n", start)
+        if end == -1:
+            end = length
+        yield line_no, start, text[start:end]
+        start, line_no = end + 1, line_no + 1
+
+
+class _First:
+    """Count occurrences and remember where the first one was."""
+    __slots__ = ("count", "line", "offset")
+
+    def __init__(self):
+        self.count = 0
+        self.line: Optional[int] = None
+        self.offset: Optional[int] = None
+
+    def add(self, line: int, offset: int, n: int = 1) -> None:
+        if self.count == 0:
+            self.line, self.offset = line, offset
+        self.count += n
+
+
+def analyze_formatting(text: str) -> List[FormattingFinding]:
+    """Single pass over the text; returns findings ordered by first position."""
+    cid, columns, tables, garbage = _First(), _First(), _First(), _First()
+    bullets: Dict[str, _First] = {}
+    dates: Dict[str, _First] = {}
+    repeated: Dict[str, _First] = {}
+    repeated_counts: Counter = Counter()
+    repeated_last: Dict[str, int] = {}
+    sections_found = set()
+    lines = short_lines = chars = 0
+
+    for line_no, offset, raw in _iter_lines(text):
+        chars += len(raw)
+        if "(cid:" in raw:
+            cid.add(line_no, offset, raw.count("(cid:"))
+        if _GARBAGE.search(raw):
+            garbage.add(line_no, offset, sum(1 for _ in _GARBAGE.finditer(raw)))
+
+        line = raw.strip()
+        if not line:
+            continue
+        lines += 1
+        words = len(line.split())
+        if words < 4:
+            short_lines += 1
+
+        if _COLUMN_GAP.search(raw):
+            columns.add(line_no, offset)
+        if line.count(" | ") >= 2 or len(_TABLE_CELL.findall(raw)) >= 2:
+            tables.add(line_no, offset)
+
+        marker = line[0]
+        if marker in _BULLETS and len(line) > 1 and line[1] == " ":
+            bullets.setdefault(marker, _First()).add(line_no, offset)
+
+        if any(ch.isdigit() for ch in line):
+            for match in _DATE.finditer(line):
+                dates.setdefault(match.lastgroup, _First()).add(line_no, offset)
+
+        # "SKILLS" on its own line, or an inline "Skills: Python, Go"
+        heading = line.split(":", 1)[0].strip().lower() if ":" in line else (line.lower() if words <= 4 else "")
+        section = _SECTION_LOOKUP.get(heading)
+        if section:
+            sections_found.add(section)
+        if len(line) <= REPEATED_LINE_MAX_CHARS:
+            # "Page 1 of 3" and "Page 2 of 3" are the same footer
+            key = _DIGITS.sub("#", line.lower())
+            last = repeated_last.get(key)
+            if last is None or line_no - last >= REPEATED_LINE_MIN_GAP:
+                repeated_counts[key] += 1
+                repeated_last[key] = line_no
+                if key not in repeated:
+                    repeated[key] = _First()
+                    repeated[key].add(line_no, offset)
+
+    findings: List[FormattingFinding] = []
+
+    if cid.count:
+        findings.append(FormattingFinding(
+            "cid_fonts", "Unreadable fonts detected (CID encoding error). Avoid using custom fonts.",
+            "error", cid.line, cid.offset, cid.count,
+        ))
+    if chars and garbage.count >= GARBAGE_MIN_CHARS and garbage.count / chars > GARBAGE_DENSITY:
+        findings.append(FormattingFinding(
+            "garbage_characters",
+            "Unreadable characters detected. Some symbols or fonts did not extract as text.",
+            "error", garbage.line, garbage.offset, garbage.count,
+        ))
+    if lines and short_lines / lines > FRAGMENTATION_RATIO:
+        findings.append(FormattingFinding(
+            "fragmentation",
+            "High fragmentation detected. This often happens when using Tables or Multi-column layouts.",
+            count=short_lines,
+        ))
+    if columns.count >= MULTI_COLUMN_MIN_LINES and columns.count / lines > MULTI_COLUMN_RATIO:
+        findings.append(FormattingFinding(
+            "multi_column",
+            "Multi-column layout detected. ATS parsers may read columns out of order; use a single column.",
+            line=columns.line, offset=columns.offset, count=columns.count,
+        ))
+    if tables.count >= TABLE_MIN_LINES:
+        findings.append(FormattingFinding(
+            "tables", "Table layout detected. Many ATS parsers skip or scramble table cells.",
+            line=tables.line, offset=tables.offset, count=tables.count,
+        ))
+
+    headers = [key for key, n in repeated_counts.items() if n >= REPEATED_LINE_MIN]
+    if headers:
+        first = min((repeated[key] for key in headers), key=lambda f: f.offset)
+        findings.append(FormattingFinding(
+            "repeated_header_footer",
+            "Repeated header/footer text detected. Keep contact details in the body, not in page headers or footers.",
+            line=first.line, offset=first.offset, count=sum(repeated_counts[k] for k in headers),
+        ))
+
+    if len(bullets) > 1:
+        minority = _minority(bullets)
+        if minority is not None:
+            marker, first = minority
+            findings.append(FormattingFinding(
+                "inconsistent_bullets",
+                f"Inconsistent bullet styles ({' '.join(sorted(bullets))}). Use one bullet character throughout.",
+                line=first.line, offset=first.offset, count=sum(b.count for b in bullets.values()),
+            ))
+
+    if len(dates) > 1:
+        minority = _minority(dates)
+        if minority is not None:
+            style, first = minority
+            styles = ", ".join(_DATE_STYLE_LABELS[s] for s in sorted(dates))
+            findings.append(FormattingFinding(
+                "inconsistent_dates",
+                f"Inconsistent date formats ({styles}). Use one date format throughout.",
+                line=first.line, offset=first.offset, count=sum(d.count for d in dates.values()),
+            ))
+
+    missing = [s for s in REQUIRED_SECTIONS if s not in sections_found]
+    if lines and missing:
+        findings.append(FormattingFinding(
+            "missing_sections",
+            f"Missing standard section headers: {', '.join(s.title() for s in missing)}.",
+            count=len(missing),
+        ))
+
+    findings.sort(key=lambda f: (f.offset is None, f.offset or 0))
+    return findings
+
+
+def _minority(groups: Dict[str, _First]) -> Optional[Tuple[str, _First]]:
+    """The least used style, if it is used more than once (a single odd one is noise)."""
+    key, first = min(groups.items(), key=lambda item: item[1].count)
+    return (key, first) if first.count >= 2 or len(groups) > 2 else None
+
 
 def check_formatting_issues(text: str) -> List[str]:
     """
     Analyzes raw text for common ATS parsing issues.
     """
-    issues = []
-    
-    # Check 1: Garbage Characters
-    if "(cid:" in text:
-        issues.append("Unreadable fonts detected (CID encoding error). Avoid using custom fonts.")
-
-    lines = [line for line in text.split('\n') if line.strip()]
-    
-    # Check 2: High Fragmentation
-    if lines:
-        short_lines = sum(1 for line in lines if len(line.split()) < 4)
-        fragmentation_ratio = short_lines / len(lines)
-        if fragmentation_ratio > 0.4:
-            issues.append("High fragmentation detected. This often happens when using Tables or Multi-column layouts.")
-
-    return issues
\ No newline at end of file
+    return [finding.message for finding in analyze_formatting(text)]
+
+
+def findings_from_json(value) -> List[dict]:
+    """
+    Stored formattingIssues as finding dicts. Rows saved before positions
+    were kept hold plain messages; those become findings without a position.
+    """
+    return [
+        item if isinstance(item, dict) else FormattingFinding("unclassified", str(item)).as_dict()
+        for item in (value or [])
+    ]
+
+
+def finding_messages(findings: List[dict]) -> List[str]:
+    return [finding["message"] for finding in findings]
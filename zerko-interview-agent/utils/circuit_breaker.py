@@ -0,0 +1,220 @@
+"""
+Circuit breaker shared by every agent that calls Gemini.
+
+When the quota runs out, each caller used to discover it on its own: tenacity
+backed off for minutes, the feedback agent slept and retried, and interview
+turns each waited for their own 429. The breaker trips after a few quota
+errors (as classified by is_quota_error) and then fails fast, letting callers
+take their degraded path immediately. After a cool-down it lets a limited
+number of trial calls through (half-open); a success closes it again, another
+quota error re-opens it with a longer cool-down. Only results of calls admitted
+in the current state count: a slow call that started before the circuit
+tripped cannot close it (or reset its back-off) when it finally returns.
+
+Gemini quotas are per model, so there is one breaker per model (breaker_for):
+the router falls back to the light model exactly when the primary is being
+throttled, and that fallback must not be rejected by the primary's open
+circuit. State is per worker process.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import config
+from utils.errors import QuotaExceededError, is_quota_error
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(QuotaExceededError):
+    """Raised instead of calling Gemini while the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.retry_after = max(1, int(round(retry_after)))
+        super().__init__(
+            f"{name} circuit is open after repeated quota errors; retry in {self.retry_after}s"
+        )
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        max_recovery_timeout: float,
+        half_open_max_calls: int = 1,
+        classifier: Callable[[Exception], bool] = is_quota_error,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.classifier = classifier
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._recovery_timeout = recovery_timeout
+        self._trial_calls = 0
+        self._generation = 0
+
+    # ---- state ----
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self._recovery_timeout - time.monotonic())
+
+    def _set_state(self, state: str) -> None:
+        # Caller holds the lock. Every transition starts a new generation, so
+        # results of calls admitted under an earlier state can be told apart.
+        self._state = state
+        self._generation += 1
+
+    def _maybe_half_open(self) -> None:
+        # Caller holds the lock
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._recovery_timeout:
+            self._set_state(HALF_OPEN)
+            self._trial_calls = 0
+            logger.info(f"🟡 [{self.name}] Circuit half-open, allowing trial calls")
+
+    def _open(self) -> None:
+        # Caller holds the lock
+        if self._state == HALF_OPEN:
+            # Trial failed: back off harder before probing again
+            self._recovery_timeout = min(self._recovery_timeout * 2, self.max_recovery_timeout)
+        self._set_state(OPEN)
+        self._opened_at = time.monotonic()
+        metrics.incr("circuit_trips_total", breaker=self.name)
+        logger.warning(
+            f"🔴 [{self.name}] Circuit opened after quota errors; failing fast for {self._recovery_timeout:.0f}s"
+        )
+
+    # ---- call protocol ----
+    def before_call(self) -> int:
+        """
+        Reserve permission to call, or raise CircuitOpenError. Returns the
+        generation to pass to record_success/record_failure with the result.
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                remaining = self._opened_at + self._recovery_timeout - time.monotonic()
+                metrics.incr("circuit_rejected_total", breaker=self.name)
+                raise CircuitOpenError(self.name, remaining)
+            if self._state == HALF_OPEN:
+                if self._trial_calls >= self.half_open_max_calls:
+                    metrics.incr("circuit_rejected_total", breaker=self.name)
+                    raise CircuitOpenError(self.name, self.base_recovery_timeout)
+                self._trial_calls += 1
+            return self._generation
+
+    def _is_late(self, generation: int) -> bool:
+        # Caller holds the lock. A call admitted before the last transition
+        # (e.g. a slow call that started before the circuit tripped) says
+        # nothing about the current state and must not close an open circuit.
+        if generation == self._generation:
+            return False
+        metrics.incr("circuit_late_results_total", breaker=self.name)
+        return True
+
+    def record_success(self, generation: int) -> None:
+        with self._lock:
+            if self._is_late(generation):
+                return
+            if self._state == HALF_OPEN:
+                logger.info(f"🟢 [{self.name}] Trial call succeeded, circuit closed")
+                self._set_state(CLOSED)
+                self._recovery_timeout = self.base_recovery_timeout
+            self._failures = 0
+
+    def record_failure(self, exc: Exception, generation: int) -> None:
+        if not self.classifier(exc):
+            # Only quota exhaustion trips the breaker; other errors prove the
+            # quota is not the problem, so they count as a successful probe.
+            self.record_success(generation)
+            return
+        with self._lock:
+            if self._is_late(generation):
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        generation = self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e, generation)
+            raise
+        self.record_success(generation)
+        return result
+
+    def snapshot(self) -> dict:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_quota_errors": self._failures,
+            "retry_after": round(self.retry_after(), 1),
+        }
+
+
+def _new_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout=config.CIRCUIT_RECOVERY_TIMEOUT,
+        max_recovery_timeout=config.CIRCUIT_MAX_RECOVERY_TIMEOUT,
+        half_open_max_calls=config.CIRCUIT_HALF_OPEN_MAX_CALLS,
+    )
+
+
+# Calls made without a routed model share this one
+gemini_breaker = _new_breaker("gemini")
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(model: Optional[str]) -> CircuitBreaker:
+    """The breaker guarding calls to this model (created on first use)."""
+    if not model:
+        return gemini_breaker
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = _new_breaker(f"gemini:{model}")
+        return breaker
+
+
+def circuits_open(models: Iterable[Optional[str]]) -> bool:
+    """True when every one of these models' circuits is open (nothing left to try)."""
+    return all(breaker_for(model).is_open for model in set(models))
+
+
+def _snapshot() -> dict:
+    with _breakers_lock:
+        breakers = {"default": gemini_breaker, **_breakers}
+    return {model: breaker.snapshot() for model, breaker in breakers.items()}
+
+
+metrics.register_gauge("circuit_gemini", _snapshot)
@@ -0,0 +1,60 @@
+"""
+Run a blocking call with a deadline.
+
+Interview turns must not eat into the candidate's remaining time: the LLM
+call runs on a small dedicated pool and the caller stops waiting when the
+budget is spent. A call that is already running cannot be interrupted from
+another thread, so callers should also pass the budget as the client's
+request timeout; the abandoned call then ends on its own shortly after and
+its result is discarded.
+
+The deadline also travels with the call in a context variable. The LLM
+gateway checks it before and after waiting for a scheduler slot, so work
+whose caller has already given up drops out instead of taking a slot (and
+quota) for a result nobody reads.
+"""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Callable, Optional, TypeVar
+
+import config
+
+T = TypeVar("T")
+
+_deadline_pool = ThreadPoolExecutor(max_workers=config.DEADLINE_MAX_WORKERS, thread_name_prefix="llm-deadline")
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call did not finish within its latency budget."""
+
+
+# time.monotonic() at which the current call's caller stops waiting
+_expires_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline_expires_at", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (may be negative), or None without one."""
+    expires_at = _expires_at.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded if the caller of this work has already given up."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("deadline passed before the call started")
+
+
+def call_with_deadline(fn: Callable[..., T], budget: float, *args, **kwargs) -> T:
+    """fn(*args, **kwargs), or DeadlineExceeded once budget seconds have passed."""
+    # Per-request context variables follow the call into the pool thread,
+    # together with the deadline itself
+    ctx = contextvars.copy_context()
+    ctx.run(_expires_at.set, time.monotonic() + budget)
+    future = _deadline_pool.submit(ctx.run, fn, *args, **kwargs)
+    try:
+        return future.result(timeout=budget)
+    except FuturesTimeout:
+        future.cancel()
+        raise DeadlineExceeded(f"call exceeded its {budget:.1f}s budget") from None
@@ -0,0 +1,56 @@
+"""
+Tracking of detached background work so a worker can drain it on shutdown.
+
+Each uvicorn worker process owns its own tracker. On shutdown the lifespan
+waits (up to a timeout) for in-flight analyses before disconnecting Prisma,
+instead of letting the process exit underneath them.
+"""
+import asyncio
+import logging
+from typing import Coroutine, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class InflightTasks:
+    def __init__(self):
+        self._tasks: Dict[asyncio.Task, str] = {}
+        self._accepting = True
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def spawn(self, coro: Coroutine, name: str) -> asyncio.Task:
+        """Run a coroutine detached from the request and keep track of it."""
+        if not self._accepting:
+            coro.close()
+            raise RuntimeError("Worker is shutting down; not accepting new background work")
+        task = asyncio.create_task(coro, name=name)
+        self._tasks[task] = name
+        task.add_done_callback(self._discard)
+        return task
+
+    def _discard(self, task: asyncio.Task) -> None:
+        self._tasks.pop(task, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ Background task {task.get_name()} crashed: {task.exception()}")
+
+    async def drain(self, timeout: float) -> None:
+        """Stop accepting work and wait for in-flight tasks, cancelling stragglers."""
+        self._accepting = False
+        if not self._tasks:
+            return
+        logger.info(f"⏳ Draining {len(self._tasks)} in-flight background task(s) (timeout {timeout}s)")
+        done, pending = await asyncio.wait(list(self._tasks), timeout=timeout)
+        if pending:
+            names = [self._tasks.get(t, t.get_name()) for t in pending]
+            logger.warning(f"⚠️ Cancelling {len(pending)} background task(s) after drain timeout: {names}")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        else:
+            logger.info(f"✅ Drained {len(done)} background task(s)")
@@ -0,0 +1,41 @@
+"""
+Lightweight error types shared by the agents and the API layer.
+
+Kept free of langchain/google imports so app.py can classify errors
+without pulling the agent modules in at startup.
+"""
+
+try:
+    from google.api_core.exceptions import ResourceExhausted as GoogleResourceExhausted
+except ImportError:
+    GoogleResourceExhausted = None
+
+
+class QuotaExceededError(Exception):
+    """Raised when the Gemini API quota/rate limit is exceeded."""
+    pass
+
+
+def is_quota_error(e: Exception) -> bool:
+    """Reliably detect Gemini quota/rate-limit errors regardless of wrapping."""
+    if isinstance(e, QuotaExceededError):
+        return True
+    if GoogleResourceExhausted and isinstance(e, GoogleResourceExhausted):
+        return True
+    err_str = str(e)
+    type_name = type(e).__name__
+    return (
+        "ResourceExhausted" in type_name
+        or "429" in err_str
+        or "quota exceeded" in err_str.lower()
+        or "rate limit" in err_str.lower()
+    )
+
+
+class QuestionCountMismatch(Exception):
+    """A streamed question set did not have the planned number of questions."""
+
+    def __init__(self, expected: int, received: int):
+        super().__init__(f"Expected {expected} questions, the model generated {received}")
+        self.expected = expected
+        self.received = received
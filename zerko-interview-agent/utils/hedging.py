@@ -0,0 +1,121 @@
+"""
+Hedged LLM requests for latency-critical interview turns.
+
+If the first call has not answered within an adaptive threshold (the model's
+observed p90 by default), an identical second request is fired and whichever
+finishes first wins. A budget caps hedges at HEDGE_BUDGET_PERCENT of hedgeable
+calls so a slow Gemini never doubles our quota usage.
+
+Both requests run on a dedicated pool. The losing request is cancelled if it
+has not started; a request already in flight cannot be interrupted from
+another thread, so its result is simply discarded when it arrives.
+"""
+import contextvars
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import config
+from utils.llm_gateway import invoke_llm
+from utils.metrics import metrics
+from utils.model_router import model_router
+
+logger = logging.getLogger(__name__)
+
+_hedge_pool = ThreadPoolExecutor(max_workers=config.HEDGE_MAX_WORKERS, thread_name_prefix="llm-hedge")
+
+
+class HedgeBudget:
+    """
+    Token bucket: every hedgeable call deposits HEDGE_BUDGET_PERCENT/100 of a
+    token, every hedge spends one. Over any stretch of traffic hedges therefore
+    stay below the configured percentage of calls.
+    """
+
+    def __init__(self, percent: float, max_tokens: float = 10.0):
+        self.ratio = percent / 100.0
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            # Tolerance for float drift: ten deposits of 0.1 add up to 0.999...
+            if self._tokens >= 1.0 - 1e-9:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+hedge_budget = HedgeBudget(config.HEDGE_BUDGET_PERCENT)
+
+
+def hedge_delay(model: str) -> float:
+    """Seconds to wait for the first request before hedging."""
+    observed = model_router.latency_percentile(model, config.HEDGE_PERCENTILE)
+    delay = observed if observed is not None else config.HEDGE_DEFAULT_DELAY
+    return min(config.HEDGE_MAX_DELAY, max(config.HEDGE_MIN_DELAY, delay))
+
+
+def _submit(runnable, prompt, agent: str, model: str):
+    # Copy the caller's context so per-request context variables follow the call
+    ctx = contextvars.copy_context()
+    return _hedge_pool.submit(ctx.run, invoke_llm, runnable, prompt, agent=agent, model=model)
+
+
+def invoke_llm_hedged(runnable, prompt, *, agent: str, model: str):
+    """invoke_llm() with an optional hedge; falls back to a plain call when disabled."""
+    if not config.INTERVIEW_HEDGING_ENABLED:
+        return invoke_llm(runnable, prompt, agent=agent, model=model)
+
+    metrics.incr("hedge_eligible_calls_total", agent=agent)
+    hedge_budget.deposit()
+    delay = hedge_delay(model)
+
+    first = _submit(runnable, prompt, agent, model)
+    # Not first.result(timeout=...): its TimeoutError is the builtin one, so a
+    # first call that failed with DeadlineExceeded or SlotTimeout would look slow
+    done, _ = wait([first], timeout=delay)
+    if first in done:
+        return first.result()
+
+    if not hedge_budget.try_spend():
+        metrics.incr("hedge_budget_exhausted_total", agent=agent)
+        return first.result()
+
+    logger.info("⏱️ %s call slower than %.2fs, sending hedged request", agent, delay)
+    metrics.incr("hedges_fired_total", agent=agent)
+    second = _submit(runnable, prompt, agent, model)
+
+    pending = {first, second}
+    last_error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is second:
+                    metrics.incr("hedge_wins_total", agent=agent)
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            last_error = future.exception()
+    # Both requests failed: surface the last error like a plain call would
+    raise last_error
+
+
+def hedge_stats() -> dict:
+    eligible = metrics.get("hedge_eligible_calls_total", agent="interview")
+    fired = metrics.get("hedges_fired_total", agent="interview")
+    wins = metrics.get("hedge_wins_total", agent="interview")
+    return {
+        "enabled": config.INTERVIEW_HEDGING_ENABLED,
+        "hedge_rate": round(fired / eligible, 4) if eligible else 0.0,
+        "win_rate": round(wins / fired, 4) if fired else 0.0,
+    }
+
+
+metrics.register_gauge("hedging_interview", hedge_stats)
@@ -0,0 +1,114 @@
+"""
+Incremental parsing of a JSON object that arrives in chunks.
+
+Used to stream generated questions: the model's JSON output is fed in as it
+is generated, and each element of a top-level array (e.g. one entry of
+"questions") is reported as soon as its closing brace arrives, without
+waiting for the rest of the document.
+
+Only the first two levels are tracked: top-level members and the items of
+top-level arrays. Anything before the opening brace (such as a ```json
+fence) and anything after the closing brace is ignored. Each character is
+scanned once; complete values are decoded with json.loads.
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+ITEM = "item"    # (ITEM, key, value): one element of the array under top-level `key`
+VALUE = "value"  # (VALUE, key, value): the whole top-level member `key`
+
+Event = Tuple[str, str, Any]
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self._text = ""
+        self._pos = 0  # index of the next unscanned character
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._string_start = 0
+        self._scalar_start: Optional[int] = None
+        self._starts: Dict[int, int] = {}  # depth -> start index of the value being read there
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Event]:
+        """Consume the next chunk and return the values it completed, in order."""
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        events: List[Event] = []
+        text = self._text
+        for i in range(self._pos, len(text)):
+            if self.done:
+                break
+            self._scan(text, i, text[i], events)
+        self._pos = len(text)
+        return events
+
+    # --- scanner ---
+
+    def _scan(self, text: str, i: int, c: str, events: List[Event]) -> None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif c == "\\":
+                self._escape = True
+            elif c == '"':
+                self._in_string = False
+                if self._string_is_key:
+                    self._key = json.loads(text[self._string_start:i + 1])
+                else:
+                    self._complete(text, len(self._stack), i + 1, events)
+            return
+
+        depth = len(self._stack)
+        if depth == 0:
+            # Skip any preamble until the top-level object opens
+            if c == "{":
+                self._stack.append("{")
+                self._expect_key = True
+            return
+
+        if self._scalar_start is not None and (c in _WHITESPACE or c in ",]}"):
+            self._complete(text, depth, i, events)
+            self._scalar_start = None
+
+        if c in _WHITESPACE:
+            return
+        if c == '"':
+            self._in_string = True
+            self._string_start = i
+            self._string_is_key = depth == 1 and self._expect_key
+            if not self._string_is_key:
+                self._starts[depth] = i
+        elif c in "{[":
+            self._starts[depth] = i
+            self._stack.append(c)
+        elif c in "}]":
+            self._stack.pop()
+            if not self._stack:
+                self.done = True
+                return
+            self._complete(text, len(self._stack), i + 1, events)
+        elif c == ":":
+            if depth == 1:
+                self._expect_key = False
+        elif c == ",":
+            if depth == 1:
+                self._expect_key = True
+        elif self._scalar_start is None:
+            self._scalar_start = i
+            self._starts[depth] = i
+
+    def _complete(self, text: str, depth: int, end: int, events: List[Event]) -> None:
+        """A value that started at `depth` ended just before `end`."""
+        if depth == 1:
+            events.append((VALUE, self._key, json.loads(text[self._starts[1]:end])))
+        elif depth == 2 and self._stack[1] == "[":
+            events.append((ITEM, self._key, json.loads(text[self._starts[2]:end])))
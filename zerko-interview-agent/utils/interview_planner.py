@@ -0,0 +1,126 @@
+"""
+Local planning of interview size and LLM output budgets.
+
+Question generation used to receive the duration as free text ("10m") and
+let the model decide how many questions to write, so output length and
+generation time varied from call to call. The plan is now computed here:
+
+  question_count      duration / MINUTES_PER_QUESTION[type], clamped to
+                      [MIN_QUESTIONS, MAX_QUESTIONS]
+  words_per_question  WORDS_PER_QUESTION[type]
+  max_output_tokens   what that output needs (questions, ids, summary, JSON
+                      overhead) plus OUTPUT_THINKING_ALLOWANCE
+
+The count is put into the prompt and the response schema, and every agent
+call gets a max_output_tokens ceiling from output_token_limit().
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import config
+
+_DEFAULT_TYPE = "TECHNICAL"
+_JSON_TOKENS_PER_QUESTION = 12  # {"id": n, "question": "..."} scaffolding
+_JSON_TOKENS_BASE = 30
+# "1h 30m", "90 min", "45 minutes": only the first letter of the unit matters
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)\s*([hms])?", re.I)
+
+
+def parse_duration_minutes(duration: Union[str, int, float, None]) -> int:
+    """
+    Minutes in a duration such as "30m", "30", "1h", "1h 30m" or "45 minutes".
+    Bare numbers are minutes. Falls back to DEFAULT_INTERVIEW_MINUTES.
+    """
+    if isinstance(duration, (int, float)):
+        minutes = float(duration)
+    else:
+        minutes = 0.0
+        for value, unit in _DURATION_PART.findall(str(duration or "")):
+            unit = (unit or "m").lower()
+            if unit.startswith("h"):
+                minutes += float(value) * 60
+            elif unit.startswith("s"):
+                minutes += float(value) / 60
+            else:
+                minutes += float(value)
+    if minutes <= 0:
+        return config.DEFAULT_INTERVIEW_MINUTES
+    return max(1, round(minutes))
+
+
+def _tokens(words: float) -> int:
+    return int(words * config.TOKENS_PER_WORD + 0.5)
+
+
+def _with_allowance(tokens: int) -> int:
+    return tokens + config.OUTPUT_THINKING_ALLOWANCE
+
+
+@dataclass(frozen=True)
+class QuestionPlan:
+    minutes: int
+    interview_type: str
+    question_count: int
+    words_per_question: int
+    max_output_tokens: int
+
+    def prompt_instructions(self) -> str:
+        return (
+            f"Write exactly {self.question_count} questions for this {self.minutes}-minute interview, "
+            f"numbered 1 to {self.question_count}. Keep each question under {self.words_per_question} words "
+            f"and the interview summary to 2-3 lines."
+        )
+
+    def as_meta(self) -> dict:
+        return {
+            "minutes": self.minutes,
+            "question_count": self.question_count,
+            "words_per_question": self.words_per_question,
+            "max_output_tokens": self.max_output_tokens,
+        }
+
+
+def plan_questions(duration: Union[str, int, float, None], interview_type: Optional[str]) -> QuestionPlan:
+    """Question count and length budget for an interview of this duration and type."""
+    kind = (interview_type or "").upper()
+    if kind not in config.MINUTES_PER_QUESTION:
+        kind = _DEFAULT_TYPE
+    minutes = parse_duration_minutes(duration)
+    count = round(minutes / config.MINUTES_PER_QUESTION[kind])
+    count = min(config.MAX_QUESTIONS, max(config.MIN_QUESTIONS, count))
+    words = config.WORDS_PER_QUESTION[kind]
+
+    answer_tokens = (
+        count * (_tokens(words) + _JSON_TOKENS_PER_QUESTION)
+        + _tokens(config.SUMMARY_WORDS)
+        + _JSON_TOKENS_BASE
+    )
+    return QuestionPlan(
+        minutes=minutes,
+        interview_type=kind,
+        question_count=count,
+        words_per_question=words,
+        max_output_tokens=_with_allowance(answer_tokens),
+    )
+
+
+def output_token_limit(agent: str, question_count: int = 0, plan: Optional[QuestionPlan] = None) -> Optional[int]:
+    """
+    max_output_tokens for an agent's call, or None when budgets are disabled
+    (the model default then applies). "questions" needs its QuestionPlan;
+    "feedback" scales with the number of questions asked.
+    """
+    if not config.OUTPUT_BUDGETS_ENABLED:
+        return None
+    if agent == "questions":
+        return plan.max_output_tokens if plan else None
+    if agent == "interview":
+        return _with_allowance(config.INTERVIEW_MAX_OUTPUT_TOKENS)
+    if agent == "feedback":
+        return _with_allowance(
+            config.FEEDBACK_BASE_OUTPUT_TOKENS + question_count * config.FEEDBACK_OUTPUT_TOKENS_PER_QUESTION
+        )
+    if agent == "analysis":
+        return _with_allowance(config.ANALYSIS_MAX_OUTPUT_TOKENS)
+    return None
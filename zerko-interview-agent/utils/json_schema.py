@@ -0,0 +1,46 @@
+"""
+JSON schemas for Gemini's response_schema.
+
+Pydantic puts nested models under "$defs" and points to them with "$ref",
+which Gemini's schema format does not resolve. with_structured_output
+dereferences the schema before sending it; response_schema() does the same
+for calls that pass the schema to the model directly (streamed JSON output).
+"""
+from typing import Any, Dict, Tuple, Type
+
+from pydantic import BaseModel
+
+_REF_PREFIX = "#/$defs/"
+
+
+def _inline(node: Any, defs: Dict[str, Any], expanding: Tuple[str, ...] = ()) -> Any:
+    if isinstance(node, list):
+        return [_inline(item, defs, expanding) for item in node]
+    if not isinstance(node, dict):
+        return node
+    if "$ref" in node:
+        ref = node["$ref"]
+        name = ref[len(_REF_PREFIX):]
+        if not ref.startswith(_REF_PREFIX) or name not in defs:
+            raise ValueError(f"Cannot resolve schema reference {ref!r}")
+        if name in expanding:
+            raise ValueError(f"Recursive schema reference {ref!r} cannot be inlined")
+        # Sibling keys (e.g. a field description) override the referenced schema's
+        siblings = {k: v for k, v in node.items() if k != "$ref"}
+        return {**_inline(defs[name], defs, expanding + (name,)), **_inline(siblings, defs, expanding)}
+    inlined = {}
+    for key, value in node.items():
+        if key in ("$defs", "title"):
+            continue
+        if key == "properties":
+            # Property names are data, not schema keywords: keep all of them
+            inlined[key] = {name: _inline(prop, defs, expanding) for name, prop in value.items()}
+        else:
+            inlined[key] = _inline(value, defs, expanding)
+    return inlined
+
+
+def response_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """model's JSON schema with every $ref inlined and no $defs or titles."""
+    schema = model.model_json_schema()
+    return _inline(schema, schema.get("$defs", {}))
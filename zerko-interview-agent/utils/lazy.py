@@ -0,0 +1,108 @@
+"""
+Lazy loading of agent modules and heavy dependencies.
+
+The agents pull in langchain, langchain_community, google-genai and tenacity.
+Importing them eagerly makes every cold container pay for all of it before the
+port is even bound. LazyModule defers the import to first attribute access and
+records how long each import took, so start-to-ready time can be measured.
+"""
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Captured when this module is first imported (i.e. very early in app.py)
+PROCESS_START = time.time()
+
+_import_timings: Dict[str, float] = {}
+_timings_lock = threading.Lock()
+_milestones: Dict[str, float] = {}
+
+
+def timed_import(module_name: str):
+    """Import a module and record the wall time spent (0 if already loaded)."""
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - start
+    with _timings_lock:
+        # Keep the first (cold) measurement only
+        _import_timings.setdefault(module_name, elapsed)
+    return module
+
+
+class LazyModule:
+    """
+    Proxy that imports the wrapped module on first attribute access.
+
+    importlib holds a per-module lock, so concurrent first requests in the
+    threadpool block on the same import instead of racing it.
+    """
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    logger.info("📦 Loading %s on first use", self._module_name)
+                    self._module = timed_import(self._module_name)
+        return self._module
+
+    async def aload(self):
+        """Load from async code without blocking the event loop on the import."""
+        if self._module is not None:
+            return self._module
+        return await asyncio.to_thread(self.load)
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self.load(), name)
+
+
+def mark(milestone: str) -> None:
+    """Record a startup milestone (seconds since process start)."""
+    _milestones.setdefault(milestone, round(time.time() - PROCESS_START, 3))
+
+
+def warm_up(modules: Iterable, extra_imports: Optional[Iterable[str]] = None) -> None:
+    """
+    Import heavy dependencies and agent modules in order.
+
+    Dependencies are imported first and one at a time so the report attributes
+    cost to each library rather than lumping it under the first agent.
+    """
+    start = time.perf_counter()
+    for dep in extra_imports or ():
+        try:
+            timed_import(dep)
+        except Exception as e:
+            logger.warning("⚠️ Warm-up could not import %s: %s", dep, e)
+    for module in modules:
+        try:
+            module.load()
+        except Exception as e:
+            logger.warning("⚠️ Warm-up could not load %s: %s", module._module_name, e)
+    mark("warm_up_completed")
+    logger.info("🔥 Warm-up finished in %.2fs", time.perf_counter() - start)
+    logger.info("📊 Import report: %s", import_report())
+
+
+def import_report() -> dict:
+    """Cold import cost per module plus startup milestones, slowest first."""
+    with _timings_lock:
+        timings = sorted(_import_timings.items(), key=lambda kv: kv[1], reverse=True)
+    return {
+        "milestones": dict(_milestones),
+        "imports": [{"module": name, "seconds": round(secs, 3)} for name, secs in timings],
+        "total_import_seconds": round(sum(secs for _, secs in timings), 3),
+    }
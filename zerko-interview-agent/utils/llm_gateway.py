@@ -0,0 +1,149 @@
+"""
+Single choke point for Gemini calls made by the agents.
+
+Every agent goes through invoke_llm() instead of calling .invoke() on its
+model or chain directly, so cross-cutting policies (the per-model circuit
+breakers, model routing feedback, priority scheduling, token accounting, and
+anything that needs to see every call) live in one place.
+"""
+import contextlib
+import json
+import logging
+import time
+from typing import Callable, Optional
+
+import config
+
+from utils.circuit_breaker import breaker_for, CircuitOpenError
+from utils.errors import is_quota_error
+from utils.model_router import model_router, RouteDecision
+from utils.llm_scheduler import llm_scheduler, SlotTimeout
+from utils.deadline import DeadlineExceeded, check_deadline, remaining
+from utils.metrics import metrics
+from utils.usage import usage_tracker
+
+logger = logging.getLogger(__name__)
+
+
+def route_model(agent: str, prompt_chars: int = 0, primary: Optional[str] = None) -> RouteDecision:
+    """Pick the model for this call; see utils/model_router.py."""
+    return model_router.route(agent, prompt_chars, primary)
+
+
+def _slot(agent: str, timeout: Optional[float] = None):
+    if not config.LLM_SCHEDULER_ENABLED:
+        return contextlib.nullcontext()
+    return llm_scheduler.slot(agent, timeout)
+
+
+def _drop_expired(agent: str, stage: str) -> None:
+    try:
+        check_deadline()
+    except DeadlineExceeded:
+        metrics.incr("llm_deadline_dropped_total", agent=agent, stage=stage)
+        raise
+
+
+def _guarded_call(agent: str, model: Optional[str], fn, *args):
+    """
+    Run fn in a scheduler slot for the agent's priority class, behind the
+    circuit breaker, and feed its outcome to the router.
+
+    Under a deadline (utils/deadline.py) the call waits for a slot only
+    until the deadline, and is dropped with DeadlineExceeded instead of
+    calling Gemini once its caller has stopped waiting.
+    """
+    _drop_expired(agent, "before_slot")
+    try:
+        with _slot(agent, remaining()):
+            _drop_expired(agent, "after_slot")
+            return _call_and_record(agent, model, fn, *args)
+    except SlotTimeout:
+        metrics.incr("llm_deadline_dropped_total", agent=agent, stage="waiting")
+        raise DeadlineExceeded(f"no LLM slot for {agent} before the deadline") from None
+
+
+def _call_and_record(agent: str, model: Optional[str], fn, *args):
+    start = time.perf_counter()
+    try:
+        result = breaker_for(model).call(fn, *args)
+    except CircuitOpenError:
+        # Rejected locally; Gemini was never called
+        raise
+    except Exception as e:
+        if model:
+            model_router.record(model, None, throttled=is_quota_error(e))
+        raise
+    latency = time.perf_counter() - start
+    if model:
+        model_router.record(model, latency)
+    if config.USAGE_TRACKING_ENABLED:
+        usage_tracker.record(agent, model, result, latency)
+    return result
+
+
+def invoke_llm(runnable, prompt, *, agent: str, model: Optional[str] = None):
+    """
+    Invoke a langchain model/chain for the given agent.
+
+    Raises CircuitOpenError without calling Gemini while the quota
+    circuit of `model` is open. When `model` is given, the call's latency (or quota
+    failure) is fed back to the router.
+    """
+    return _guarded_call(agent, model, runnable.invoke, prompt)
+
+
+def invoke_structured(runnable, prompt, *, agent: str, model: Optional[str] = None, retries: int = 0):
+    """
+    Invoke a runnable built with with_structured_output(..., include_raw=True).
+
+    Returns (parsed, output): parsed is the schema object, or None when every
+    attempt failed to parse; output is the last {"raw", "parsed",
+    "parsing_error"} dict. A parse failure is regenerated up to `retries`
+    more times. Calls and failures are counted per agent so the parse
+    failure rate shows up on /metrics.
+    """
+    output = {}
+    for attempt in range(1, retries + 2):
+        output = invoke_llm(runnable, prompt, agent=agent, model=model)
+        metrics.incr("structured_output_calls_total", agent=agent)
+        parsed = output.get("parsed")
+        if parsed is not None:
+            return parsed, output
+        metrics.incr("structured_output_parse_failures_total", agent=agent)
+        logger.warning(f"⚠️ Structured output from {agent} did not parse (attempt {attempt}): {output.get('parsing_error')}")
+    return None, output
+
+
+def raw_text(message) -> str:
+    """Text of a raw model message; for tool-call-only replies, the call arguments as JSON."""
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    text = str(content or "").strip()
+    if not text:
+        tool_calls = getattr(message, "tool_calls", None) or []
+        if tool_calls:
+            text = json.dumps(tool_calls[0].get("args", {}), ensure_ascii=False)
+    return text
+
+
+def stream_llm(runnable, prompt, *, agent: str, on_token: Callable[[str], None], model: Optional[str] = None):
+    """
+    Streaming variant of invoke_llm: calls on_token for every text chunk as it
+    arrives and returns the aggregated message (same shape as invoke's result).
+    """
+    def _stream():
+        message = None
+        for chunk in runnable.stream(prompt):
+            message = chunk if message is None else message + chunk
+            text = chunk.content if isinstance(chunk.content, str) else "".join(
+                part.get("text", "") for part in chunk.content if isinstance(part, dict)
+            )
+            if text:
+                on_token(text)
+        if message is None:
+            raise RuntimeError("LLM stream returned no content")
+        return message
+
+    return _guarded_call(agent, model, _stream)
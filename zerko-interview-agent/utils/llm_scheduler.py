@@ -0,0 +1,167 @@
+"""
+Priority scheduling of concurrent Gemini calls.
+
+Every LLM call takes a slot from this scheduler before it reaches Gemini
+(see utils/llm_gateway.py). Calls are grouped into classes by agent:
+
+  interactive (0)  live interview turns, question generation
+  feedback    (1)  post-interview feedback reports
+  background  (2)  resume analyses
+
+At most LLM_MAX_CONCURRENCY calls run at once per worker. The last
+LLM_RESERVED_INTERACTIVE slots are kept for interactive calls, so a burst
+of analyses can never occupy every slot. Waiters are served by priority, then
+FIFO. Waiting ages a call: every LLM_AGING_SECONDS it is treated as one class
+higher, and once it reaches interactive level it may use reserved slots too,
+so lower classes are delayed under load but never starved.
+
+Slots are blocking (threading) primitives: LLM calls run in worker threads.
+A waiter may give a timeout; it then leaves the queue with SlotTimeout
+instead of taking a slot after its caller stopped waiting.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import config
+from utils.metrics import metrics
+
+INTERACTIVE, FEEDBACK, BACKGROUND = "interactive", "feedback", "background"
+CLASS_PRIORITY = {INTERACTIVE: 0, FEEDBACK: 1, BACKGROUND: 2}
+AGENT_CLASS = {
+    "interview": INTERACTIVE,
+    "questions": INTERACTIVE,
+    "feedback": FEEDBACK,
+    "analysis": BACKGROUND,
+}
+
+
+class SlotTimeout(TimeoutError):
+    """No slot was granted within the waiter's timeout."""
+
+
+def class_for(agent: str) -> str:
+    return AGENT_CLASS.get(agent, BACKGROUND)
+
+
+class _Waiter:
+    __slots__ = ("cls", "priority", "seq", "since")
+
+    def __init__(self, cls: str, seq: int):
+        self.cls = cls
+        self.priority = CLASS_PRIORITY[cls]
+        self.seq = seq
+        self.since = time.monotonic()
+
+    def effective_priority(self, now: float) -> float:
+        aged = (now - self.since) / config.LLM_AGING_SECONDS if config.LLM_AGING_SECONDS > 0 else 0.0
+        return max(0.0, self.priority - aged)
+
+
+class PriorityScheduler:
+    def __init__(self, capacity: int, reserved: int):
+        self.capacity = max(1, capacity)
+        self.reserved = min(max(0, reserved), self.capacity - 1)
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._running: Dict[str, int] = {cls: 0 for cls in CLASS_PRIORITY}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    def _may_take_slot(self, waiter: _Waiter, now: float) -> bool:
+        free = self.capacity - self._in_use
+        if free <= 0:
+            return False
+        if free > self.reserved:
+            return True
+        # Only reserved slots left: interactive calls, or calls aged up to that level
+        return waiter.effective_priority(now) == 0.0
+
+    def _is_next(self, waiter: _Waiter, now: float) -> bool:
+        """True if no eligible waiter ranks ahead of this one."""
+        mine = (waiter.effective_priority(now), waiter.seq)
+        for other in self._waiters:
+            if other is waiter or not self._may_take_slot(other, now):
+                continue
+            if (other.effective_priority(now), other.seq) < mine:
+                return False
+        return True
+
+    def acquire(self, cls: str, timeout: Optional[float] = None) -> float:
+        """
+        Block until a slot is granted for this class; returns seconds waited.
+        Raises SlotTimeout if timeout seconds pass first.
+        """
+        with self._cond:
+            waiter = _Waiter(cls, next(self._seq))
+            give_up_at = None if timeout is None else waiter.since + timeout
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._may_take_slot(waiter, now) and self._is_next(waiter, now):
+                        break
+                    if give_up_at is not None and now >= give_up_at:
+                        metrics.incr("llm_slot_timeouts_total", cls=cls)
+                        # Whoever was behind this waiter may be next now
+                        self._cond.notify_all()
+                        raise SlotTimeout(f"no {cls} LLM slot within {timeout:.1f}s")
+                    # Wake up periodically too: aging can make a waiter eligible
+                    # without any slot being released
+                    wait = max(0.05, config.LLM_AGING_SECONDS / 4)
+                    if give_up_at is not None:
+                        wait = min(wait, max(0.0, give_up_at - now))
+                    self._cond.wait(timeout=wait)
+            finally:
+                self._waiters.remove(waiter)
+            self._in_use += 1
+            self._running[cls] += 1
+            waited = time.monotonic() - waiter.since
+            # Others may now be next in line (e.g. a second free slot)
+            self._cond.notify_all()
+
+        metrics.incr("llm_scheduled_total", cls=cls)
+        metrics.incr("llm_queue_wait_seconds_total", waited, cls=cls)
+        return waited
+
+    def release(self, cls: str) -> None:
+        with self._cond:
+            self._in_use -= 1
+            self._running[cls] -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, agent: str, timeout: Optional[float] = None):
+        cls = class_for(agent)
+        self.acquire(cls, timeout)
+        try:
+            yield
+        finally:
+            self.release(cls)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._cond:
+            waiting = {cls: 0 for cls in CLASS_PRIORITY}
+            oldest = {cls: 0.0 for cls in CLASS_PRIORITY}
+            for waiter in self._waiters:
+                waiting[waiter.cls] += 1
+                oldest[waiter.cls] = max(oldest[waiter.cls], round(now - waiter.since, 3))
+            running = dict(self._running)
+        classes = {}
+        for cls in CLASS_PRIORITY:
+            scheduled = metrics.get("llm_scheduled_total", cls=cls)
+            total_wait = metrics.get("llm_queue_wait_seconds_total", cls=cls)
+            classes[cls] = {
+                "running": running[cls],
+                "waiting": waiting[cls],
+                "oldest_wait_seconds": oldest[cls],
+                "avg_wait_seconds": round(total_wait / scheduled, 4) if scheduled else 0.0,
+            }
+        return {"capacity": self.capacity, "reserved_interactive": self.reserved, "classes": classes}
+
+
+llm_scheduler = PriorityScheduler(config.LLM_MAX_CONCURRENCY, config.LLM_RESERVED_INTERACTIVE)
+metrics.register_gauge("llm_scheduler", llm_scheduler.snapshot)
@@ -0,0 +1,181 @@
+"""
+Per-endpoint concurrency limits with early 503s.
+
+The sync endpoints run on AnyIO's threadpool; when Gemini slows down the pool
+fills up and further requests queue invisibly until the Next.js routes time
+out. This ASGI middleware makes the queue explicit. Each limited endpoint
+admits SHED_LIMITS[name] requests at once and queues a bounded number more.
+A request is rejected immediately with 503 and a Retry-After header when:
+  - the queue already holds SHED_MAX_QUEUE requests, or
+  - the estimated wait (queue length x recent latency / limit) is over
+    SHED_MAX_WAIT_SECONDS,
+and after queueing for SHED_MAX_WAIT_SECONDS without being admitted.
+
+Health checks, metrics, SSE streams and WebSockets are never limited. Paths
+are matched exactly ({param} matches one path segment), so a stream endpoint
+under a limited path, like /api/generate/questions/stream, does not hold one
+of its slots for the whole stream.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+import config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (name, method, route path); the name selects the limit in config.SHED_LIMITS
+LIMITED_ENDPOINTS: List[Tuple[str, str, str]] = [
+    ("interview", "POST", "/api/interview/next"),
+    ("questions", "POST", "/api/generate/questions"),
+    ("parse", "POST", "/api/parse"),
+    ("feedback", "POST", "/api/feedback/{interview_id}"),
+]
+
+
+def _path_matches(route: str, path: str) -> bool:
+    """Exact match, segment by segment; a {param} segment matches any one non-empty segment."""
+    route_parts = route.strip("/").split("/")
+    path_parts = path.strip("/").split("/")
+    if len(route_parts) != len(path_parts):
+        return False
+    return all(
+        (r.startswith("{") and r.endswith("}") and p) or r == p
+        for r, p in zip(route_parts, path_parts)
+    )
+
+
+class Overloaded(Exception):
+    def __init__(self, endpoint: str, retry_after: int, reason: str):
+        super().__init__(f"{endpoint} overloaded ({reason})")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class EndpointLimiter:
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self._latency: Optional[float] = None  # EWMA of admitted request durations
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _per_request(self) -> float:
+        return self._latency if self._latency is not None else config.SHED_DEFAULT_LATENCY
+
+    def estimated_wait(self) -> float:
+        """Seconds a request arriving now would wait for a slot."""
+        if self.in_flight < self.limit:
+            return 0.0
+        return (self.waiting + 1) * self._per_request() / self.limit
+
+    def _retry_after(self, wait: float) -> int:
+        return int(min(config.SHED_MAX_RETRY_AFTER, max(1, math.ceil(wait))))
+
+    async def acquire(self) -> None:
+        # Decided without awaiting, so a burst arriving together is counted correctly
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        wait = self.estimated_wait()
+        if self.waiting >= config.SHED_MAX_QUEUE:
+            raise Overloaded(self.name, self._retry_after(wait), "queue_full")
+        if wait > config.SHED_MAX_WAIT_SECONDS:
+            raise Overloaded(self.name, self._retry_after(wait), "wait_too_long")
+
+        granted = asyncio.get_running_loop().create_future()
+        self._waiters.append(granted)
+        try:
+            await asyncio.wait_for(granted, config.SHED_MAX_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            raise Overloaded(self.name, self._retry_after(self.estimated_wait()), "queue_timeout") from None
+        except asyncio.CancelledError:
+            # Client went away after being handed a slot: pass it on
+            if granted.done() and not granted.cancelled():
+                self._hand_over()
+            raise
+        finally:
+            if granted in self._waiters:
+                self._waiters.remove(granted)
+
+    def _hand_over(self) -> None:
+        """Give the caller's slot to the next waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def release(self, duration: float) -> None:
+        alpha = 0.2
+        self._latency = duration if self._latency is None else (1 - alpha) * self._latency + alpha * duration
+        self._hand_over()
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "avg_latency_seconds": round(self._latency, 3) if self._latency is not None else None,
+            "estimated_wait_seconds": round(self.estimated_wait(), 3),
+        }
+
+
+class LoadSheddingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.limiters: Dict[str, EndpointLimiter] = {
+            name: EndpointLimiter(name, config.SHED_LIMITS[name])
+            for name, _, _ in LIMITED_ENDPOINTS
+            if config.SHED_LIMITS.get(name)
+        }
+        metrics.register_gauge("load_shedding", self.snapshot)
+
+    def _limiter_for(self, method: str, path: str) -> Optional[EndpointLimiter]:
+        for name, endpoint_method, route in LIMITED_ENDPOINTS:
+            if method == endpoint_method and _path_matches(route, path):
+                return self.limiters.get(name)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.SHED_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        limiter = self._limiter_for(scope["method"], scope["path"])
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            metrics.incr("shed_requests_total", endpoint=e.endpoint, reason=e.reason)
+            logger.warning(f"🚦 Shedding {scope['path']}: {e.reason}, retry after {e.retry_after}s")
+            response = JSONResponse(
+                {"detail": "Server is busy. Please retry shortly.", "retry_after": e.retry_after},
+                status_code=503,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - start)
+
+    def snapshot(self) -> dict:
+        return {name: limiter.snapshot() for name, limiter in self.limiters.items()}
@@ -0,0 +1,155 @@
+"""
+Event-loop stall detection.
+
+Anything synchronous that runs on the event loop (a PDF parse, a blocking
+LLM call, a big json.dumps) freezes every WebSocket, SSE stream and async
+endpoint of the worker at once. The watchdog makes those stalls visible:
+
+  - a task on the loop sleeps LOOP_WATCHDOG_INTERVAL and measures how late it
+    wakes up (the loop lag), kept as gauges and a lag counter;
+  - a daemon thread checks that the task keeps waking up. When it has not for
+    LOOP_STALL_THRESHOLD past its due time, the loop is stuck right now, so the
+    thread captures the loop thread's stack (sys._current_frames) and the
+    asyncio task that was running, logs them once per stall and counts it.
+
+The stall is reported while it is happening, so the stack shows the blocking
+code rather than whatever runs after it. Overhead is one timer wake-up per
+interval on the loop and one in the thread. State is per worker process.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Optional
+
+import config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+STACK_LIMIT = 30  # innermost frames kept per stall
+
+
+class LoopWatchdog:
+    def __init__(self, interval: float, threshold: float, history: int):
+        self.interval = interval
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._due = 0.0             # monotonic time the probe should wake up next
+        self._reported_due = None   # _due of the stall already reported
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._stalls: Deque[dict] = deque(maxlen=history)
+
+    # ---- loop side ----
+
+    async def _probe(self) -> None:
+        while True:
+            self._due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - self._due)
+            with self._lock:
+                self._last_lag = lag
+                self._max_lag = max(self._max_lag, lag)
+                reported = self._reported_due == self._due
+            metrics.incr("event_loop_lag_seconds_total", lag)
+            if lag >= self.threshold:
+                metrics.incr("event_loop_slow_ticks_total")
+                if reported:
+                    logger.warning(f"🐢 Event loop stall ended after {lag:.2f}s")
+
+    def start(self) -> None:
+        """Start probing the running loop; call from inside it (lifespan)."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._due = time.monotonic() + self.interval
+        self._stop.clear()
+        self._task = asyncio.create_task(self._probe(), name="loop-watchdog")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    # ---- watchdog thread ----
+
+    def _watch(self) -> None:
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(poll):
+            due = self._due
+            overdue = time.monotonic() - due
+            if overdue < self.threshold or self._reported_due == due:
+                continue
+            self._reported_due = due
+            self._report(overdue)
+
+    def _running_task(self) -> Optional[str]:
+        # Read from another thread without locking: good enough for a diagnostic
+        try:
+            task = asyncio.current_task(self._loop)
+        except Exception:
+            return None
+        if task is None:
+            return None
+        coro = task.get_coro()
+        return f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+
+    def _report(self, overdue: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=STACK_LIMIT) if frame is not None else []
+        stall = {
+            "at": time.time(),
+            "blocked_for": round(overdue, 3),
+            "task": self._running_task(),
+            "stack": [line.rstrip() for line in stack],
+        }
+        with self._lock:
+            self._stalls.append(stall)
+        metrics.incr("event_loop_stalls_total")
+        logger.warning(
+            f"🧊 Event loop blocked for {overdue:.2f}s+ (task: {stall['task']}); "
+            f"loop thread stack:\n{''.join(stack)}"
+        )
+
+    # ---- reporting ----
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._task is not None,
+                "last_lag_ms": round(self._last_lag * 1000, 1),
+                "max_lag_ms": round(self._max_lag * 1000, 1),
+                "stalls": metrics.get("event_loop_stalls_total"),
+            }
+
+    def recent_stalls(self) -> list:
+        with self._lock:
+            return list(self._stalls)
+
+
+loop_watchdog = LoopWatchdog(
+    config.LOOP_WATCHDOG_INTERVAL,
+    config.LOOP_STALL_THRESHOLD,
+    config.LOOP_STALL_HISTORY,
+)
+metrics.register_gauge("event_loop", loop_watchdog.snapshot)
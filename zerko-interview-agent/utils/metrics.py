@@ -0,0 +1,51 @@
+"""
+Minimal in-process metrics registry.
+
+Counters are incremented from request threads and background tasks alike;
+gauges are callables evaluated when a snapshot is taken. Exposed as JSON by
+GET /metrics. Values are per worker process.
+"""
+import threading
+from typing import Callable, Dict
+
+
+def _key(name: str, labels: Dict[str, str]) -> str:
+    if not labels:
+        return name
+    label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{label_str}}}"
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, Callable[[], object]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def get(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def register_gauge(self, name: str, fn: Callable[[], object]) -> None:
+        with self._lock:
+            self._gauges[name] = fn
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        gauge_values = {}
+        for name, fn in gauges.items():
+            try:
+                gauge_values[name] = fn()
+            except Exception as e:
+                gauge_values[name] = f"error: {e}"
+        return {"counters": counters, "gauges": gauge_values}
+
+
+metrics = Metrics()
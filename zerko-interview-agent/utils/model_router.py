@@ -0,0 +1,163 @@
+"""
+Latency- and load-aware model routing.
+
+Each agent has a primary model (GEMINI_MODEL / FEEDBACK_MODEL) and a lighter
+fallback (GEMINI_LIGHT_MODEL). For every call the router picks one based on:
+  - agent type (each agent has its own latency SLO),
+  - prompt size (latency-critical agents send very large prompts to the light model),
+  - observed latency percentiles of the primary over a sliding window,
+  - remaining quota (requests in the last minute vs GEMINI_RPM_LIMIT, and recent 429s).
+
+Observations are recorded by the LLM gateway after each call. State is per
+worker process.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict, Optional
+
+import config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio for English prompts; good enough for routing
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class RouteDecision:
+    agent: str
+    model: str
+    reason: str
+    prompt_tokens_est: int
+    remaining_quota: Optional[int] = None
+
+    def as_meta(self) -> dict:
+        return asdict(self)
+
+
+class ModelStats:
+    """Sliding-window latency samples and request timestamps for one model."""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.requests: Deque[float] = deque()
+        self.last_throttled_at: Optional[float] = None
+
+    def is_throttled(self, now: float) -> bool:
+        return (
+            self.last_throttled_at is not None
+            and now - self.last_throttled_at < config.ROUTER_THROTTLE_COOLDOWN
+        )
+
+    def percentile(self, pct: float) -> Optional[float]:
+        samples = sorted(self.latencies)
+        if len(samples) < config.ROUTER_MIN_SAMPLES:
+            return None
+        idx = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[idx]
+
+    def requests_last_minute(self, now: float) -> int:
+        while self.requests and now - self.requests[0] > 60:
+            self.requests.popleft()
+        return len(self.requests)
+
+
+class ModelRouter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ModelStats] = {}
+
+    def _get(self, model: str) -> ModelStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats(config.ROUTER_LATENCY_WINDOW)
+        return stats
+
+    @staticmethod
+    def primary_model(agent: str) -> str:
+        if agent == "feedback":
+            return os.getenv("FEEDBACK_MODEL", "gemini-3-pro")
+        return os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+    @staticmethod
+    def light_model() -> str:
+        return os.getenv("GEMINI_LIGHT_MODEL", "gemini-2.0-flash-lite")
+
+    def route(self, agent: str, prompt_chars: int = 0, primary: Optional[str] = None) -> RouteDecision:
+        primary = primary or self.primary_model(agent)
+        light = self.light_model()
+        tokens = prompt_chars // CHARS_PER_TOKEN
+        decision = RouteDecision(agent=agent, model=primary, reason="primary", prompt_tokens_est=tokens)
+
+        if not config.ROUTER_ENABLED or light == primary:
+            return decision
+
+        now = time.monotonic()
+        slo = config.ROUTER_LATENCY_SLO.get(agent)
+        with self._lock:
+            stats = self._get(primary)
+            throttled = stats.is_throttled(now)
+            p90 = stats.percentile(90)
+            used = stats.requests_last_minute(now)
+        if config.GEMINI_RPM_LIMIT > 0:
+            decision.remaining_quota = max(0, config.GEMINI_RPM_LIMIT - used)
+
+        if throttled:
+            decision.model, decision.reason = light, "primary_throttled"
+        elif decision.remaining_quota is not None and decision.remaining_quota <= config.GEMINI_RPM_LIMIT * config.ROUTER_QUOTA_RESERVE:
+            decision.model, decision.reason = light, "quota_low"
+        elif slo is not None and p90 is not None and p90 > slo:
+            # Still send a small share of calls to the primary, otherwise its
+            # latency window never refreshes and we would never switch back.
+            if random.random() < config.ROUTER_PROBE_FRACTION:
+                decision.reason = "latency_probe"
+            else:
+                decision.model, decision.reason = light, f"primary_p90_{p90:.1f}s_over_slo"
+        elif agent in config.ROUTER_LATENCY_CRITICAL_AGENTS and tokens > config.ROUTER_LARGE_PROMPT_TOKENS:
+            decision.model, decision.reason = light, "large_prompt"
+
+        metrics.incr("router_decisions_total", agent=agent, model=decision.model)
+        if decision.model != primary:
+            logger.info("🔀 Routing %s call to %s (%s)", agent, decision.model, decision.reason)
+        return decision
+
+    def latency_percentile(self, model: str, pct: float) -> Optional[float]:
+        """Observed latency percentile for a model, or None until enough samples exist."""
+        with self._lock:
+            return self._get(model).percentile(pct)
+
+    def record(self, model: str, latency: Optional[float], throttled: bool = False) -> None:
+        """Feed back the outcome of a call (latency is None when the call failed)."""
+        with self._lock:
+            stats = self._get(model)
+            stats.requests.append(time.monotonic())
+            if latency is not None:
+                stats.latencies.append(latency)
+            if throttled:
+                stats.last_throttled_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            models = list(self._stats.items())
+            return {
+                model: {
+                    "p50": stats.percentile(50),
+                    "p90": stats.percentile(90),
+                    "p99": stats.percentile(99),
+                    "samples": len(stats.latencies),
+                    "requests_last_minute": stats.requests_last_minute(now),
+                    "throttled": stats.is_throttled(now),
+                }
+                for model, stats in models
+            }
+
+
+model_router = ModelRouter()
+metrics.register_gauge("model_router", model_router.snapshot)
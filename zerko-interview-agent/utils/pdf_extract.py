@@ -0,0 +1,164 @@
+"""
+PDF text extraction on a bounded process pool.
+
+PyMuPDF extraction is pure CPU and holds the GIL, so running it in the
+request thread (or worse, on the event loop) stalls interview traffic while
+a 30-page portfolio is parsed. Extraction runs in worker processes instead:
+
+  - documents up to PDF_PAGES_PER_CHUNK pages are one job,
+  - larger documents are split into page ranges extracted in parallel and
+    reassembled in page order,
+  - every job has a deadline (PDF_EXTRACT_TIMEOUT seconds).
+
+The first chunk's job also reports the page count, so with a pool PyMuPDF
+never runs in the calling process (PDF_EXTRACT_WORKERS=0 extracts inline).
+
+The pool uses the "spawn" start method so workers never inherit the
+parent's event loop, threads, Prisma engine or open sockets. Workers are
+started on first use. Each uvicorn worker process owns its own pool.
+
+A chunk that is already running cannot be interrupted; on timeout the
+pending chunks are cancelled and the result of the running ones discarded.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import List, Optional, Tuple
+
+import config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PdfExtractionTimeout(TimeoutError):
+    """Raised when a PDF is not extracted within PDF_EXTRACT_TIMEOUT."""
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if config.PDF_EXTRACT_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=config.PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"🧩 PDF extraction pool started ({config.PDF_EXTRACT_WORKERS} workers)")
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the worker processes; called on application shutdown."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---- Worker side (must stay top-level so it can be pickled) ----
+
+def _extract_pages(content: bytes, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) of the PDF, one string per page."""
+    import pymupdf
+
+    with pymupdf.open(stream=content, filetype="pdf") as doc:
+        return [doc[i].get_text() for i in range(start, min(stop, doc.page_count))]
+
+
+def _extract_head(content: bytes, stop: Optional[int]) -> Tuple[int, List[str]]:
+    """Page count of the PDF and the text of its pages [0, stop) (all pages when stop is None)."""
+    import pymupdf
+
+    with pymupdf.open(stream=content, filetype="pdf") as doc:
+        end = doc.page_count if stop is None else min(stop, doc.page_count)
+        return doc.page_count, [doc[i].get_text() for i in range(end)]
+
+
+# ---- Caller side ----
+
+def _page_ranges(pages: int) -> List[Tuple[int, int]]:
+    size = max(1, config.PDF_PAGES_PER_CHUNK)
+    return [(start, min(start + size, pages)) for start in range(0, pages, size)]
+
+
+def _collect(chunks: List[List[str]], pages: int, started: float) -> List[str]:
+    texts = [text for chunk in chunks for text in chunk]
+    if not texts:
+        raise RuntimeError("No pages found in resume PDF.")
+    metrics.incr("pdf_extractions_total")
+    metrics.incr("pdf_pages_total", pages)
+    metrics.incr("pdf_extract_seconds_total", time.monotonic() - started)
+    return texts
+
+
+def _timed_out(timeout: float, pages: Optional[int]) -> PdfExtractionTimeout:
+    metrics.incr("pdf_extract_timeouts_total")
+    size = f"{pages} pages" if pages is not None else "page count unknown"
+    return PdfExtractionTimeout(f"PDF extraction exceeded {timeout:.0f}s ({size})")
+
+
+def extract_pdf_pages(content: bytes, timeout: Optional[float] = None) -> List[str]:
+    """
+    Extract text from PDF bytes, one string per page in page order.
+    Blocking; call from a worker thread (the sync endpoints already are).
+    """
+    timeout = config.PDF_EXTRACT_TIMEOUT if timeout is None else timeout
+    started = time.monotonic()
+    pool = _get_pool()
+    if pool is None:
+        pages, texts = _extract_head(content, None)
+        return _collect([texts], pages, started)
+
+    # The first chunk's job also counts the pages, so PyMuPDF never runs in this process
+    head = pool.submit(_extract_head, content, max(1, config.PDF_PAGES_PER_CHUNK))
+    if not wait([head], timeout=timeout).done:
+        head.cancel()
+        raise _timed_out(timeout, None)
+    pages, first = head.result()
+
+    futures = [pool.submit(_extract_pages, content, a, b) for a, b in _page_ranges(pages)[1:]]
+    done, not_done = wait(futures, timeout=max(0.0, started + timeout - time.monotonic()))
+    if not_done:
+        for future in not_done:
+            future.cancel()
+        raise _timed_out(timeout, pages)
+    return _collect([first] + [f.result() for f in futures], pages, started)
+
+
+async def aextract_pdf_pages(content: bytes, timeout: Optional[float] = None) -> List[str]:
+    """extract_pdf_pages() for coroutines: nothing runs on the event loop thread."""
+    timeout = config.PDF_EXTRACT_TIMEOUT if timeout is None else timeout
+    started = time.monotonic()
+    pool = _get_pool()
+    if pool is None:
+        return await asyncio.to_thread(extract_pdf_pages, content, timeout)
+
+    loop = asyncio.get_running_loop()
+    pages: Optional[int] = None
+
+    async def extract() -> List[List[str]]:
+        nonlocal pages
+        pages, first = await loop.run_in_executor(
+            pool, _extract_head, content, max(1, config.PDF_PAGES_PER_CHUNK)
+        )
+        rest = await asyncio.gather(*[
+            loop.run_in_executor(pool, _extract_pages, content, a, b)
+            for a, b in _page_ranges(pages)[1:]
+        ])
+        return [first, *rest]
+
+    try:
+        chunks = await asyncio.wait_for(extract(), timeout)
+    except asyncio.TimeoutError:
+        raise _timed_out(timeout, pages) from None
+    return _collect(chunks, pages, started)
@@ -0,0 +1,205 @@
+"""
+On-demand cProfile capture for individual requests.
+
+Profiling is off unless PROFILING_TOKEN is set. A request is then profiled when:
+  - it carries the header X-Profile-Token: <PROFILING_TOKEN>, or
+  - it is picked by the sample rate set for its target through
+    POST /admin/profiling (in memory, per worker, 0 after a restart).
+
+Targets: "interview" (/api/interview/next), "feedback" (/api/feedback/{id}),
+"parse" (/api/parse) and "analysis" (the background resume analysis).
+
+profile_request() decides at the edge and marks the context; profiled() runs
+cProfile around the work in the thread that does it. Sync endpoints are
+profiled in their threadpool thread; feedback and analysis wrap the part that
+runs in asyncio.to_thread (contextvars follow it there, and into background
+tasks spawned inside the block). cProfile only sees the calling thread, so
+the analysis profile covers the AI analysis step, not the PDF extraction
+that runs in the process pool.
+
+Each capture is written to PROFILE_DIR as <id>.prof (pstats format, open with
+snakeviz or `python -m pstats`) and <id>.json (metadata and the top
+PROFILE_TOP_N functions by cumulative time). The directory is shared by all
+workers; only the newest PROFILE_MAX_ARTIFACTS captures are kept.
+"""
+import contextlib
+import contextvars
+import cProfile
+import datetime
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional
+
+import config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-Profile-Token"
+TARGETS = ("interview", "feedback", "parse", "analysis")
+_PROFILE_ID = re.compile(r"^[0-9]{8}-[0-9]{12}-[a-z]+-[0-9a-f]{8}$")
+
+
+@dataclass(frozen=True)
+class ProfileRequest:
+    target: str
+    reason: str   # "header" or "sampled"
+    label: str = ""
+
+
+_requested: contextvars.ContextVar[Optional[ProfileRequest]] = contextvars.ContextVar("profile_request", default=None)
+_active = threading.local()
+_sample_rates: Dict[str, float] = {target: 0.0 for target in TARGETS}
+
+
+def enabled() -> bool:
+    return bool(config.PROFILING_TOKEN)
+
+
+def token_valid(token: Optional[str]) -> bool:
+    return enabled() and bool(token) and hmac.compare_digest(token.encode(), config.PROFILING_TOKEN.encode())
+
+
+def sample_rates() -> Dict[str, float]:
+    return dict(_sample_rates)
+
+
+def set_sample_rate(rate: float, targets: Optional[List[str]] = None) -> Dict[str, float]:
+    """Profile this fraction (0..1) of requests for the given targets (default: all)."""
+    rate = min(1.0, max(0.0, rate))
+    for target in targets or TARGETS:
+        if target not in _sample_rates:
+            raise ValueError(f"Unknown profiling target {target!r}; expected one of {', '.join(TARGETS)}")
+        _sample_rates[target] = rate
+    logger.info(f"🔬 Profiling sample rates: {_sample_rates}")
+    return sample_rates()
+
+
+def _decide(target: str, headers: Mapping[str, str]) -> Optional[str]:
+    if not enabled():
+        return None
+    if token_valid(headers.get(HEADER)):
+        return "header"
+    rate = _sample_rates.get(target, 0.0)
+    if rate > 0 and random.random() < rate:
+        return "sampled"
+    return None
+
+
+@contextlib.contextmanager
+def profile_request(target: str, headers: Mapping[str, str], label: str = ""):
+    """Mark work done inside this block (and tasks/threads it starts) for profiling, if selected."""
+    reason = _decide(target, headers)
+    token = _requested.set(ProfileRequest(target, reason, label) if reason else None)
+    try:
+        yield reason
+    finally:
+        _requested.reset(token)
+
+
+@contextlib.contextmanager
+def profiled():
+    """Run cProfile around this block when the current context asks for it."""
+    request = _requested.get()
+    if request is None or getattr(_active, "on", False):
+        yield
+        return
+    profiler = cProfile.Profile()
+    _active.on = True
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _active.on = False
+        try:
+            _save(profiler, request, time.perf_counter() - started)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save {request.target} profile: {e}")
+
+
+def call(fn: Callable, *args, **kwargs):
+    """fn(*args, **kwargs) inside profiled(); for asyncio.to_thread."""
+    with profiled():
+        return fn(*args, **kwargs)
+
+
+# ---- artifacts ----
+
+def _hotspots(profiler: cProfile.Profile, limit: int) -> List[dict]:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})" if line else name,
+            "ncalls": ncalls,
+            "tottime": round(tottime, 4),
+            "cumtime": round(cumtime, 4),
+        })
+    rows.sort(key=lambda row: row["cumtime"], reverse=True)
+    return rows[:limit]
+
+
+def _save(profiler: cProfile.Profile, request: ProfileRequest, wall: float) -> dict:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    profile_id = f"{now:%Y%m%d-%H%M%S%f}-{request.target}-{uuid.uuid4().hex[:8]}"
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(config.PROFILE_DIR, f"{profile_id}.prof"))
+    summary = {
+        "id": profile_id,
+        "target": request.target,
+        "reason": request.reason,
+        "label": request.label,
+        "created_at": now.isoformat(),
+        "pid": os.getpid(),
+        "wall_seconds": round(wall, 3),
+        "hotspots": _hotspots(profiler, config.PROFILE_TOP_N),
+    }
+    with open(os.path.join(config.PROFILE_DIR, f"{profile_id}.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    _prune()
+    metrics.incr("profiles_captured_total", target=request.target)
+    logger.info(f"🔬 Saved {request.target} profile {profile_id} ({wall:.2f}s, {request.reason})")
+    return summary
+
+
+def _prune() -> None:
+    ids = list_ids()
+    for profile_id in ids[config.PROFILE_MAX_ARTIFACTS:]:
+        for ext in (".prof", ".json"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(config.PROFILE_DIR, profile_id + ext))
+
+
+def list_ids() -> List[str]:
+    """Stored profile ids, newest first."""
+    if not os.path.isdir(config.PROFILE_DIR):
+        return []
+    ids = [name[:-5] for name in os.listdir(config.PROFILE_DIR) if name.endswith(".json")]
+    return sorted((i for i in ids if _PROFILE_ID.match(i)), reverse=True)
+
+
+def artifact_path(profile_id: str, ext: str) -> Optional[str]:
+    """Path of a stored artifact, or None for unknown (or malformed) ids."""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(config.PROFILE_DIR, profile_id + ext)
+    return path if os.path.isfile(path) else None
+
+
+def load_summary(profile_id: str) -> Optional[dict]:
+    path = artifact_path(profile_id, ".json")
+    if path is None:
+        return None
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,125 @@
+"""
+In-process pub/sub used to push analysis and feedback progress to SSE clients.
+
+A subscriber is just a small bounded asyncio.Queue bound to its event loop,
+so thousands of idle subscribers cost a few hundred bytes each and no
+polling. publish() is safe to call from the event loop or from worker
+threads. The last event per topic is remembered for PUBSUB_LAST_EVENT_TTL
+seconds so a client that subscribes shortly after a job finished still gets
+the final state. Events should stay small (stage and status, not results):
+clients fetch the result itself over HTTP.
+
+Topics are per worker process; with several uvicorn workers a client only
+sees events for work running in the worker it is connected to.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+import config
+from utils.metrics import metrics
+
+
+def analysis_topic(resume_id: str) -> str:
+    return f"analysis:{resume_id}"
+
+
+def interview_topic(interview_id: str) -> str:
+    return f"interview:{interview_id}"
+
+
+class Subscription:
+    __slots__ = ("topic", "queue", "loop")
+
+    def __init__(self, topic: str, maxsize: int):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = asyncio.get_running_loop()
+
+    def push(self, event: dict) -> None:
+        # Runs on the subscriber's loop. A slow client loses its oldest events
+        # rather than growing memory; the latest state is what matters.
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            metrics.incr("pubsub_dropped_events_total")
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Next event, or None if nothing arrived within timeout (heartbeat time)."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class PubSub:
+    def __init__(self, queue_size: int = 16, last_event_ttl: float = 600.0):
+        self._lock = threading.Lock()
+        self._topics: Dict[str, Set[Subscription]] = {}
+        # topic -> (monotonic publish time, event), oldest first
+        self._last: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._queue_size = queue_size
+        self._last_event_ttl = last_event_ttl
+        metrics.register_gauge("pubsub_subscribers", self.subscriber_count)
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Create a subscription; must be called from the event loop."""
+        sub = Subscription(topic, self._queue_size)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(sub)
+            self._expire(time.monotonic())
+            last = self._last.get(topic)
+        if last is not None:
+            sub.push(last[1])
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._topics.get(sub.topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._topics[sub.topic]
+
+    def publish(self, topic: str, event: dict) -> int:
+        """Fan an event out to every subscriber of topic. Returns subscriber count."""
+        with self._lock:
+            now = time.monotonic()
+            self._last[topic] = (now, event)
+            self._last.move_to_end(topic)
+            self._expire(now)
+            subs = list(self._topics.get(topic, ()))
+
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for sub in subs:
+            if sub.loop is current_loop:
+                sub.push(event)
+            else:
+                try:
+                    sub.loop.call_soon_threadsafe(sub.push, event)
+                except RuntimeError:
+                    # Subscriber's loop already closed (worker shutting down)
+                    self.unsubscribe(sub)
+        metrics.incr("pubsub_published_total")
+        return len(subs)
+
+    def _expire(self, now: float) -> None:
+        # Caller holds the lock. Entries are in publish order, so expired ones are at the front.
+        cutoff = now - self._last_event_ttl
+        while self._last and next(iter(self._last.values()))[0] < cutoff:
+            self._last.popitem(last=False)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._topics.values())
+
+
+pubsub = PubSub(last_event_ttl=config.PUBSUB_LAST_EVENT_TTL)
@@ -0,0 +1,76 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+The frontend double-fires parse and question-generation calls (fetch retries,
+React strict mode, double clicks). Concurrent calls with the same key share
+one computation: the first caller (the leader) runs it, the others wait and
+receive the same result or exception. Nothing is cached once the leader
+finishes; this only deduplicates work that overlaps in time.
+
+Used by the sync endpoints running in the threadpool. Background analyses
+are deduplicated per resumeId by utils/analysis_jobs.py instead.
+"""
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from utils.metrics import metrics
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Hash inputs into a flight key. Runs of whitespace are collapsed; case is
+    kept, since it can change the answer (a job description, "Go" vs "go").
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        text = " ".join(str(part).split()) if part is not None else ""
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        metrics.register_gauge(f"singleflight_{name}_in_flight", lambda: len(self._calls))
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """Run fn once per concurrent key. Returns (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            metrics.incr("singleflight_coalesced_total", group=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        metrics.incr("singleflight_leader_total", group=self.name)
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
@@ -0,0 +1,215 @@
+"""
+Normalization of extracted resume text before it reaches any prompt.
+
+Raw PDF text carries a lot that costs tokens and carries no meaning: headers
+and footers repeated on every page, page numbers, words hyphenated across
+lines, sentences wrapped mid-line, runs of spaces and blank lines, and
+unreadable glyphs ((cid:NN) references, private-use and control characters).
+normalize_pages() removes them once per parse; the question, interview,
+feedback and analysis agents all receive the normalized text.
+
+The ATS formatting checks (utils/check.py) judge the document's layout, so
+they must keep running on the raw text, not on this output.
+
+Page furniture is detected per page: a short line found within the first or
+last FURNITURE_EDGE_LINES lines of at least half the pages (digits ignored,
+so "Page 2 of 3" matches "Page 3 of 3") is kept once and dropped from every
+other page edge. Bare page numbers are dropped from all page edges.
+
+Lines are only rejoined when the next line clearly continues the previous
+one: it starts in lowercase and is not a bullet, email address or URL, and
+the previous line does not end a sentence or heading and is not a short
+heading ("Skills", "Jane Doe"). Headings, contact lines and lowercase list
+items stay on their own lines. A word broken at a hyphen ("ser-" / "vice")
+is joined without it, but a compound that wraps at its hyphen ("long-" /
+"term", "full-" / "stack") keeps it: those are keywords the ATS analysis
+matches on. Compounds are recognized by a known first or second part.
+"""
+import math
+import re
+from dataclasses import asdict, dataclass
+from typing import List, Tuple
+
+from utils.check import _BULLETS, _GARBAGE
+from utils.metrics import metrics
+
+FURNITURE_EDGE_LINES = 3     # lines at the top and bottom of each page checked for furniture
+FURNITURE_MIN_PAGE_SHARE = 0.5
+FURNITURE_MAX_CHARS = 80
+CHARS_PER_TOKEN = 4          # rough estimate used for the savings report
+HEADING_MAX_WORDS = 4        # a line this short with no lowercase word is a heading, not wrapped text
+
+_CID = re.compile(r"\(cid:\d+\)")
+_INVISIBLE = re.compile(r"[\u00ad\u200b-\u200d\u2060\ufeff]")  # soft hyphen, zero-width characters
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")  # incl. no-break and typographic spaces
+_DIGITS = re.compile(r"\d+")
+# "3", "- 3 -", "Page 3", "3 of 5", "3/5"; never 4 digits, which would catch a year
+_PAGE_NUMBER = re.compile(r"^(?:page\s*)?[-–]?\s*\d{1,3}\s*[-–]?(?:\s*(?:of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_LIGATURES = str.maketrans({"\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl"})
+_LINK = re.compile(r"^(?:\S+@\S+\.\w+|(?:https?://|www\.)\S+|[\w-]+(?:\.[\w-]+)+/\S*)", re.IGNORECASE)
+_ENDS_BLOCK = (".", "!", "?", ":", ";", "|")
+_WORD_START = re.compile(r"[a-z]+")
+# Parts of hyphenated compounds common in resumes and job descriptions
+_COMPOUND_HEADS = frozenset((
+    "back", "client", "cloud", "co", "cost", "cross", "customer", "data", "e", "end", "event", "fast",
+    "front", "full", "hands", "high", "in", "large", "long", "low", "machine", "mid", "mission", "multi",
+    "non", "object", "on", "open", "part", "peer", "real", "results", "self", "server", "short", "small",
+    "state", "team", "test", "third", "top", "user", "well", "world",
+))
+_COMPOUND_TAILS = frozenset((
+    "aware", "based", "centric", "commerce", "critical", "driven", "end", "facing", "focused", "free",
+    "friendly", "functional", "level", "native", "on", "oriented", "ready", "related", "scale", "side",
+    "source", "specific", "stack", "term", "time", "up", "wide",
+))
+
+
+@dataclass
+class NormalizationReport:
+    pages: int = 0
+    chars_before: int = 0
+    chars_after: int = 0
+    furniture_lines: int = 0
+    garbage_chars: int = 0
+    hyphen_joins: int = 0
+    line_joins: int = 0
+
+    @property
+    def chars_saved(self) -> int:
+        return self.chars_before - self.chars_after
+
+    @property
+    def tokens_before(self) -> int:
+        return math.ceil(self.chars_before / CHARS_PER_TOKEN)
+
+    @property
+    def tokens_after(self) -> int:
+        return math.ceil(self.chars_after / CHARS_PER_TOKEN)
+
+    def as_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "chars_saved": self.chars_saved,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": self.tokens_before - self.tokens_after,
+        }
+
+
+def _clean_line(line: str, report: NormalizationReport) -> str:
+    line, cids = _CID.subn("", line)
+    line, garbage = _GARBAGE.subn("", line)
+    report.garbage_chars += cids + garbage
+    line = _INVISIBLE.sub("", line.translate(_LIGATURES))
+    return _SPACES.sub(" ", line).strip()
+
+
+def _edge_indexes(lines: List[str]) -> List[int]:
+    """Indexes of the first and last FURNITURE_EDGE_LINES non-empty lines of a page."""
+    filled = [i for i, line in enumerate(lines) if line]
+    if len(filled) <= 2 * FURNITURE_EDGE_LINES:
+        return filled
+    return filled[:FURNITURE_EDGE_LINES] + filled[-FURNITURE_EDGE_LINES:]
+
+
+def _furniture_key(line: str) -> str:
+    return _DIGITS.sub("#", line.lower())
+
+
+def _strip_furniture(pages: List[List[str]], report: NormalizationReport) -> None:
+    """Blank out repeated headers/footers and page numbers at page edges, in place."""
+    edges = [_edge_indexes(lines) for lines in pages]
+    seen_on = {}
+    for page_no, (lines, indexes) in enumerate(zip(pages, edges)):
+        for i in indexes:
+            if len(lines[i]) <= FURNITURE_MAX_CHARS:
+                seen_on.setdefault(_furniture_key(lines[i]), set()).add(page_no)
+    min_pages = max(2, math.ceil(len(pages) * FURNITURE_MIN_PAGE_SHARE))
+    furniture = {key for key, found in seen_on.items() if len(found) >= min_pages}
+
+    kept = set()
+    for lines, indexes in zip(pages, edges):
+        for i in indexes:
+            if _PAGE_NUMBER.match(lines[i]):
+                lines[i] = ""
+                report.furniture_lines += 1
+                continue
+            key = _furniture_key(lines[i])
+            if key in furniture:
+                # Keep the first copy: a header is often the only place the name and contact details appear
+                if key not in kept:
+                    kept.add(key)
+                    continue
+                lines[i] = ""
+                report.furniture_lines += 1
+
+
+def _is_bullet(line: str) -> bool:
+    return line[0] in _BULLETS and (len(line) == 1 or line[1] == " ")
+
+
+def _ends_hyphenated(line: str) -> bool:
+    return line.endswith("-") and len(line) > 1 and line[-2].isalpha()
+
+
+def _keeps_hyphen(prev: str, line: str) -> bool:
+    """True when prev's trailing "word-" and line's first word form a hyphenated compound."""
+    head = prev[:-1].rsplit(None, 1)[-1].rsplit("-", 1)[-1].lower()
+    tail = _WORD_START.match(line)
+    return head in _COMPOUND_HEADS or (tail is not None and tail.group() in _COMPOUND_TAILS)
+
+
+def _is_short_heading(line: str) -> bool:
+    # "Python, Go" is the start of a wrapped list, not a heading
+    words = line.split()
+    return len(words) <= HEADING_MAX_WORDS and "," not in line and not any(word[0].islower() for word in words)
+
+
+def _continues(prev: str, line: str) -> bool:
+    """True when line is the wrapped continuation of prev."""
+    if not line[0].islower() or _is_bullet(line) or _LINK.match(line):
+        return False
+    if _ends_hyphenated(prev):
+        return True
+    return not prev.endswith(_ENDS_BLOCK) and not _is_short_heading(prev)
+
+
+def _rejoin(lines: List[str], report: NormalizationReport) -> List[str]:
+    """Merge hyphenated and wrapped lines; collapse runs of blank lines."""
+    out: List[str] = []
+    for line in lines:
+        if not line:
+            if out and out[-1]:
+                out.append("")
+            continue
+        prev = out[-1] if out else ""
+        if prev and _continues(prev, line):
+            if _ends_hyphenated(prev):
+                out[-1] = (prev if _keeps_hyphen(prev, line) else prev[:-1]) + line
+                report.hyphen_joins += 1
+            else:
+                out[-1] = f"{prev} {line}"
+                report.line_joins += 1
+            continue
+        out.append(line)
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+def normalize_pages(pages: List[str]) -> Tuple[str, NormalizationReport]:
+    """Normalized text of a document given one string per page, plus what was removed."""
+    report = NormalizationReport(pages=len(pages), chars_before=len("\n".join(pages)))
+    cleaned = [[_clean_line(line, report) for line in page.split("\n")] for page in pages]
+    _strip_furniture(cleaned, report)
+    text = "\n".join(_rejoin([line for page in cleaned for line in page], report))
+    report.chars_after = len(text)
+
+    metrics.incr("resume_normalizations_total")
+    metrics.incr("resume_chars_saved_total", report.chars_saved)
+    metrics.incr("resume_tokens_saved_total", report.tokens_before - report.tokens_after)
+    return text, report
+
+
+def normalize_text(text: str) -> Tuple[str, NormalizationReport]:
+    """normalize_pages() for text without page boundaries (only page numbers count as furniture)."""
+    return normalize_pages([text or ""])
@@ -0,0 +1,163 @@
+"""
+Token and latency accounting for every LLM call.
+
+The gateway reports each call's usage_metadata and latency here. Calls are
+attributed to the interview, user and resume analysis they were made for
+through a context variable set by the API layer (usage_scope), which follows
+the request into worker threads. Totals are aggregated in memory per
+(interview, user, resume analysis, agent, model) and written to the
+LlmUsage table in batches by a background flusher, so accounting never adds
+a DB round trip to an LLM call.
+"""
+import asyncio
+import contextlib
+import contextvars
+import datetime
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UsageScope:
+    interview_id: Optional[str] = None
+    user_id: Optional[str] = None
+    resume_analysis_id: Optional[str] = None
+
+
+_scope: contextvars.ContextVar[UsageScope] = contextvars.ContextVar("usage_scope", default=UsageScope())
+
+
+@contextlib.contextmanager
+def usage_scope(interview_id: Optional[str] = None, user_id: Optional[str] = None, resume_analysis_id: Optional[str] = None):
+    """Attribute LLM calls made inside this block (and threads it starts) to these ids."""
+    token = _scope.set(UsageScope(interview_id, user_id, resume_analysis_id))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+@dataclass
+class _Totals:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    latency_ms_total: int = 0
+    latency_ms_max: int = 0
+    window_start: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+
+_Key = Tuple[Optional[str], Optional[str], Optional[str], str, str]
+
+
+def _usage_tokens(result) -> Tuple[int, int, int]:
+    """(prompt, completion, total) tokens from an LLM result, 0s when not reported."""
+    # with_structured_output(include_raw=True) returns {"raw": AIMessage, "parsed": ...}
+    message = result.get("raw") if isinstance(result, dict) else result
+    usage = getattr(message, "usage_metadata", None) or {}
+    prompt = int(usage.get("input_tokens") or 0)
+    completion = int(usage.get("output_tokens") or 0)
+    return prompt, completion, int(usage.get("total_tokens") or prompt + completion)
+
+
+class UsageTracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[_Key, _Totals] = {}
+        metrics.register_gauge("usage_pending_rows", lambda: len(self._pending))
+
+    def record(self, agent: str, model: Optional[str], result, latency: float) -> None:
+        prompt, completion, total = _usage_tokens(result)
+        scope = _scope.get()
+        key = (scope.interview_id, scope.user_id, scope.resume_analysis_id, agent, model or "unknown")
+        latency_ms = int(latency * 1000)
+        with self._lock:
+            totals = self._pending.get(key)
+            if totals is None:
+                totals = self._pending[key] = _Totals()
+            totals.calls += 1
+            totals.prompt_tokens += prompt
+            totals.completion_tokens += completion
+            totals.total_tokens += total
+            totals.latency_ms_total += latency_ms
+            totals.latency_ms_max = max(totals.latency_ms_max, latency_ms)
+        metrics.incr("llm_prompt_tokens_total", prompt, agent=agent)
+        metrics.incr("llm_completion_tokens_total", completion, agent=agent)
+
+    def _take(self) -> Dict[_Key, _Totals]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _put_back(self, pending: Dict[_Key, _Totals]) -> None:
+        with self._lock:
+            for key, totals in pending.items():
+                if len(self._pending) >= config.USAGE_MAX_PENDING_ROWS:
+                    metrics.incr("usage_rows_dropped_total")
+                    continue
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = totals
+                    continue
+                current.calls += totals.calls
+                current.prompt_tokens += totals.prompt_tokens
+                current.completion_tokens += totals.completion_tokens
+                current.total_tokens += totals.total_tokens
+                current.latency_ms_total += totals.latency_ms_total
+                current.latency_ms_max = max(current.latency_ms_max, totals.latency_ms_max)
+                current.window_start = min(current.window_start, totals.window_start)
+
+    async def flush(self, db) -> int:
+        """Write pending totals as one batch; on failure they are kept for the next flush."""
+        pending = self._take()
+        if not pending:
+            return 0
+        rows = [
+            {
+                "interviewId": interview_id,
+                "userId": user_id,
+                "resumeAnalysisId": resume_analysis_id,
+                "agent": agent,
+                "model": model,
+                "calls": t.calls,
+                "promptTokens": t.prompt_tokens,
+                "completionTokens": t.completion_tokens,
+                "totalTokens": t.total_tokens,
+                "latencyMsTotal": t.latency_ms_total,
+                "latencyMsMax": t.latency_ms_max,
+                "windowStart": t.window_start,
+            }
+            for (interview_id, user_id, resume_analysis_id, agent, model), t in pending.items()
+        ]
+        try:
+            await db.llmusage.create_many(data=rows)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not flush {len(rows)} usage rows, will retry: {e}")
+            metrics.incr("usage_flush_errors_total")
+            self._put_back(pending)
+            return 0
+        metrics.incr("usage_rows_flushed_total", len(rows))
+        return len(rows)
+
+    async def run_flusher(self, db) -> None:
+        """Flush every USAGE_FLUSH_INTERVAL seconds until cancelled, then flush once more."""
+        try:
+            while True:
+                await asyncio.sleep(config.USAGE_FLUSH_INTERVAL)
+                if db.is_connected():
+                    await self.flush(db)
+        except asyncio.CancelledError:
+            if db.is_connected():
+                await self.flush(db)
+            raise
+
+
+usage_tracker = UsageTracker()